@@ -0,0 +1,141 @@
+import datetime
+import multiprocessing
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import structlog
+
+from . import matcher, parser, rule_plan
+from .models import ArticleDocument, Config, MatchEntry
+from .rule_plan import CompiledRule, RulePlan, SectionPlan
+
+logger = structlog.get_logger()
+
+@dataclass
+class ArticleAnalysis:
+    """Resultado do parsing e da correspondência de um artigo, devolvido pelo processo do pool."""
+    url: str
+    document: Optional[ArticleDocument] = None
+    matches: List[MatchEntry] = field(default_factory=list)
+    parse_seconds: float = 0.0
+    match_seconds: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+def analyze_article(
+    html: str,
+    url: str,
+    section_plan: SectionPlan,
+    date: str,
+    selectors: Optional[List[str]] = None,
+    rules: Optional[Sequence[CompiledRule]] = None,
+) -> ArticleAnalysis:
+    """
+    Parsing (uma única análise da página) e correspondência de um artigo, com a duração
+    de cada etapa. rules: regras candidatas do artigo (None = todas as de corpo da seção).
+    """
+    started = time.perf_counter()
+    doc = parser.parse_article(html, url=url, selectors=selectors)
+    parsed = time.perf_counter()
+    matches = matcher.match_article(section_plan, text=doc.text, title=doc.title, date=date, url=url, rules=rules)
+    return ArticleAnalysis(
+        url=url,
+        document=doc,
+        matches=matches,
+        parse_seconds=parsed - started,
+        match_seconds=time.perf_counter() - parsed,
+    )
+
+# Estado de cada processo do pool, definido uma vez no inicializador
+_worker_plan: Optional[RulePlan] = None
+_worker_selectors: Optional[List[str]] = None
+
+def _init_worker(plan: RulePlan, selectors: List[str]) -> None:
+    """Recebe o plano de regras já compilado uma única vez (nada é recompilado no processo)."""
+    global _worker_plan, _worker_selectors
+    _worker_plan = plan
+    _worker_selectors = selectors
+
+def _analyze_task(
+    url: str, html: str, section: str, date: str, rules: Optional[Tuple[CompiledRule, ...]] = None
+) -> ArticleAnalysis:
+    try:
+        return analyze_article(html, url, _worker_plan.for_section(section), date, _worker_selectors, rules)
+    except Exception as e:
+        return ArticleAnalysis(url=url, error=f"{type(e).__name__}: {e}")
+
+class AnalysisPool:
+    """
+    Pool de processos para parsing e correspondência (etapas limitadas por CPU),
+    enquanto as threads de download continuam buscando páginas. O plano de regras
+    compilado chega a cada processo uma única vez, no inicializador; cada tarefa leva só o HTML.
+    O número de artigos em processamento é limitado (max_in_flight), então o
+    HTML baixado não se acumula em memória quando os downloads são mais rápidos.
+    """
+
+    def __init__(self, cfg: Config, workers: int, max_in_flight: int = 0, plan: Optional[RulePlan] = None):
+        self.workers = max(1, workers)
+        self.max_in_flight = max_in_flight if max_in_flight > 0 else 2 * self.workers
+        # "spawn": os processos nascem enquanto threads de download estão ativas
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(plan if plan is not None else rule_plan.build_plan(cfg), cfg.parser.body_selectors),
+        )
+        logger.info("analysis_pool_started", workers=self.workers, max_in_flight=self.max_in_flight)
+
+    def imap_unordered(
+        self,
+        articles: Iterable[Tuple[str, str]],
+        section: str,
+        target_date: datetime.date,
+        candidates: Optional[Dict[str, Tuple[CompiledRule, ...]]] = None,
+    ) -> Iterator[ArticleAnalysis]:
+        """
+        Analisa pares (url, html) de uma seção, entregando os resultados na ordem em
+        que ficam prontos. A entrada é consumida aos poucos: com max_in_flight
+        artigos pendentes, espera um terminar antes de puxar o próximo.
+        candidates: regras candidatas por URL (sem a URL, só keywords); None = todas as regras.
+        """
+        date = target_date.isoformat()
+        pending: set[Future] = set()
+        source = iter(articles)
+        exhausted = False
+
+        while True:
+            while not exhausted and len(pending) < self.max_in_flight:
+                try:
+                    url, html = next(source)
+                except StopIteration:
+                    exhausted = True
+                    break
+                rules = candidates.get(url, ()) if candidates is not None else None
+                pending.add(self._pool.submit(_analyze_task, url, html, section, date, rules))
+                # Entrega o que já terminou sem esperar o próximo download
+                done = {f for f in pending if f.done()}
+                pending -= done
+                for future in done:
+                    yield future.result()
+
+            if not pending:
+                if exhausted:
+                    return
+                continue
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self) -> "AnalysisPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
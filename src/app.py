@@ -2,6 +2,7 @@ import streamlit as st
 import pandas as pd
 import json
 import glob
+import html
 import os
 from datetime import datetime, date
 import logging
@@ -9,6 +10,7 @@ from typing import List
 
 # Local project imports
 from src import main as main_scrapper
+from src import archive, sqlite_store
 from src.config import load_config
 from src.models import Config, AdvancedMatchRule, ScheduleConfig, LoggingConfig, StorageConfig, MatchEntry
 
@@ -125,14 +127,42 @@ def load_data(data_dir="data"):
     
     return df
 
+def _hit_list(value) -> list:
+    """Hit offsets of a coalesced snippet (older records have no 'hits' column: NaN -> [])."""
+    return value if isinstance(value, list) else []
+
+def _occurrences(hits) -> int:
+    """A coalesced snippet counts each of its hits; a plain snippet counts as one."""
+    return len(_hit_list(hits)) or 1
+
+def highlight_context(context: str, hits) -> str:
+    """Marks each (start, end, term) hit inside the snippet; snippets without offsets are shown as is."""
+    hits = _hit_list(hits)
+    if not hits:
+        return context.strip()
+    parts = []
+    pos = 0
+    for start, end, _ in sorted(hits):
+        if start < pos:
+            continue
+        parts.append(html.escape(context[pos:start]))
+        parts.append(f'<mark class="match-highlight">{html.escape(context[start:end])}</mark>')
+        pos = end
+    parts.append(html.escape(context[pos:]))
+    return "".join(parts).strip()
+
 def render_match_card(row):
     """Renders a single match as a card with grouped context snippets."""
     keywords = row['keyword']
     contexts = row['context']
     keyword_group = row.get('keyword_group', 'Geral')
+    hits = row.get('hits')
+    hits = [_hit_list(h) for h in hits] if isinstance(hits, list) else [[] for _ in contexts]
     
-    match_count = len(keywords)
-    unique_keywords = list(set(keywords))
+    match_count = sum(_occurrences(h) for h in hits)
+    # Coalesced snippets list their terms in the hits; plain ones in the keyword
+    terms = [term for h, k in zip(hits, keywords) for term in ([hit[2] for hit in h] or [k])]
+    unique_keywords = list(set(terms))
     
     with st.container():
         st.markdown(f"""
@@ -151,71 +181,148 @@ def render_match_card(row):
         </div>
         """, unsafe_allow_html=True)
         
-        with st.expander(f"Ver {match_count} trecho(s) do contexto"):
-            for i, (kw, ctx) in enumerate(zip(keywords, contexts)):
+        with st.expander(f"Ver {len(contexts)} trecho(s) do contexto"):
+            for i, (kw, ctx, ctx_hits) in enumerate(zip(keywords, contexts, hits)):
                 st.markdown(f"**#{i+1} - Termo: `{kw}`**")
-                st.markdown(f"""<div class="context-box">...{ctx.strip()}...</div>""", unsafe_allow_html=True)
+                st.markdown(f"""<div class="context-box">...{highlight_context(ctx, ctx_hits)}...</div>""", unsafe_allow_html=True)
                 st.markdown("---")
 
-def run_daily_report_view():
-    st.markdown('<h1 class="main-header">📅 Relatório Diário</h1>', unsafe_allow_html=True)
-    
+def _selected_day(value):
+    """Date picked in the sidebar as datetime.date (None for "Todas" or unparseable legacy values)."""
+    try:
+        return date.fromisoformat(sqlite_store.iso_date(value))
+    except ValueError:
+        return None
+
+def _filter_jsonl(configured_rules):
+    """
+    Sidebar filters over the JSONL files (storage.format: jsonl) plus the Parquet archive
+    of compacted days: the archive index reads two columns only, and the selected rows
+    come from the partitions of the selected date.
+    """
     if not os.path.exists("data"):
         st.info("📭 Nenhum dado encontrado. A pasta 'data' ainda não existe.")
-        return
+        return None
 
     df = load_data()
+    archived_index = archive.read_archive("data", columns=["date", "keyword_group"])
     
-    if df.empty:
+    if df.empty and archived_index.empty:
         st.info("📭 Nenhum dado encontrado nos arquivos JSONL.")
-        return
+        return None
 
     # Sidebar Filters
     st.sidebar.header("Filtros")
     
-    # Load config to get all rule names (for consistent display)
-    cfg = load_config()
-    configured_rules = {rule.name for rule in cfg.rules}
-    
     # Get available groups from data
-    data_groups = sorted(df['keyword_group'].unique()) if 'keyword_group' in df.columns else []
+    data_groups = set(df['keyword_group'].unique()) if 'keyword_group' in df.columns else set()
+    data_groups.update(archived_index['keyword_group'].unique())
     
     # Combine configured rules and data groups
     all_keywords = sorted(list(configured_rules.union(data_groups)))
     
-    all_dates = sorted([str(d) for d in df['date'].unique()], reverse=True) if 'date' in df.columns else []
+    all_dates = {str(d) for d in df['date'].unique()} if 'date' in df.columns else set()
+    all_dates.update(d.isoformat() for d in archived_index['date'].unique())
+    all_dates = sorted(all_dates, reverse=True)
     
     selected_date = st.sidebar.selectbox("Filtrar por Data", ["Todas"] + list(all_dates))
     selected_keywords = st.sidebar.multiselect("Filtrar por Grupo de Termo", all_keywords)
     
     # Apply filters
     filtered_df = df.copy()
-    if selected_date != "Todas":
-        filtered_df = filtered_df[filtered_df['date'] == selected_date]
-    if selected_keywords:
-        filtered_df = filtered_df[filtered_df['keyword_group'].isin(selected_keywords)]
+    if not filtered_df.empty:
+        if selected_date != "Todas":
+            filtered_df = filtered_df[filtered_df['date'] == selected_date]
+        if selected_keywords:
+            filtered_df = filtered_df[filtered_df['keyword_group'].isin(selected_keywords)]
+
+    if archived_index.empty:
+        return filtered_df
+    day = _selected_day(selected_date) if selected_date != "Todas" else None
+    if selected_date != "Todas" and day is None:
+        return filtered_df
+    archived = archive.read_archive("data", date_from=day, date_to=day, rules=selected_keywords)
+    if archived.empty:
+        return filtered_df
+    # Archived dates are already typed: no string parsing needed for sorting
+    archived["date_obj"] = archived["date"]
+    archived["date"] = archived["date"].map(date.isoformat)
+    return pd.concat([filtered_df, archived], ignore_index=True)
+
+def _filter_database(storage_cfg, configured_rules):
+    """
+    Sidebar filters as indexed queries on the SQLite backend (storage.format: sqlite):
+    only the selected rows are read, and free text goes through the FTS index.
+    """
+    db_path = sqlite_store.database_path(storage_cfg)
+    if not db_path.exists():
+        st.info("📭 Nenhum dado encontrado. Rode o raspador ou importe os JSONL com `python -m src.main --import-jsonl`.")
+        return None
+
+    conn = sqlite_store.connect(db_path)
+    try:
+        all_dates = sqlite_store.available_dates(conn)
+        if not all_dates:
+            st.info("📭 Nenhum dado encontrado no banco.")
+            return None
+
+        st.sidebar.header("Filtros")
+        all_keywords = sorted(configured_rules.union(sqlite_store.available_rules(conn)))
+        selected_date = st.sidebar.selectbox("Filtrar por Data", ["Todas"] + all_dates)
+        selected_keywords = st.sidebar.multiselect("Filtrar por Grupo de Termo", all_keywords)
+        search_text = st.sidebar.text_input("Buscar no texto", help="Palavras no trecho ou no título (acentos ignorados; todas precisam aparecer)")
+
+        rows = sqlite_store.query_matches(
+            conn,
+            date=None if selected_date == "Todas" else selected_date,
+            rules=selected_keywords,
+            text=search_text,
+        )
+    finally:
+        conn.close()
+    return pd.DataFrame(rows)
+
+def run_daily_report_view():
+    st.markdown('<h1 class="main-header">📅 Relatório Diário</h1>', unsafe_allow_html=True)
+
+    # Load config to get all rule names (for consistent display) and the storage backend
+    cfg = load_config()
+    configured_rules = {rule.name for rule in cfg.rules}
+
+    if cfg.storage.format == "sqlite":
+        filtered_df = _filter_database(cfg.storage, configured_rules)
+    else:
+        filtered_df = _filter_jsonl(configured_rules)
+    if filtered_df is None:
+        return
     
     # Group by URL to consolidate matches per article
     if not filtered_df.empty:
         # First ensure we have valid values
         filtered_df['title'] = filtered_df['title'].fillna("Sem Título")
         
-        grouped_df = filtered_df.groupby('url').agg({
+        aggregations = {
             'title': 'first',
             'date': 'first',
             'section': 'first',
             'keyword': list,
             'context': list,
             'keyword_group': 'first' # Aggregate keyword group to file level (heuristic)
-        }).reset_index()
+        }
+        if 'hits' in filtered_df.columns:
+            aggregations['hits'] = list
+        grouped_df = filtered_df.groupby('url').agg(aggregations).reset_index()
     else:
         grouped_df = pd.DataFrame()
 
     # Display metrics
     c1, c2 = st.columns(2)
     
-    # Calculate totals
-    total_occurrences = len(filtered_df)
+    # Calculate totals (a coalesced snippet counts each of its hits)
+    if 'hits' in filtered_df.columns:
+        total_occurrences = int(filtered_df['hits'].map(_occurrences).sum())
+    else:
+        total_occurrences = len(filtered_df)
     unique_articles = len(grouped_df)
     
     c1.metric("Total de Ocorrências", total_occurrences)
@@ -334,7 +441,8 @@ def run_custom_search_view():
                             "date": match.date,
                             "section": match.section,
                             "keyword": match.keyword,
-                            "context": match.context
+                            "context": match.context,
+                            "hits": match.hits
                         })
                     
                     # Group custom search results by URL as well
@@ -345,7 +453,8 @@ def run_custom_search_view():
                             'date': 'first',
                             'section': 'first',
                             'keyword': list,
-                            'context': list
+                            'context': list,
+                            'hits': list
                         }).reset_index()
                     else:
                         grouped_results = pd.DataFrame()
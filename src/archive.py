@@ -0,0 +1,226 @@
+import datetime
+import json
+import os
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import structlog
+
+from .sqlite_store import identity, iso_date
+
+logger = structlog.get_logger()
+
+# Arquivo histórico dentro de storage.output_dir, em partições no formato hive com um
+# arquivo por dia: archive/year=2026/month=02/section=dou1/part-2026-02-10.parquet.
+# Dias já arquivados não são reescritos (o histórico versionado no git só ganha arquivos novos)
+ARCHIVE_DIR = "archive"
+_NO_SECTION = "sem_secao"
+
+# Colunas da identidade de uma ocorrência (sqlite_store.identity): compactar de novo
+# (ex.: após uma interrupção) não duplica linhas, e ocorrências com o mesmo trecho não se perdem
+_IDENTITY = ("url", "keyword_group", "keyword", "context", "offset")
+
+# Colunas devolvidas por read_archive (as de um registro JSONL; year/month só servem para podar partições)
+COLUMNS = ["keyword", "context", "date", "section", "url", "capture_timestamp", "title", "keyword_group", "fuzzy", "hits", "offset"]
+
+def _schema():
+    """Esquema compacto: regra e termo como categorias (dicionário), data como date32."""
+    import pyarrow as pa
+
+    categorical = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ("date", pa.date32()),
+        ("keyword_group", categorical),
+        ("keyword", categorical),
+        ("url", pa.string()),
+        ("title", pa.string()),
+        ("context", pa.string()),
+        ("capture_timestamp", pa.string()),
+        ("fuzzy", pa.bool_()),
+        ("hits", pa.list_(pa.struct([("start", pa.int32()), ("end", pa.int32()), ("term", pa.string())]))),
+        ("offset", pa.int32()),  # Nulo em registros antigos (anteriores ao campo MatchEntry.offset)
+    ])
+
+def _partitioning():
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    return ds.partitioning(
+        pa.schema([("year", pa.int16()), ("month", pa.int8()), ("section", pa.string())]), flavor="hive"
+    )
+
+def _entry_date(entry: Dict[str, Any]) -> Optional[datetime.date]:
+    try:
+        return datetime.date.fromisoformat(iso_date(entry.get("date") or ""))
+    except ValueError:
+        return None
+
+def _record(entry: Dict[str, Any], day: datetime.date, default_group: str) -> Dict[str, Any]:
+    """Linha do arquivo histórico a partir de um registro JSONL (grupo legado: keyword ou nome do arquivo)."""
+    return {
+        "date": day,
+        "keyword_group": entry.get("keyword_group") or entry.get("keyword") or default_group,
+        "keyword": entry.get("keyword") or "",
+        "url": entry.get("url") or "",
+        "title": entry.get("title") or "",
+        "context": entry.get("context") or "",
+        "capture_timestamp": entry.get("capture_timestamp") or "",
+        "fuzzy": bool(entry.get("fuzzy")),
+        "hits": [{"start": start, "end": end, "term": term} for start, end, term in entry.get("hits") or []],
+        "offset": entry.get("offset"),
+    }
+
+def _part_path(root: Path, day: datetime.date, section: str) -> Path:
+    return root / ARCHIVE_DIR / f"year={day.year}" / f"month={day.month:02d}" / f"section={section}" / f"part-{day.isoformat()}.parquet"
+
+def _merge_part(path: Path, records: List[Dict[str, Any]]) -> int:
+    """
+    Grava as linhas de um dia e seção (sem duplicatas). O arquivo do dia só é
+    reescrito se já existir e houver linhas novas (compactação repetida após uma
+    interrupção ou backfill de um dia antigo). Retorna quantas linhas eram novas.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    tables = []
+    seen = set()
+    if path.exists():
+        existing = pq.read_table(path, schema=_schema())
+        # Registros sem offset contam a ordem entre linhas iguais, no arquivo e no lote novo
+        ordinals: Counter = Counter()
+        seen = {identity(row, ordinals) for row in existing.select(list(_IDENTITY)).to_pylist()}
+        tables.append(existing)
+
+    new = []
+    ordinals = Counter()
+    for record in records:
+        key = identity(record, ordinals)
+        if key not in seen:
+            seen.add(key)
+            new.append(record)
+    if not new:
+        return 0
+
+    tables.append(pa.Table.from_pylist(new, schema=_schema()))
+    table = pa.concat_tables(tables).unify_dictionaries().combine_chunks()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Nome com ponto: o pyarrow.dataset ignora uma sobra de gravação interrompida
+    tmp = path.with_name(f".{path.name}.tmp")
+    pq.write_table(table, tmp, compression="zstd")
+    os.replace(tmp, path)
+    return len(new)
+
+def _rewrite(path: Path, lines: List[str]) -> None:
+    """Substitui o JSONL pelas linhas que ficam (troca atômica: um arquivo inteiro ou o antigo)."""
+    tmp = path.with_suffix(".jsonl.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.writelines(lines)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def compact(output_dir: Union[str, Path], today: Optional[datetime.date] = None) -> Dict[str, int]:
+    """
+    Move os dias fechados (anteriores a today) dos JSONL para o arquivo Parquet
+    particionado por ano/mês/seção, um arquivo por dia; nos JSONL fica só o dia
+    corrente (e linhas sem data legível). Os arquivos Parquet são gravados antes de
+    os JSONL serem reescritos, e a mesclagem ignora linhas já arquivadas, então uma
+    compactação interrompida pode simplesmente ser repetida. Não deve rodar enquanto
+    o raspador grava.
+    """
+    today = today or datetime.date.today()
+    root = Path(output_dir)
+    parts: Dict[Tuple[datetime.date, str], List[Dict[str, Any]]] = {}
+    remaining: Dict[Path, List[str]] = {}
+    kept = 0
+
+    for path in sorted(root.glob("*.jsonl")):
+        keep = []
+        moved = False
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    keep.append(line)
+                    continue
+                day = _entry_date(entry)
+                if day is None or day >= today:
+                    keep.append(line)
+                    continue
+                key = (day, entry.get("section") or _NO_SECTION)
+                parts.setdefault(key, []).append(_record(entry, day, path.stem))
+                moved = True
+        kept += len(keep)
+        if moved:
+            remaining[path] = keep
+
+    archived = 0
+    for (day, section), records in sorted(parts.items()):
+        archived += _merge_part(_part_path(root, day, section), records)
+
+    for path, lines in remaining.items():
+        _rewrite(path, lines)
+
+    stats = {
+        "files": len(remaining),
+        "parts": len(parts),
+        "archived": archived,
+        "duplicates": sum(len(records) for records in parts.values()) - archived,
+        "kept": kept,
+    }
+    logger.info("archive_compaction_finished", **stats)
+    return stats
+
+def read_archive(
+    output_dir: Union[str, Path],
+    date_from: Optional[datetime.date] = None,
+    date_to: Optional[datetime.date] = None,
+    sections: Optional[Sequence[str]] = None,
+    rules: Optional[Sequence[str]] = None,
+    columns: Optional[Sequence[str]] = None,
+):
+    """
+    Linhas arquivadas como pandas.DataFrame, lendo só as partições necessárias:
+    o intervalo de datas poda ano/mês, sections poda a seção, e rules é aplicado
+    na leitura de cada arquivo. date vem como datetime.date; regra, termo e seção
+    como categorias; hits como lista de (início, fim, termo).
+    """
+    import pandas as pd
+    import pyarrow.dataset as ds
+
+    columns = list(columns or COLUMNS)
+    root = Path(output_dir) / ARCHIVE_DIR
+    if not root.exists():
+        return pd.DataFrame(columns=columns)
+
+    dataset = ds.dataset(root, format="parquet", partitioning=_partitioning())
+    year, month = ds.field("year"), ds.field("month")
+    conditions = []
+    if date_from is not None:
+        conditions.append((year > date_from.year) | ((year == date_from.year) & (month >= date_from.month)))
+        conditions.append(ds.field("date") >= date_from)
+    if date_to is not None:
+        conditions.append((year < date_to.year) | ((year == date_to.year) & (month <= date_to.month)))
+        conditions.append(ds.field("date") <= date_to)
+    if sections:
+        conditions.append(ds.field("section").isin(list(sections)))
+    if rules:
+        conditions.append(ds.field("keyword_group").isin(list(rules)))
+
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+    frame = dataset.to_table(columns=columns, filter=expression).to_pandas()
+
+    if "section" in frame.columns:
+        frame["section"] = frame["section"].astype("category")
+    if "hits" in frame.columns:
+        frame["hits"] = [
+            [(hit["start"], hit["end"], hit["term"]) for hit in hits] if hits is not None else []
+            for hits in frame["hits"]
+        ]
+    return frame
@@ -0,0 +1,100 @@
+from collections import deque
+from typing import Dict, Iterable, List
+
+# Até esse número de termos, um str.find (em C) por termo custa menos que a varredura do autômato
+# (ponto de equilíbrio medido com `python -m src.benchmark --matcher`)
+DIRECT_SEARCH_MAX_TERMS = 128
+
+class TermAutomaton:
+    """
+    Autômato de Aho–Corasick sobre termos já normalizados: uma única varredura do
+    texto encontra todas as ocorrências de todos os termos, com custo praticamente
+    independente da quantidade de termos (centenas de regras, milhares de termos).
+    Montado uma vez e reutilizado em todos os artigos.
+
+    search() devolve, por termo, as posições de início das ocorrências sem
+    sobreposição (da esquerda para a direita, como um laço de str.index que avança
+    pelo tamanho do termo). Com poucos termos, a busca direta por termo é usada.
+    """
+
+    def __init__(self, terms: Iterable[str]):
+        # Termos distintos e não vazios, na ordem de chegada
+        self.terms: List[str] = list(dict.fromkeys(term for term in terms if term))
+        self._lengths = [len(term) for term in self.terms]
+
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[tuple] = [()]
+        for term_id, term in enumerate(self.terms):
+            state = 0
+            for ch in term:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    outputs.append(())
+                state = nxt
+            outputs[state] += (term_id,)
+
+        # Links de falha em largura; cada estado herda as saídas do seu sufixo
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                link = fail[state]
+                while link and ch not in goto[link]:
+                    link = fail[link]
+                fail[nxt] = goto[link].get(ch, 0) if state else 0
+                outputs[nxt] += outputs[fail[nxt]]
+
+        self._goto = goto
+        self._fail = fail
+        self._outputs = outputs
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    @property
+    def states(self) -> int:
+        return len(self._goto)
+
+    def search(self, text: str) -> Dict[str, List[int]]:
+        """Posições de início (sem sobreposição por termo) de cada termo encontrado no texto."""
+        if not self.terms or not text:
+            return {}
+        if len(self.terms) <= DIRECT_SEARCH_MAX_TERMS:
+            return self._search_direct(text)
+        return self._search_automaton(text)
+
+    def _search_direct(self, text: str) -> Dict[str, List[int]]:
+        found: Dict[str, List[int]] = {}
+        for term, length in zip(self.terms, self._lengths):
+            idx = text.find(term)
+            while idx >= 0:
+                found.setdefault(term, []).append(idx)
+                idx = text.find(term, idx + length)
+        return found
+
+    def _search_automaton(self, text: str) -> Dict[str, List[int]]:
+        goto, fail, outputs, lengths = self._goto, self._fail, self._outputs, self._lengths
+        starts: Dict[int, List[int]] = {}
+        next_free: Dict[int, int] = {}
+
+        state = 0
+        for end, ch in enumerate(text, 1):
+            transitions = goto[state]
+            while state and ch not in transitions:
+                state = fail[state]
+                transitions = goto[state]
+            state = transitions.get(ch, 0)
+            if outputs[state]:
+                for term_id in outputs[state]:
+                    start = end - lengths[term_id]
+                    # Ocorrências de um mesmo termo saem em ordem; descarta as sobrepostas
+                    if start >= next_free.get(term_id, 0):
+                        starts.setdefault(term_id, []).append(start)
+                        next_free[term_id] = end
+
+        return {self.terms[term_id]: positions for term_id, positions in starts.items()}
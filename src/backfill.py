@@ -0,0 +1,152 @@
+import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Iterator, List, Optional, Tuple
+
+import structlog
+
+from . import config, downloader, journal, storage
+from .models import Config, MatchEntry
+from .ratelimit import SharedTokenBucket
+
+logger = structlog.get_logger()
+
+# Configuração recebida por cada processo do pool (definida no inicializador)
+_worker_cfg: Optional[Config] = None
+
+def iter_dates(start: datetime.date, end: datetime.date, include_weekends: bool = False) -> Iterator[datetime.date]:
+    """
+    Datas de start a end (inclusive). Sábados e domingos são pulados por padrão,
+    já que o DOU normalmente não tem edição ordinária no fim de semana.
+    """
+    day = start
+    while day <= end:
+        if include_weekends or day.weekday() < 5:
+            yield day
+        day += datetime.timedelta(days=1)
+
+def _init_worker(cfg: Config, budget: Optional[SharedTokenBucket]) -> None:
+    """Inicializa um processo do pool: configuração e orçamento global de requisições."""
+    global _worker_cfg
+    _worker_cfg = cfg
+    if budget is not None:
+        downloader.use_shared_budget(budget)
+    downloader.configure(cfg.crawler, cfg.cache)
+
+def _run_task(target_date: datetime.date, section: str) -> Tuple[str, List[MatchEntry]]:
+    """
+    Processa uma (data, seção) sem gravar nada: as correspondências voltam para o
+    processo pai, que é o único escritor (armazenamento e diário).
+    """
+    from . import main as scraper
+
+    matches: List[MatchEntry] = []
+    status = scraper.process_section(_worker_cfg, section, target_date, matches, save_results=False)
+    return status, matches
+
+def run_backfill(
+    cfg: Config,
+    start: datetime.date,
+    end: datetime.date,
+    workers: int = 2,
+    include_weekends: bool = False,
+) -> dict:
+    """
+    Reprocessa um intervalo de datas distribuindo (data, seção) entre processos.
+    - Todos os processos dividem um único orçamento de requisições (SharedTokenBucket).
+    - Só o processo pai grava correspondências e diários, então não há escrita concorrente.
+    - Seções já concluídas no diário da data são puladas: o comando pode ser reiniciado.
+    - workers=0 executa tudo no próprio processo (útil para depuração).
+    Retorna um resumo com contagens de datas, tarefas e correspondências.
+    """
+    from . import main as scraper
+
+    sections = config.sections_to_process(cfg)
+    dates = list(iter_dates(start, end, include_weekends))
+    today = datetime.date.today()
+
+    journals: dict[datetime.date, journal.CrawlJournal] = {}
+    tasks: List[Tuple[datetime.date, str]] = []
+    for day in dates:
+        day_journal = journal.CrawlJournal.for_date(cfg.storage.journal_dir, day)
+        if day_journal.is_complete():
+            day_journal.close()
+            continue
+        journals[day] = day_journal
+        tasks.extend((day, section) for section in sections if not day_journal.section_done(section))
+
+    summary = {
+        "dates": len(dates),
+        "dates_skipped": len(dates) - len(journals),
+        "tasks": len(tasks),
+        "unfinished_tasks": 0,
+        "matches": 0,
+    }
+    logger.info("backfill_started", start=str(start), end=str(end), workers=workers, **summary)
+
+    remaining = {day: 0 for day in journals}
+    for day, _ in tasks:
+        remaining[day] += 1
+    for day, count in remaining.items():
+        # Todas as seções concluídas numa execução anterior interrompida antes do fechamento
+        if count == 0:
+            journals[day].mark_complete()
+    day_matches = {day: 0 for day in journals}
+    finished_dates = summary["dates_skipped"]
+
+    # Um gravador para o backfill inteiro; descarregado antes de cada marca no diário
+    writer = storage.open_writer(cfg.storage)
+
+    def handle(day: datetime.date, section: str, status: str, matches: List[MatchEntry]) -> None:
+        nonlocal finished_dates
+        # Só seções concluídas são gravadas: uma seção inacabada é refeita inteira no
+        # reinício, e gravar as correspondências parciais dela as duplicaria
+        if scraper.section_finished(status, day, today):
+            writer.write(matches)
+            writer.flush()
+            summary["matches"] += len(matches)
+            day_matches[day] += len(matches)
+            journals[day].mark_section_done(section)
+        else:
+            summary["unfinished_tasks"] += 1
+            if matches:
+                logger.info("backfill_matches_discarded", date=str(day), section=section, matches=len(matches))
+
+        remaining[day] -= 1
+        if remaining[day] == 0:
+            finished_dates += 1
+            complete = all(journals[day].section_done(s) for s in sections)
+            if complete:
+                journals[day].mark_complete()
+            logger.info(
+                "backfill_date_finished",
+                date=str(day),
+                complete=complete,
+                matches=day_matches[day],
+                progress=f"{finished_dates}/{len(dates)}",
+            )
+
+    budget = SharedTokenBucket(rate=cfg.crawler.requests_per_second, capacity=cfg.crawler.burst)
+    try:
+        if workers <= 0:
+            _init_worker(cfg, None)
+            for day, section in tasks:
+                handle(day, section, *_run_task(day, section))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(cfg, budget)) as pool:
+                futures = {pool.submit(_run_task, day, section): (day, section) for day, section in tasks}
+                for future in as_completed(futures):
+                    day, section = futures[future]
+                    try:
+                        status, matches = future.result()
+                    except Exception as e:
+                        logger.error("backfill_task_failed", date=str(day), section=section, error=str(e))
+                        status, matches = scraper.SECTION_FAILED, []
+                    handle(day, section, status, matches)
+    finally:
+        writer.close()
+        for day_journal in journals.values():
+            day_journal.close()
+        downloader.close()
+
+    logger.info("backfill_finished", **summary)
+    return summary
@@ -0,0 +1,327 @@
+import argparse
+import datetime
+import json
+import logging
+import random
+import sys
+import tempfile
+import time
+import timeit
+
+import structlog
+
+from . import main as scraper
+from . import automaton
+from . import fuzzy
+from . import matcher
+from . import rule_plan
+from . import parser as html_parser
+from .metrics import StageMetrics
+from .mock_server import PLANTED_TERM, MockDouServer
+from .models import (
+    AdvancedMatchRule,
+    CacheConfig,
+    Config,
+    CrawlerConfig,
+    LoggingConfig,
+    ParserConfig,
+    ScheduleConfig,
+    StorageConfig,
+)
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = structlog.get_logger()
+
+def peak_rss_mb() -> float | None:
+    """Pico de memória residente do processo em MB (None onde getrusage não existe)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss vem em bytes no macOS e em KiB no Linux
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 1)
+
+def benchmark_config(
+    base_url: str,
+    workdir: str,
+    workers: int = 4,
+    rps: float = 200.0,
+    parse_workers: int = 0,
+    streaming: bool = False,
+) -> Config:
+    """
+    Configuração do benchmark: servidor local, diretórios temporários, cache
+    desligado (toda execução vai à rede) e uma regra que casa com os artigos marcados.
+    """
+    return Config(
+        schedule=ScheduleConfig(time="06:00"),
+        keywords=[],
+        storage=StorageConfig(output_dir=f"{workdir}/data", journal_dir=f"{workdir}/journal"),
+        logging=LoggingConfig(file=f"{workdir}/bench.log"),
+        rules=[
+            AdvancedMatchRule(
+                name="Força Nacional",
+                body_terms=[PLANTED_TERM],
+                title_terms=["portaria"],
+                sections=["dou1"],
+            )
+        ],
+        crawler=CrawlerConfig(
+            base_url=base_url,
+            requests_per_second=rps,
+            min_requests_per_second=rps,
+            max_requests_per_second=rps,
+            burst=max(1, workers),
+            max_workers=workers,
+            per_host_concurrency=workers,
+            pool_size=workers,
+            warmup=True,
+        ),
+        cache=CacheConfig(enabled=False),
+        parser=ParserConfig(workers=parse_workers, streaming=streaming),
+    )
+
+def run_benchmark(
+    articles: int = 200,
+    page_size: int = 20_000,
+    latency: float = 0.0,
+    error_rate: float = 0.0,
+    throttle_rate: float = 0.0,
+    workers: int = 4,
+    rps: float = 200.0,
+    seed: int = 0,
+    parse_workers: int = 0,
+    streaming: bool = False,
+) -> dict:
+    """
+    Executa run_scraper de ponta a ponta contra o MockDouServer e retorna o relatório:
+    artigos/s, p50/p99 por etapa, pico de memória e bytes transferidos.
+    """
+    stage_metrics = StageMetrics()
+    with tempfile.TemporaryDirectory(prefix="dou-bench-") as workdir, MockDouServer(
+        articles=articles,
+        page_size=page_size,
+        latency=latency,
+        error_rate=error_rate,
+        throttle_rate=throttle_rate,
+        seed=seed,
+    ) as server:
+        cfg = benchmark_config(
+            server.base_url, workdir, workers=workers, rps=rps, parse_workers=parse_workers, streaming=streaming
+        )
+        started = time.perf_counter()
+        matches = scraper.run_scraper(cfg, datetime.date(2026, 1, 5), stage_metrics=stage_metrics)
+        elapsed = time.perf_counter() - started
+
+        # Em modo streaming o parsing é medido junto com o download; todo artigo passa por "store"
+        fetched = stage_metrics.count("store")
+        return {
+            "articles": articles,
+            "articles_processed": fetched,
+            "matches": len(matches),
+            "elapsed_seconds": round(elapsed, 3),
+            "articles_per_second": round(fetched / elapsed, 2) if elapsed else 0.0,
+            "stages": stage_metrics.summary(),
+            "peak_rss_mb": peak_rss_mb(),
+            "bytes_transferred": server.bytes_sent,
+            "requests": dict(server.requests),
+            "statuses": {str(code): count for code, count in server.statuses.items()},
+        }
+
+def benchmark_normalizer(sizes: tuple[int, ...] = (2_000, 20_000, 200_000), repeat: int = 20) -> list[dict]:
+    """
+    Compara normalize_text (tabela + mapa de posições) com a implementação NFD
+    original sobre o texto extraído de páginas de ato de tamanhos reais.
+    Tempos em milissegundos por chamada (melhor de 3 séries).
+    """
+    results = []
+    for size in sizes:
+        with MockDouServer(articles=1, page_size=size) as server:
+            text = html_parser.parse_article(server.article_html(0)).text
+        if html_parser.normalize_text(text) != html_parser.normalize_text_nfd(text):
+            raise AssertionError("normalize_text diverge da implementação NFD")
+
+        reference = min(timeit.repeat(lambda: html_parser.normalize_text_nfd(text), number=repeat, repeat=3)) / repeat
+        folded = min(timeit.repeat(lambda: html_parser.fold_text(text), number=repeat, repeat=3)) / repeat
+        results.append({
+            "chars": len(text),
+            "nfd_ms": round(reference * 1000, 3),
+            "fold_text_ms": round(folded * 1000, 3),
+            "speedup": round(reference / folded, 2) if folded else None,
+        })
+    return results
+
+def benchmark_matcher(term_counts: tuple[int, ...] = (10, 100, 1_000, 5_000), page_size: int = 20_000, repeat: int = 5) -> list[dict]:
+    """
+    Custo da busca de termos no texto de um ato, em função da quantidade de termos:
+    varredura única do TermAutomaton vs. um laço str.find por termo (abordagem anterior).
+    Os termos são pares de palavras do próprio texto (a maioria com um sufixo que não ocorre).
+    Tempos em milissegundos por artigo (melhor de 3 séries).
+    """
+    with MockDouServer(articles=1, page_size=page_size) as server:
+        text = html_parser.normalize_text(html_parser.parse_article(server.article_html(0)).text)
+    words = text.split()
+
+    results = []
+    for count in term_counts:
+        rng = random.Random(count)
+        terms = [
+            f"{rng.choice(words)} {rng.choice(words)}" + ("" if i % 10 == 0 else f" {rng.randrange(10**6)}")
+            for i in range(count)
+        ]
+        engine = automaton.TermAutomaton(terms)
+
+        def per_term():
+            found = {}
+            for term in engine.terms:
+                idx = text.find(term)
+                while idx >= 0:
+                    found.setdefault(term, []).append(idx)
+                    idx = text.find(term, idx + len(term))
+            return found
+
+        if engine._search_automaton(text) != per_term():
+            raise AssertionError("TermAutomaton diverge da busca por termo")
+        scan = min(timeit.repeat(lambda: engine._search_automaton(text), number=repeat, repeat=3)) / repeat
+        direct = min(timeit.repeat(per_term, number=repeat, repeat=3)) / repeat
+        results.append({
+            "terms": len(engine),
+            "chars": len(text),
+            "automaton_ms": round(scan * 1000, 3),
+            "per_term_ms": round(direct * 1000, 3),
+        })
+    return results
+
+# Termos do benchmark de busca aproximada: o termo plantado pelo servidor e termos comuns do DOU
+_FUZZY_TERMS = ("forca nacional de seguranca publica", "nomeacao", "exoneracao", "aposentadoria", "licitacao")
+
+def benchmark_fuzzy(articles: int = 300, page_size: int = 20_000, max_edits: tuple[int, ...] = (1, 2), repeat: int = 3) -> list[dict]:
+    """
+    Busca exata (autômato) vs. aproximada (Myers, termo~k) sobre uma edição inteira:
+    o texto normalizado de todos os atos da listagem, com um erro de digitação em
+    metade das ocorrências do termo plantado ("nacionai", como no DOU). Tempos em
+    milissegundos por edição (melhor de 3 séries); `hits` conta as ocorrências.
+    """
+    planted = html_parser.normalize_text(PLANTED_TERM)
+    with MockDouServer(articles=articles, page_size=page_size) as server:
+        texts = [html_parser.normalize_text(html_parser.parse_article(server.article_html(i)).text) for i in range(articles)]
+    planted_in = [i for i, text in enumerate(texts) if planted in text]
+    for i in planted_in[1::2]:
+        texts[i] = texts[i].replace(planted, planted.replace("nacional", "nacionai"))
+    edition = "\n".join(texts)
+
+    engines = [("exact", 0, automaton.TermAutomaton(_FUZZY_TERMS))]
+    engines += [(f"fuzzy_k{k}", k, fuzzy.FuzzyTerms((term, k) for term in _FUZZY_TERMS)) for k in max_edits]
+    results = []
+    for name, k, engine in engines:
+        found = engine.search(edition)
+        elapsed = min(timeit.repeat(lambda: engine.search(edition), number=repeat, repeat=3)) / repeat
+        results.append({
+            "engine": name,
+            "max_edits": k,
+            "terms": len(_FUZZY_TERMS),
+            "chars": len(edition),
+            "hits": sum(len(positions) for positions in found.values()),
+            "ms": round(elapsed * 1000, 3),
+        })
+    return results
+
+def benchmark_batch(documents: int = 2_000, page_size: int = 5_000, workers: int = 0) -> dict:
+    """
+    Reavaliação de regras sobre atos já guardados: um find_matches por documento
+    (MatchEntry + timestamp por ocorrência) vs. matcher.match_batch (colunas).
+    Cada ato tem o termo plantado várias vezes, como um dia com muitas ocorrências.
+    """
+    with MockDouServer(articles=1, page_size=page_size) as server:
+        text = html_parser.parse_article(server.article_html(0)).text
+    text = text.replace(". ", f". {PLANTED_TERM}. ")
+    docs = [(str(i), f"PORTARIA Nº {i}", text, "dou1") for i in range(documents)]
+    rules = [
+        AdvancedMatchRule(name="FN", body_terms=[PLANTED_TERM]),
+        AdvancedMatchRule(name="Atribuições", body_terms=["atribuições", "incisos"]),
+    ]
+    cfg = Config(
+        schedule=ScheduleConfig(time="00:00"),
+        keywords=[],
+        sections=["dou1"],
+        storage=StorageConfig(),
+        logging=LoggingConfig(),
+        rules=rules,
+    )
+    plan = rule_plan.build_plan(cfg)
+
+    started = time.perf_counter()
+    entries = sum(
+        len(matcher.find_matches(doc_text, [], "2026-02-10", section, doc_id, title=title, rules=rules))
+        for doc_id, title, doc_text, section in docs
+    )
+    per_document = time.perf_counter() - started
+
+    started = time.perf_counter()
+    columns = matcher.match_batch(docs, plan, workers=workers)
+    batch = time.perf_counter() - started
+    if len(columns) != entries:
+        raise AssertionError("match_batch diverge de find_matches")
+    return {
+        "documents": documents,
+        "occurrences": entries,
+        "workers": workers,
+        "find_matches_docs_per_second": round(documents / per_document, 1),
+        "match_batch_docs_per_second": round(documents / batch, 1),
+        "speedup": round(per_document / batch, 2),
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de ponta a ponta contra um servidor DOU local")
+    parser.add_argument("--articles", type=int, default=200, help="Atos na listagem da seção")
+    parser.add_argument("--page-size", type=int, default=20_000, help="Tamanho aproximado de cada página de ato (bytes)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Latência injetada por resposta (segundos)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fração de respostas 503")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fração de respostas 429 (Retry-After: 0)")
+    parser.add_argument("--workers", type=int, default=4, help="Downloads simultâneos")
+    parser.add_argument("--rps", type=float, default=200.0, help="Orçamento de requisições por segundo")
+    parser.add_argument("--seed", type=int, default=0, help="Semente das falhas injetadas")
+    parser.add_argument("--parse-workers", type=int, default=0, help="Processos de parsing/correspondência (0 = no processo do raspador)")
+    parser.add_argument("--streaming", action="store_true", help="Parsing incremental durante o download (parser.streaming)")
+    parser.add_argument("--normalizer", action="store_true", help="Compara só o normalizador de texto (tabela vs NFD) e sai")
+    parser.add_argument("--matcher", action="store_true", help="Compara só a busca de termos (autômato vs. um laço por termo) e sai")
+    parser.add_argument("--batch", action="store_true", help="Compara find_matches por documento com matcher.match_batch e sai (--parse-workers = processos)")
+    parser.add_argument("--fuzzy", action="store_true", help="Compara só a busca exata com a aproximada (termo~k) numa edição inteira e sai")
+    args = parser.parse_args()
+
+    # Só avisos e erros: o log por URL distorceria a medição
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+    if args.normalizer:
+        print(json.dumps(benchmark_normalizer(), indent=2))
+        return
+    if args.matcher:
+        print(json.dumps(benchmark_matcher(), indent=2))
+        return
+    if args.batch:
+        print(json.dumps(benchmark_batch(workers=args.parse_workers), indent=2))
+        return
+    if args.fuzzy:
+        print(json.dumps(benchmark_fuzzy(articles=args.articles, page_size=args.page_size), indent=2))
+        return
+
+    report = run_benchmark(
+        articles=args.articles,
+        page_size=args.page_size,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        workers=args.workers,
+        rps=args.rps,
+        seed=args.seed,
+        parse_workers=args.parse_workers,
+        streaming=args.streaming,
+    )
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
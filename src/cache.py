@@ -0,0 +1,217 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+import structlog
+
+logger = structlog.get_logger()
+
+# Páginas de listagem mudam ao longo do dia; artigos publicados nunca mudam
+LISTING_MARKER = "/leiturajornal?"
+
+@dataclass
+class CachedResponse:
+    url: str
+    body: str
+    stored_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    fresh: bool = True
+
+    def validators(self) -> dict:
+        """Cabeçalhos de requisição condicional para revalidar esta entrada."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+def cache_key(url: str) -> str:
+    """Chave de conteúdo (SHA-256 da URL) usada como nome de arquivo."""
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+def is_listing_url(url: str) -> bool:
+    return LISTING_MARKER in url
+
+class ResponseCache:
+    """
+    Cache de respostas HTTP em disco, endereçado pela URL.
+    Cada entrada é um arquivo com uma linha de metadados JSON seguida do corpo
+    comprimido com zlib. A gravação é atômica (arquivo temporário + os.replace).
+    - Artigos não expiram; listagens expiram após `listing_ttl` segundos.
+    - Entradas expiradas com ETag/Last-Modified são revalidadas (304) pelo chamador.
+    - O tamanho total é limitado a `max_bytes`, removendo as menos usadas (LRU por mtime).
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int,
+        listing_ttl: float = 3600,
+        clock: Callable[[], float] = time.time,
+    ):
+        self._dir = Path(directory)
+        self._max_bytes = max_bytes
+        self._listing_ttl = listing_ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._total_bytes: Optional[int] = None
+
+    def _path(self, url: str) -> Path:
+        key = cache_key(url)
+        return self._dir / key[:2] / f"{key}.z"
+
+    def _is_fresh(self, url: str, stored_at: float) -> bool:
+        if not is_listing_url(url):
+            return True
+        return self._clock() - stored_at < self._listing_ttl
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        """Retorna a entrada (fresca ou expirada) ou None se ausente/corrompida."""
+        path = self._path(url)
+        try:
+            raw = path.read_bytes()
+            header, _, payload = raw.partition(b"\n")
+            meta = json.loads(header)
+            body = zlib.decompress(payload).decode("utf-8")
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, zlib.error) as e:
+            logger.warning("cache_entry_corrupted", url=url, error=str(e))
+            self._remove(path)
+            return None
+
+        # Marca como usado recentemente para a política LRU
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        return CachedResponse(
+            url=url,
+            body=body,
+            stored_at=meta["stored_at"],
+            etag=meta.get("etag"),
+            last_modified=meta.get("last_modified"),
+            fresh=self._is_fresh(url, meta["stored_at"]),
+        )
+
+    def put(self, url: str, body: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        """Grava (ou substitui) a entrada da URL."""
+        with self.writer(url, etag, last_modified) as writer:
+            writer.write(body)
+
+    def writer(self, url: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> "CacheWriter":
+        """
+        Grava a entrada aos poucos (ex.: blocos de uma resposta em fluxo), comprimindo
+        cada bloco ao recebê-lo. Usado como context manager: a entrada só substitui a
+        anterior se o bloco terminar sem exceção.
+        """
+        meta = {"url": url, "stored_at": self._clock(), "etag": etag, "last_modified": last_modified}
+        return CacheWriter(self, self._path(url), json.dumps(meta).encode("utf-8") + b"\n")
+
+    def _commit(self, tmp: Path, path: Path) -> None:
+        size = tmp.stat().st_size
+        previous = path.stat().st_size if path.exists() else 0
+        os.replace(tmp, path)
+
+        with self._lock:
+            if self._total_bytes is not None:
+                self._total_bytes += size - previous
+        self._enforce_size()
+
+    def refresh(self, url: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> Optional[str]:
+        """
+        Renova uma entrada após resposta 304 (Not Modified).
+        Retorna o corpo armazenado, ou None se a entrada não existir mais.
+        """
+        cached = self.get(url)
+        if cached is None:
+            return None
+        self.put(url, cached.body, etag or cached.etag, last_modified or cached.last_modified)
+        return cached.body
+
+    def discard(self, url: str) -> None:
+        """Remove a entrada da URL, se existir."""
+        self._remove(self._path(url))
+
+    def _remove(self, path: Path) -> None:
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except OSError:
+            return
+        with self._lock:
+            if self._total_bytes is not None:
+                self._total_bytes -= size
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        entries = []
+        for path in self._dir.glob("*/*.z"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def size(self) -> int:
+        """Tamanho total das entradas em disco (bytes comprimidos)."""
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(size for _, size, _ in self._entries())
+            return self._total_bytes
+
+    def _enforce_size(self) -> None:
+        if self.size() <= self._max_bytes:
+            return
+        evicted = 0
+        for _, _, path in sorted(self._entries(), key=lambda e: e[0]):
+            if self.size() <= self._max_bytes:
+                break
+            self._remove(path)
+            evicted += 1
+        logger.info("cache_evicted", entries=evicted, size=self.size(), max_bytes=self._max_bytes)
+
+class CacheWriter:
+    """Gravação incremental de uma entrada do cache (ver ResponseCache.writer)."""
+
+    def __init__(self, cache: ResponseCache, path: Path, header: bytes):
+        self._cache = cache
+        self._path = path
+        self._compressor = zlib.compressobj(6)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._tmp = path.with_suffix(f".tmp{os.getpid()}.{threading.get_ident()}")
+        self._file = self._tmp.open("wb")
+        self._file.write(header)
+
+    def write(self, text: str) -> None:
+        self._file.write(self._compressor.compress(text.encode("utf-8")))
+
+    def commit(self) -> None:
+        self._file.write(self._compressor.flush())
+        self._file.close()
+        self._cache._commit(self._tmp, self._path)
+
+    def discard(self) -> None:
+        self._file.close()
+        try:
+            self._tmp.unlink()
+        except OSError:
+            pass
+
+    def __enter__(self) -> "CacheWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.discard()
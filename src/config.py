@@ -1,12 +1,24 @@
 import pathlib
 import sys
 import logging
-from typing import TextIO
+from typing import List, TextIO
 
 import structlog
 import yaml
 
-from .models import Config, LoggingConfig, ScheduleConfig, StorageConfig, AdvancedMatchRule
+from .expression import ExpressionError, parse_expression
+from .fuzzy import check_edits, parse_term
+from .models import DEFAULT_BODY_SELECTORS, CacheConfig, Config, CrawlerConfig, LoggingConfig, ParserConfig, ScheduleConfig, StorageConfig, AdvancedMatchRule
+from .parser import normalize_text
+
+def _check_terms(terms: List[str], where: str) -> None:
+    """Termos aproximados (`termo~k`) precisam ser longos o bastante para k edições."""
+    for term in terms:
+        text, max_edits = parse_term(term)
+        try:
+            check_edits(normalize_text(text), max_edits)
+        except ValueError as e:
+            raise ValueError(f"{where}: {e}") from e
 
 def load_config(config_path: str = "config.yaml") -> Config:
     """
@@ -28,19 +40,35 @@ def load_config(config_path: str = "config.yaml") -> Config:
     schedule_data = data.get("schedule", {})
     logging_data = data.get("logging", {})
     storage_data = data.get("storage", {})
+    crawler_data = data.get("crawler", {}) or {}
+    cache_data = data.get("cache", {}) or {}
+    parser_data = data.get("parser", {}) or {}
     keywords = data.get("keywords", [])
     sections = data.get("sections", ["dou1", "dou2", "dou3"])
+    _check_terms(keywords or [], "keywords")
+    if storage_data.get("format", "jsonl") not in ("jsonl", "sqlite"):
+        raise ValueError(f"storage.format inválido: '{storage_data.get('format')}' (use 'jsonl' ou 'sqlite')")
     
     rules_data = data.get("rules", [])
     rules = []
     if rules_data:
         # Load rules from yaml data list
         for r in rules_data:
+            expression_text = r.get("expression") or ""
+            if expression_text:
+                if r.get("body_terms"):
+                    raise ValueError(f"Regra '{r.get('name')}': use 'expression' ou 'body_terms', não os dois")
+                try:
+                    parse_expression(expression_text)
+                except ExpressionError as e:
+                    raise ValueError(f"Regra '{r.get('name')}': expressão inválida: {e}") from e
+            _check_terms(r.get("body_terms") or [], f"Regra '{r.get('name')}'")
             rules.append(AdvancedMatchRule(
                 name=r.get("name"),
                 body_terms=r.get("body_terms", []),
                 title_terms=r.get("title_terms", []),
-                sections=r.get("sections", [])
+                sections=r.get("sections", []),
+                expression=expression_text
             ))
 
     # Construct Config object using unpacked dictionaries for nested configs
@@ -53,7 +81,11 @@ def load_config(config_path: str = "config.yaml") -> Config:
         keywords=keywords,
         storage=StorageConfig(
             output_dir=storage_data.get("output_dir", "data"),
-            format=storage_data.get("format", "jsonl")
+            format=storage_data.get("format", "jsonl"),
+            journal_dir=storage_data.get("journal_dir", ".journal"),
+            coalesce_contexts=bool(storage_data.get("coalesce_contexts", False)),
+            write_buffer_kb=int(storage_data.get("write_buffer_kb", 256)),
+            flush_seconds=float(storage_data.get("flush_seconds", 5.0))
         ),
         logging=LoggingConfig(
             level=logging_data.get("level", "INFO"),
@@ -61,8 +93,64 @@ def load_config(config_path: str = "config.yaml") -> Config:
         ),
         sections=sections,
         rules=rules,
+        crawler=CrawlerConfig(
+            base_url=crawler_data.get("base_url", "https://www.in.gov.br"),
+            requests_per_second=float(crawler_data.get("requests_per_second", 0.12)),
+            min_requests_per_second=float(crawler_data.get("min_requests_per_second", 0.03)),
+            max_requests_per_second=float(crawler_data.get("max_requests_per_second", 0.2)),
+            latency_target_seconds=float(crawler_data.get("latency_target_seconds", 3.0)),
+            burst=int(crawler_data.get("burst", 1)),
+            max_workers=int(crawler_data.get("max_workers", 4)),
+            per_host_concurrency=int(crawler_data.get("per_host_concurrency", 4)),
+            pool_size=int(crawler_data.get("pool_size", 8)),
+            warmup=bool(crawler_data.get("warmup", True)),
+            breaker_failure_threshold=int(crawler_data.get("breaker_failure_threshold", 5)),
+            breaker_reset_seconds=float(crawler_data.get("breaker_reset_seconds", 60.0)),
+            deferred_max_attempts=int(crawler_data.get("deferred_max_attempts", 3))
+        ),
+        cache=CacheConfig(
+            enabled=bool(cache_data.get("enabled", True)),
+            directory=cache_data.get("directory", ".cache/http"),
+            max_size_mb=int(cache_data.get("max_size_mb", 512)),
+            listing_ttl_seconds=int(cache_data.get("listing_ttl_seconds", 3600))
+        ),
+        parser=ParserConfig(
+            body_selectors=list(parser_data.get("body_selectors") or DEFAULT_BODY_SELECTORS),
+            workers=int(parser_data.get("workers", 0)),
+            max_in_flight=int(parser_data.get("max_in_flight", 0)),
+            streaming=bool(parser_data.get("streaming", False))
+        ),
     )
 
+DEFAULT_SECTIONS = ["dou1", "dou2", "dou3"]
+
+def rules_for_section(cfg: Config, section: str) -> List[AdvancedMatchRule]:
+    """Regras aplicáveis à seção (regras sem seções definidas valem para todas)."""
+    return [r for r in cfg.rules if not getattr(r, "sections", None) or section in r.sections]
+
+def keywords_for_section(cfg: Config, section: str) -> List[str]:
+    """Keywords globais, se a seção estiver entre as seções globais."""
+    global_sections = cfg.sections if getattr(cfg, "sections", None) else DEFAULT_SECTIONS
+    return list(cfg.keywords) if section in global_sections else []
+
+def sections_to_process(cfg: Config) -> List[str]:
+    """
+    Seções necessárias para a configuração, em ordem: as globais (se houver keywords
+    simples ou regras sem seção) mais as seções específicas de cada regra.
+    """
+    global_sections = cfg.sections if getattr(cfg, "sections", None) else DEFAULT_SECTIONS
+    sections = set()
+    if cfg.keywords:
+        sections.update(global_sections)
+    for rule in cfg.rules:
+        if getattr(rule, "sections", None):
+            sections.update(rule.sections)
+        else:
+            # Se regra não tem seção, usa global
+            sections.update(global_sections)
+    # Se ainda estiver vazio, fallback
+    return sorted(sections) if sections else list(DEFAULT_SECTIONS)
+
 def setup_logging(config: Config) -> None:
     """
     Configura structlog e log padrão com base na configuração.
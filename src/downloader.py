@@ -1,21 +1,161 @@
+import atexit
+import codecs
+import json
 import re
 import datetime
+import threading
+import time
 import requests
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin, unquote
 import structlog
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception
+from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception, RetryCallState
+
+from .cache import ResponseCache
+from .http_session import SessionManager
+from .models import ArticleDocument, ArticleStub, CacheConfig, CrawlerConfig
+from .parser import PAGE_STRATEGY, StreamingArticleParser, normalize_text, parse_article
+from .ratelimit import AdaptiveRateController, TokenBucket
 
 logger = structlog.get_logger()
 
 BASE_URL = "https://www.in.gov.br"
 URL_LEITURA = f"{BASE_URL}/leiturajornal"
 
+# Servidor efetivamente usado (configurável para apontar a um servidor local de testes/benchmark)
+_base_url = BASE_URL
+
 # Imita um navegador padrão para evitar bloqueios
 HEADERS = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
+    "Accept-Language": "pt-BR,pt;q=0.9,en-US;q=0.8,en;q=0.7",
+    "Cache-Control": "max-age=0",
+    "Sec-Ch-Ua": '"Not A(Brand";v="99", "Google Chrome";v="121", "Chromium";v="121"',
+    "Sec-Ch-Ua-Mobile": "?0",
+    "Sec-Ch-Ua-Platform": '"Windows"',
+    "Sec-Fetch-Dest": "document",
+    "Sec-Fetch-Mode": "navigate",
+    "Sec-Fetch-Site": "none",
+    "Sec-Fetch-User": "?1",
+    "Upgrade-Insecure-Requests": "1"
 }
 
+# Pausas Retry-After maiores que isso não são esperadas dentro da mesma chamada
+MAX_INLINE_RETRY_AFTER = 120
+
+# Orçamento entre processos (backfill); quando definido, substitui o balde local
+_shared_budget: TokenBucket | None = None
+
+def use_shared_budget(bucket: TokenBucket | None) -> None:
+    """
+    Faz este processo consumir um orçamento compartilhado (ex.: SharedTokenBucket do
+    backfill) em vez de criar um balde próprio em configure().
+    """
+    global _shared_budget
+    _shared_budget = bucket
+
+def _build_rate_control(crawler: CrawlerConfig) -> tuple[TokenBucket, AdaptiveRateController]:
+    if _shared_budget is not None:
+        bucket = _shared_budget
+    else:
+        bucket = TokenBucket(rate=crawler.requests_per_second, capacity=crawler.burst)
+    controller = AdaptiveRateController(
+        bucket,
+        min_rate=crawler.min_requests_per_second,
+        # Uma taxa base acima do teto é opção explícita: o teto não a reduz
+        max_rate=max(crawler.max_requests_per_second, crawler.requests_per_second),
+        latency_target=crawler.latency_target_seconds,
+    )
+    return bucket, controller
+
+# Orçamento global compartilhado por listagens de seção e artigos (substitui o sleep fixo),
+# ajustado dinamicamente pelo controlador AIMD conforme as respostas do servidor
+_rate_limiter, _controller = _build_rate_control(CrawlerConfig())
+
+def discard_cached(url: str) -> None:
+    """
+    Retira a resposta de uma URL do cache (ex.: página de artigo sem o corpo do ato,
+    servida com status 200 numa manutenção), para que a próxima execução a baixe de novo.
+    """
+    cache = _cache
+    if cache is not None:
+        cache.discard(url)
+
+def wait_for_budget() -> float:
+    """
+    Espera a vez de uma requisição no orçamento global: pausas Retry-After ativas e
+    um token do balde. Retorna os segundos de espera.
+    """
+    return _controller.wait_for_clearance() + _rate_limiter.acquire()
+
+# Sessão HTTP compartilhada (keep-alive, compressão, cookies); o aquecimento também consome o orçamento
+_sessions = SessionManager(HEADERS, pool_size=CrawlerConfig.pool_size, warmup_url=URL_LEITURA, throttle=wait_for_budget)
+
+# Cache de respostas em disco (desligado até configure() receber um CacheConfig habilitado)
+_cache: ResponseCache | None = None
+
+# Configuração aplicada por configure() (None = ainda não configurado, ou fechado)
+_configured: tuple | None = None
+_configure_lock = threading.Lock()
+
+def configure(crawler: CrawlerConfig, cache: CacheConfig | None = None) -> None:
+    """
+    Configura o orçamento global de requisições, a sessão HTTP e o cache de respostas
+    do processo. Chamadas com a mesma configuração não fazem nada: execuções seguidas
+    ou simultâneas (ex.: buscas do painel) mantêm a sessão, o controle de taxa e suas
+    pausas. Uma configuração diferente (ou uma chamada depois de close()) os recria.
+    """
+    global _configured
+    with _configure_lock:
+        key = (crawler, cache, _shared_budget)
+        if key == _configured:
+            return
+        _apply_configuration(crawler, cache)
+        _configured = key
+
+def _apply_configuration(crawler: CrawlerConfig, cache: CacheConfig | None) -> None:
+    global _rate_limiter, _controller, _sessions, _cache, _base_url
+    _base_url = crawler.base_url.rstrip("/")
+    _rate_limiter, _controller = _build_rate_control(crawler)
+    logger.info("rate_limiter_configured", burst=crawler.burst, **_controller.state())
+
+    _sessions.close()
+    _sessions = SessionManager(
+        HEADERS,
+        pool_size=max(crawler.pool_size, crawler.max_workers),
+        warmup_url=f"{_base_url}/leiturajornal" if crawler.warmup else None,
+        throttle=wait_for_budget,
+    )
+
+    if cache is not None and cache.enabled:
+        _cache = ResponseCache(
+            cache.directory,
+            max_bytes=cache.max_size_mb * 1024 * 1024,
+            listing_ttl=cache.listing_ttl_seconds,
+        )
+    else:
+        _cache = None
+
+@atexit.register
+def close() -> None:
+    """
+    Fecha a sessão HTTP compartilhada (conexões do pool). O próximo configure()
+    recria sessão, controle de taxa e cache mesmo com a configuração anterior.
+    """
+    global _configured
+    with _configure_lock:
+        _configured = None
+        _sessions.close()
+
+def rate_state() -> dict:
+    """Estado atual do controle de taxa (taxa, pausa Retry-After, latência, contadores)."""
+    return _controller.state()
+
+def get_session() -> requests.Session:
+    """Sessão HTTP compartilhada por todas as requisições ao in.gov.br."""
+    return _sessions.get()
+
 def get_section_url(section: str, date: datetime.date) -> str:
     """
     Constrói a URL para uma seção específica do DOU e data.
@@ -26,7 +166,7 @@ def get_section_url(section: str, date: datetime.date) -> str:
         String URL completa como 'https://www.in.gov.br/leiturajornal?secao=dou1&data=DD-MM-YYYY'
     """
     date_str = date.strftime("%d-%m-%Y")
-    return f"{URL_LEITURA}?secao={section}&data={date_str}"
+    return f"{_base_url}/leiturajornal?secao={section}&data={date_str}"
 
 def is_retryable_error(exception):
     """
@@ -37,92 +177,293 @@ def is_retryable_error(exception):
         if exception.response is not None:
             status_code = exception.response.status_code
             if status_code == 429:
-                return True
+                # Se o servidor pediu uma pausa longa, não bloqueia a execução tentando de novo agora
+                return _controller.pause_remaining() <= MAX_INLINE_RETRY_AFTER
             if 400 <= status_code < 500:
                 return False
     return isinstance(exception, requests.RequestException)
 
+def is_permanent_error(exception) -> bool:
+    """
+    True para respostas 4xx que não mudam com o tempo (ex.: 404, 410): o artigo não
+    existe ou não é acessível, então não vale adiar nem tentar de novo.
+    408 (timeout) e 429 (excesso de requisições) são passageiros.
+    """
+    if isinstance(exception, requests.HTTPError) and exception.response is not None:
+        status_code = exception.response.status_code
+        return 400 <= status_code < 500 and status_code not in (408, 429)
+    return False
+
+_exponential_wait = wait_exponential(multiplier=1, min=2, max=10)
+
+def _retry_wait(retry_state: RetryCallState) -> float:
+    """Espera exponencial, estendida até o fim de uma pausa Retry-After ativa."""
+    return max(_exponential_wait(retry_state), _controller.pause_remaining())
+
+def _log_retry(retry_state: RetryCallState) -> None:
+    logger.warning("fetch_retry_scheduled", attempt=retry_state.attempt_number, **_controller.state())
+
 @retry(
     stop=stop_after_attempt(3),
-    wait=wait_exponential(multiplier=1, min=2, max=10),
+    wait=_retry_wait,
     retry=retry_if_exception(is_retryable_error),
+    before_sleep=_log_retry,
     reraise=True
 )
 def fetch_content(url: str) -> str:
     """
     Busca o conteúdo de uma URL com tentativas repetidas.
+    Respostas em cache ainda válidas são devolvidas sem acessar a rede; entradas
+    expiradas são revalidadas com If-None-Match/If-Modified-Since.
+    Um artigo cuja análise não encontrar o corpo do ato deve ser retirado do cache
+    com discard_cached (artigos não expiram).
     """
-    logger.info("fetching_url", url=url)
-    
-    # Random sleep inside fetch_content itself, to throttle per-article requests
-    import time
-    import random
-    time.sleep(random.uniform(5.0, 12.0))
+    cache = _cache
+    cached = cache.get(url) if cache is not None else None
+    if cached is not None and cached.fresh:
+        logger.info("cache_hit", url=url)
+        return cached.body
+
+    # Cada tentativa respeita pausas Retry-After e consome um token do orçamento global
+    waited = wait_for_budget()
+    logger.info("fetching_url", url=url, throttled_seconds=round(waited, 3))
 
     try:
-        # Extra headers to mimic a real browser request even more closely
-        extra_headers = {
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
-            "Accept-Language": "pt-BR,pt;q=0.9,en-US;q=0.8,en;q=0.7",
-            "Cache-Control": "max-age=0",
-            "Sec-Ch-Ua": '"Not A(Brand";v="99", "Google Chrome";v="121", "Chromium";v="121"',
-            "Sec-Ch-Ua-Mobile": "?0",
-            "Sec-Ch-Ua-Platform": '"Windows"',
-            "Sec-Fetch-Dest": "document",
-            "Sec-Fetch-Mode": "navigate",
-            "Sec-Fetch-Site": "none",
-            "Sec-Fetch-User": "?1",
-            "Upgrade-Insecure-Requests": "1"
-        }
-        
-        # Combine default headers (which might be updated by caller) with extra headers
-        request_headers = {**HEADERS, **extra_headers}
+        started = time.monotonic()
+        try:
+            response = get_session().get(
+                url, timeout=60, headers=cached.validators() if cached is not None else None
+            )
+        except requests.RequestException:
+            _controller.record_failure()
+            raise
+        _controller.record_response(
+            response.status_code, time.monotonic() - started, response.headers.get("Retry-After")
+        )
+
+        if response.status_code == 304 and cached is not None:
+            logger.info("cache_revalidated", url=url)
+            body = cache.refresh(url, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+            return body if body is not None else cached.body
 
-        response = requests.get(url, headers=request_headers, timeout=60)
         response.raise_for_status()
+        if cache is not None:
+            cache.put(url, response.text, response.headers.get("ETag"), response.headers.get("Last-Modified"))
         return response.text
     except requests.RequestException as e:
         logger.error("fetch_failed", url=url, error=str(e))
         raise
 
-def fetch_article_urls(section: str, date: datetime.date) -> list[str]:
+# Artigos: uma única tentativa. Falhas vão para a fila de adiados (reprocessada no fim
+# da execução) em vez de prender um worker em novas tentativas com espera exponencial
+fetch_article = fetch_content.retry_with(stop=stop_after_attempt(1))
+
+# Tamanho dos blocos lidos de respostas em fluxo
+STREAM_CHUNK_SIZE = 64 * 1024
+
+@retry(
+    stop=stop_after_attempt(3),
+    wait=_retry_wait,
+    retry=retry_if_exception(is_retryable_error),
+    before_sleep=_log_retry,
+    reraise=True
+)
+def fetch_document(url: str, selectors: list[str] | None = None) -> ArticleDocument:
     """
-    Busca todas as URLs de artigos para uma dada seção e data.
-    Usa Regex para extrair dados JSON embutidos na página, o que é mais robusto
-    para a página 'Leitura do Jornal' que usa renderização no lado do cliente.
+    Como fetch_content, mas lê a resposta em fluxo e entrega cada bloco ao parser
+    incremental: o documento fica pronto quando chega o último byte, sem guardar o
+    HTML inteiro em memória. Com cache habilitado, os blocos são gravados comprimidos
+    à medida que chegam, e a entrada só é confirmada se o corpo do ato foi encontrado
+    (não com PAGE_STRATEGY); respostas em cache são analisadas com parse_article.
+    """
+    cache = _cache
+    cached = cache.get(url) if cache is not None else None
+    if cached is not None and cached.fresh:
+        logger.info("cache_hit", url=url)
+        return parse_article(cached.body, url=url, selectors=selectors)
+
+    waited = wait_for_budget()
+    logger.info("fetching_url", url=url, throttled_seconds=round(waited, 3), stream=True)
+
+    try:
+        started = time.monotonic()
+        try:
+            response = get_session().get(
+                url, timeout=60, stream=True, headers=cached.validators() if cached is not None else None
+            )
+        except requests.RequestException:
+            _controller.record_failure()
+            raise
+
+        with response:
+            # Latência até os cabeçalhos, como nas respostas lidas de uma vez
+            _controller.record_response(
+                response.status_code, time.monotonic() - started, response.headers.get("Retry-After")
+            )
+
+            if response.status_code == 304 and cached is not None:
+                logger.info("cache_revalidated", url=url)
+                body = cache.refresh(url, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+                return parse_article(body if body is not None else cached.body, url=url, selectors=selectors)
+
+            response.raise_for_status()
+            # Sem charset no Content-Type, o DOU serve UTF-8 (requests assumiria ISO-8859-1)
+            encoding = response.encoding if "charset" in response.headers.get("Content-Type", "") else "utf-8"
+            stream_parser = StreamingArticleParser(url=url, selectors=selectors, encoding=encoding)
+
+            if cache is None:
+                for chunk in response.iter_content(STREAM_CHUNK_SIZE):
+                    stream_parser.feed(chunk)
+                return stream_parser.close()
+
+            decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+            writer = cache.writer(url, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+            try:
+                for chunk in response.iter_content(STREAM_CHUNK_SIZE):
+                    stream_parser.feed(chunk)
+                    writer.write(decoder.decode(chunk))
+                writer.write(decoder.decode(b"", final=True))
+                doc = stream_parser.close()
+            except BaseException:
+                writer.discard()
+                raise
+            if doc.metadata.get("extraction") == PAGE_STRATEGY:
+                # Página sem o corpo do ato (erro ou manutenção com status 200): não fica no cache
+                writer.discard()
+                logger.warning("cache_skipped_without_body", url=url)
+            else:
+                writer.commit()
+            return doc
+    except requests.RequestException as e:
+        logger.error("fetch_failed", url=url, error=str(e))
+        raise
+
+# Versão de uma única tentativa para artigos (fila de adiados), como fetch_article
+fetch_article_document = fetch_document.retry_with(stop=stop_after_attempt(1))
+
+ARTICLE_PATH = "/web/dou/-/"
+
+# JSON embutido pela página leiturajornal: <script id="params" type="application/json">{...}</script>
+_PARAMS_SCRIPT = re.compile(r'<script[^>]*\bid=["\']params["\'][^>]*>(.*?)</script>', re.DOTALL | re.IGNORECASE)
+# regex para "urlTitle": "slug-do-artigo" (fallback se o JSON não puder ser lido)
+# Lida com variações potenciais de espaçamento
+_URL_TITLE = re.compile(r'"urlTitle"\s*:\s*"([^"]+)"')
+
+def _slug_title(slug: str) -> str:
+    return unquote(slug).replace("-", " ")
+
+def _stub_from_item(item: dict) -> ArticleStub | None:
+    slug = item.get("urlTitle")
+    if not slug:
+        return None
+    return ArticleStub(
+        url=f"{_base_url}{ARTICLE_PATH}{slug}",
+        url_title=slug,
+        title=(item.get("title") or item.get("titulo") or "").strip(),
+        art_type=(item.get("artType") or "").strip(),
+        issuing_body=(item.get("hierarchyStr") or "").strip(),
+        pub_date=(item.get("pubDate") or "").strip(),
+        edition=str(item.get("editionNumber") or "").strip(),
+        page=str(item.get("numberPage") or "").strip(),
+        summary=(item.get("content") or "").strip(),
+    )
+
+def parse_listing(html: str) -> list[ArticleStub]:
+    """
+    Converte o JSON embutido na página 'Leitura do Jornal' em ArticleStubs tipados
+    (título real do ato, tipo, órgão emissor, data, edição, página e resumo).
+    Se o JSON não for encontrado ou for inválido, recorre à extração por Regex dos
+    slugs (stubs com título derivado do slug). URLs repetidas são descartadas.
+    """
+    stubs: list[ArticleStub] = []
+    match = _PARAMS_SCRIPT.search(html)
+    if match:
+        try:
+            payload = json.loads(match.group(1))
+            items = payload.get("jsonArray", []) if isinstance(payload, dict) else []
+            stubs = [stub for stub in map(_stub_from_item, items) if stub is not None]
+        except ValueError as e:
+            logger.warning("listing_json_invalid", error=str(e))
+
+    if not stubs:
+        stubs = [
+            ArticleStub(url=f"{_base_url}{ARTICLE_PATH}{slug}", url_title=slug, title=_slug_title(slug))
+            for slug in _URL_TITLE.findall(html)
+        ]
+        if stubs:
+            logger.info("listing_regex_fallback", count=len(stubs))
+
+    unique: dict[str, ArticleStub] = {}
+    for stub in stubs:
+        unique.setdefault(stub.url, stub)
+    return list(unique.values())
+
+def fetch_article_stubs(section: str, date: datetime.date) -> list[ArticleStub]:
+    """
+    Busca os metadados de todos os atos de uma seção e data a partir de uma única
+    requisição à página de listagem.
     """
-    start_url = get_section_url(section, date)
-    collected_urls = set()
-    current_url = start_url
+    current_url = get_section_url(section, date)
     
     logger.info("start_crawling_section", section=section, date=str(date))
     
-    # regex para "urlTitle": "slug-do-artigo"
-    # Lida com variações potenciais de espaçamento
-    regex_slug = re.compile(r'"urlTitle"\s*:\s*"([^"]+)"')
-    
     try:
         html = fetch_content(current_url)
-        
-        # 1. Extração por Regex (Estratégia Primária para Dados)
-        slugs = regex_slug.findall(html)
-        logger.info("regex_extraction", count=len(slugs), url=current_url)
-        
-        for slug in slugs:
-             full_url = f"https://www.in.gov.br/web/dou/-/{slug}"
-             collected_urls.add(full_url)
-        
+        stubs = parse_listing(html)
     except Exception as e:
         logger.error("crawl_step_failed", url=current_url, error=str(e))
         raise e
 
-    logger.info("finished_crawling_section", total_urls=len(collected_urls))
-    return list(collected_urls)
+    logger.info("finished_crawling_section", total_urls=len(stubs))
+    return stubs
 
-def apply_url_filtering(urls: list[str], rules: list) -> list[str]:
+def fetch_article_urls(section: str, date: datetime.date) -> list[str]:
+    """
+    Busca todas as URLs de artigos para uma dada seção e data.
     """
-    Filtra a lista de URLs baseada nas regras de Title Terms.
-    Se uma regra tiver title_terms, a URL (slug) deve conter pelo menos um deles.
+    return [stub.url for stub in fetch_article_stubs(section, date)]
+
+def _rule_attr(rule, name: str) -> list:
+    # Check attribute access safely (dict vs object)
+    return getattr(rule, name, []) if hasattr(rule, name) else rule.get(name, [])
+
+def _filter_text(item: ArticleStub | str) -> str:
+    """Texto usado na filtragem: título real do stub, ou o slug da URL."""
+    if isinstance(item, ArticleStub):
+        return normalize_text(item.title or _slug_title(item.url_title))
+    # slug is the part after "/-/"
+    # Normalize: "portaria-mjsp-123" -> "portaria mjsp 123"
+    return normalize_text(_slug_title(item.split("/-/")[-1]))
+
+def partition_by_rules(items: list, section_plan) -> dict:
+    """
+    Regras de corpo candidatas de cada ato (URL -> regras), pelo título da listagem ou
+    pelo slug da URL, comparado sem acentos com os title_terms já compilados do plano
+    da seção (SectionPlan.candidate_rules). Só entram atos com ao menos uma candidata.
+    Uma regra sem title_terms é candidata em todos os atos: ela sozinha ainda exige
+    baixar a seção inteira, mas não obriga os demais atos a avaliar as outras regras.
+    """
+    candidates = {}
+    for item in items:
+        url = item.url if isinstance(item, ArticleStub) else item
+        rules = section_plan.candidate_rules(_filter_text(item))
+        if rules:
+            candidates[url] = rules
+    logger.info(
+        "rule_partition_finished",
+        input_count=len(items),
+        output_count=len(candidates),
+        rule_count=len(section_plan.body_rules),
+        rule_evaluations=sum(len(rules) for rules in candidates.values()),
+    )
+    return candidates
+
+def apply_url_filtering(urls: list, rules: list) -> list:
+    """
+    Filtra a lista de artigos baseada nas regras de Title Terms.
+    Aceita URLs (filtra pelo slug) ou ArticleStubs (filtra pelo título real do ato);
+    termos e títulos são comparados sem acentos e sem diferenciar maiúsculas.
+    Se uma regra tiver title_terms, o título deve conter pelo menos um deles.
     Se uma regra não tiver title_terms (só body_terms), não podemos filtrar (retorna tudo).
     """
     if not rules:
@@ -133,8 +474,7 @@ def apply_url_filtering(urls: list[str], rules: list) -> list[str]:
     has_unfilterable_rule = False
     
     for rule in rules:
-        # Check attribute access safely (dict vs object)
-        title_terms = getattr(rule, 'title_terms', []) if hasattr(rule, 'title_terms') else rule.get('title_terms', [])
+        title_terms = _rule_attr(rule, 'title_terms')
         
         if not title_terms:
             # Rule has no title restrictions -> must check body -> must download everything
@@ -151,36 +491,22 @@ def apply_url_filtering(urls: list[str], rules: list) -> list[str]:
     filtered_urls = []
     logger.info("filtering_started", input_count=len(urls), rule_count=len(filterable_rules))
     
-    # Flatten terms for quicker check first? No, need to check per rule logic context if needed, 
-    # but actual logic is: Is this URL relevant for ANY rule?
-    # Yes, if it matches Rule A OR Rule B.
-    
+    # The actual logic is: Is this URL relevant for ANY rule?
+    # Yes, if it matches Rule A OR Rule B, so a flat set of terms is enough.
     all_relevant_terms = set()
     for terms in filterable_rules:
-        all_relevant_terms.update([t.lower() for t in terms])
+        all_relevant_terms.update(t for t in map(normalize_text, terms) if t)
         
-    for url in urls:
-        # slug is the part after "/-/"
+    for item in urls:
         try:
-            slug_part = url.split("/-/")[-1]
-            # Normalize: "portaria-mjsp-123" -> "portaria mjsp 123"
-            normalized_slug = unquote(slug_part).replace("-", " ").lower()
-            
-            # Check if any relevant term is in the slug
-            # This is an optimization: instead of checking term-by-term for each rule,
-            # since the condition is OR across rules (we want to keep if relevant for ANY),
-            # we just need to see if it matches ANY title term from ANY rule.
-            
             # Caveat: This assumes simple "contains" logic matching matcher.py
-            for term in all_relevant_terms:
-                if term in normalized_slug:
-                    filtered_urls.append(url)
-                    break
+            haystack = _filter_text(item)
+            if any(term in haystack for term in all_relevant_terms):
+                filtered_urls.append(item)
                     
         except Exception:
             # If parsing fails, keep it to be safe
-            filtered_urls.append(url)
+            filtered_urls.append(item)
             
     logger.info("filtering_finished", input_count=len(urls), output_count=len(filtered_urls))
     return filtered_urls
-
@@ -0,0 +1,271 @@
+import re
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from .fuzzy import check_edits, parse_term, term_key
+from .parser import normalize_text
+
+class ExpressionError(ValueError):
+    """Expressão de regra inválida (mensagem indica a posição do problema)."""
+
+@dataclass(frozen=True)
+class Term:
+    text: str        # Como escrito na expressão, sem o sufixo ~k (vai para MatchEntry.keyword)
+    normalized: str
+    max_edits: int = 0  # Termo aproximado (`termo~k`): até k edições
+
+    @property
+    def key(self) -> str:
+        return term_key(self.normalized, self.max_edits)
+
+@dataclass(frozen=True)
+class Not:
+    operand: "Node"
+
+@dataclass(frozen=True)
+class And:
+    operands: Tuple["Node", ...]
+
+@dataclass(frozen=True)
+class Or:
+    operands: Tuple["Node", ...]
+
+@dataclass(frozen=True)
+class Near:
+    left: Term
+    right: Term
+    distance: int  # Máximo de palavras entre um termo e outro (1 = adjacentes)
+
+Node = Union[Term, Not, And, Or, Near]
+
+# Ocorrência que sustenta a expressão: (termo, posição de início no texto normalizado)
+Hit = Tuple[Term, int]
+
+_TOKEN = re.compile(r'\s*(?:(?P<lparen>\()|(?P<rparen>\))|(?P<phrase>"[^"]*"(?:~\d+)?)|(?P<word>[^\s()"]+))')
+_NEAR = re.compile(r"NEAR/(\d+)")
+_OPERATORS = ("AND", "OR", "NOT")
+
+def _tokenize(source: str) -> List[Tuple[str, str, int]]:
+    """Tokens (tipo, valor, posição); operadores são palavras em maiúsculas."""
+    tokens = []
+    source = source.rstrip()
+    pos = 0
+    while pos < len(source):
+        match = _TOKEN.match(source, pos)
+        if match is None:
+            raise ExpressionError(f"aspas sem fechamento na posição {source.index(chr(34), pos)}")
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == "phrase":
+            # "frase"~k: o sufixo de edições fica com o texto (separado em term())
+            closing = value.rindex('"')
+            value = value[1:closing] + value[closing + 1:]
+        elif kind == "word":
+            near = _NEAR.fullmatch(value)
+            if near:
+                kind, value = "near", near.group(1)
+            elif value in _OPERATORS:
+                kind = value
+        tokens.append((kind, value, match.start(match.lastgroup)))
+        pos = match.end()
+    return tokens
+
+class _Parser:
+    """
+    Descida recursiva. Precedência (maior para menor): NOT, NEAR/n, AND, OR.
+    Palavras soltas seguidas formam uma frase; "a NOT b" equivale a "a AND NOT b".
+    """
+
+    def __init__(self, source: str):
+        self.tokens = _tokenize(source)
+        self.index = 0
+
+    def peek(self) -> Optional[Tuple[str, str, int]]:
+        return self.tokens[self.index] if self.index < len(self.tokens) else None
+
+    def take(self) -> Tuple[str, str, int]:
+        token = self.tokens[self.index]
+        self.index += 1
+        return token
+
+    def error(self, message: str) -> ExpressionError:
+        token = self.peek()
+        where = f"na posição {token[2]}" if token else "no fim da expressão"
+        return ExpressionError(f"{message} {where}")
+
+    def parse(self) -> Node:
+        if not self.tokens:
+            raise ExpressionError("expressão vazia")
+        node = self.parse_or()
+        if self.peek() is not None:
+            raise self.error("termo inesperado")
+        return node
+
+    def parse_or(self) -> Node:
+        operands = [self.parse_and()]
+        while self.peek() and self.peek()[0] == "OR":
+            self.take()
+            operands.append(self.parse_and())
+        return operands[0] if len(operands) == 1 else Or(tuple(operands))
+
+    def parse_and(self) -> Node:
+        operands = [self.parse_near()]
+        while self.peek() and self.peek()[0] in ("AND", "NOT"):
+            if self.peek()[0] == "AND":
+                self.take()
+            operands.append(self.parse_near())
+        return operands[0] if len(operands) == 1 else And(tuple(operands))
+
+    def parse_near(self) -> Node:
+        left = self.parse_unary()
+        token = self.peek()
+        if token is None or token[0] != "near":
+            return left
+        self.take()
+        right = self.parse_unary()
+        if not isinstance(left, Term) or not isinstance(right, Term):
+            raise ExpressionError(f"NEAR/{token[1]} só aceita termos ou frases dos dois lados (posição {token[2]})")
+        return Near(left, right, int(token[1]))
+
+    def parse_unary(self) -> Node:
+        token = self.peek()
+        if token is None:
+            raise self.error("termo esperado")
+        kind = token[0]
+        if kind == "NOT":
+            self.take()
+            return Not(self.parse_unary())
+        if kind == "lparen":
+            self.take()
+            node = self.parse_or()
+            if not self.peek() or self.peek()[0] != "rparen":
+                raise self.error("')' esperado")
+            self.take()
+            return node
+        if kind == "phrase":
+            self.take()
+            return self.term(token[1], token[2])
+        if kind == "word":
+            words = []
+            while self.peek() and self.peek()[0] == "word":
+                words.append(self.take()[1])
+            return self.term(" ".join(words), token[2])
+        raise self.error("termo esperado")
+
+    def term(self, text: str, position: int) -> Term:
+        text, max_edits = parse_term(text)
+        normalized = normalize_text(text).strip()
+        if not normalized:
+            raise ExpressionError(f"termo vazio na posição {position}")
+        try:
+            check_edits(normalized, max_edits)
+        except ValueError as e:
+            raise ExpressionError(f"{e} (posição {position})") from None
+        return Term(text.strip(), normalized, max_edits)
+
+def parse_expression(source: str) -> Node:
+    """
+    Converte a expressão de uma regra em árvore. Sintaxe:
+    - termo: palavras soltas (`força nacional`) ou frase entre aspas (`"força nacional"`);
+      com sufixo `~k` (`força nacional~1`, `"força nacional"~1`), aceita até k edições;
+    - `a AND b`, `a OR b`, `NOT a`, `a NOT b` (= `a AND NOT b`) e parênteses;
+    - `a NEAR/n b`: os dois termos, em qualquer ordem, a até n palavras um do outro.
+    Operadores só em maiúsculas. A expressão precisa de ao menos um termo fora de NOT.
+    """
+    node = _Parser(source).parse()
+    if not positive_terms(node):
+        raise ExpressionError("a expressão precisa de ao menos um termo que não esteja negado")
+    return node
+
+def terms(node: Node) -> List[Term]:
+    """Todos os termos da expressão (inclusive os negados), na ordem em que aparecem."""
+    if isinstance(node, Term):
+        return [node]
+    if isinstance(node, Not):
+        return terms(node.operand)
+    if isinstance(node, Near):
+        return [node.left, node.right]
+    return [term for operand in node.operands for term in terms(operand)]
+
+def positive_terms(node: Node) -> List[Term]:
+    """Termos que podem sustentar uma correspondência (fora de NOT)."""
+    if isinstance(node, Not):
+        return []
+    if isinstance(node, (Term, Near)):
+        return terms(node)
+    return [term for operand in node.operands for term in positive_terms(operand)]
+
+def contains_near(node: Node) -> bool:
+    """Se a avaliação precisa das posições em palavras (word_locator)."""
+    if isinstance(node, Near):
+        return True
+    if isinstance(node, Not):
+        return contains_near(node.operand)
+    if isinstance(node, (And, Or)):
+        return any(contains_near(operand) for operand in node.operands)
+    return False
+
+def word_locator(text: str) -> Callable[[int], int]:
+    """Função posição no texto -> índice da palavra (separadas por espaço) que a contém."""
+    starts = [match.start() for match in re.finditer(r"\S+", text)]
+    return lambda position: bisect_right(starts, position) - 1
+
+def evaluate(
+    node: Node,
+    hits: Dict[str, Sequence[int]],
+    word_at: Optional[Callable[[int], int]] = None,
+) -> Optional[List[Hit]]:
+    """
+    Avalia a expressão sobre as listas de posições da varredura única (termo
+    (chave do termo -> inícios). Retorna None se a expressão for falsa; senão, as
+    ocorrências que a sustentam (vazia para um NOT satisfeito). word_at é exigido
+    quando há NEAR (ver word_locator).
+    """
+    if isinstance(node, Term):
+        positions = hits.get(node.key)
+        return [(node, start) for start in positions] if positions else None
+
+    if isinstance(node, Not):
+        return [] if evaluate(node.operand, hits, word_at) is None else None
+
+    if isinstance(node, And):
+        witnesses: List[Hit] = []
+        for operand in node.operands:
+            result = evaluate(operand, hits, word_at)
+            if result is None:
+                return None
+            witnesses.extend(result)
+        return witnesses
+
+    if isinstance(node, Or):
+        results = [evaluate(operand, hits, word_at) for operand in node.operands]
+        if all(result is None for result in results):
+            return None
+        return [hit for result in results if result for hit in result]
+
+    # Near: pares de ocorrências a até `distance` palavras (da última palavra do primeiro
+    # termo à primeira do segundo); só as ocorrências que formam algum par sustentam a regra
+    left = hits.get(node.left.key) or ()
+    right = hits.get(node.right.key) or ()
+    if not left or not right:
+        return None
+    if word_at is None:
+        raise ValueError("word_at é obrigatório para avaliar NEAR")
+
+    def span(term: Term, start: int) -> Tuple[int, int]:
+        return word_at(start), word_at(start + len(term.normalized) - 1)
+
+    left_spans = [(start, *span(node.left, start)) for start in left]
+    right_spans = [(start, *span(node.right, start)) for start in right]
+    near_left, near_right = set(), set()
+    # Listas curtas (ocorrências de um termo num ato): comparação direta dos pares
+    for l_start, l_first, l_last in left_spans:
+        for r_start, r_first, r_last in right_spans:
+            gap = r_first - l_last if l_first <= r_first else l_first - r_last
+            if gap <= node.distance:
+                near_left.add(l_start)
+                near_right.add(r_start)
+    if not near_left:
+        return None
+    return [(node.left, start) for start in sorted(near_left)] + [(node.right, start) for start in sorted(near_right)]
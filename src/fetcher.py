@@ -0,0 +1,186 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, Optional
+from urllib.parse import urlsplit
+
+import structlog
+
+logger = structlog.get_logger()
+
+@dataclass
+class FetchResult:
+    url: str
+    content: Optional[str] = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+class HostLimiter:
+    """
+    Limita o número de requisições simultâneas por host.
+    O ritmo global (requisições por segundo) é controlado separadamente pelo balde
+    de tokens do downloader; aqui controlamos apenas a concorrência.
+    """
+
+    def __init__(self, per_host: int):
+        self._per_host = max(1, per_host)
+        self._semaphores: dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def for_url(self, url: str) -> threading.BoundedSemaphore:
+        host = urlsplit(url).netloc
+        with self._lock:
+            sem = self._semaphores.get(host)
+            if sem is None:
+                sem = threading.BoundedSemaphore(self._per_host)
+                self._semaphores[host] = sem
+            return sem
+
+class CircuitOpenError(Exception):
+    """Requisição recusada sem ir à rede porque o circuito do host está aberto."""
+
+class CircuitBreaker:
+    """
+    Disjuntor por host: após `failure_threshold` falhas seguidas o circuito abre e as
+    requisições ao host falham imediatamente (CircuitOpenError). Passados
+    `reset_seconds`, uma única requisição de sonda é liberada (meio-aberto): sucesso
+    fecha o circuito, falha o reabre por mais `reset_seconds`. Com allow(wait=True),
+    as demais requisições ao host esperam o resultado da sonda em vez de falhar.
+    `trips_on` decide quais erros contam como falha do host (ex.: um 404 não conta:
+    o servidor respondeu normalmente).
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_seconds: float = 60.0,
+        trips_on: Optional[Callable[[Exception], bool]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self._trips_on = trips_on
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._probe_done = threading.Condition(self._lock)  # Avisado quando uma sonda termina
+        self._failures: dict[str, int] = {}
+        self._opened_at: dict[str, float] = {}
+        self._probing: set[str] = set()
+
+    def _state(self, host: str) -> str:
+        opened_at = self._opened_at.get(host)
+        if opened_at is None:
+            return self.CLOSED
+        if self._clock() - opened_at >= self.reset_seconds:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def state(self, url: str) -> str:
+        with self._lock:
+            return self._state(urlsplit(url).netloc)
+
+    def retry_in(self, url: str) -> float:
+        """Segundos até a próxima sonda do host (0 se o circuito não está aberto)."""
+        host = urlsplit(url).netloc
+        with self._lock:
+            opened_at = self._opened_at.get(host)
+            if opened_at is None:
+                return 0.0
+            return max(0.0, opened_at + self.reset_seconds - self._clock())
+
+    def allow(self, url: str, wait: bool = False) -> bool:
+        """
+        True se a requisição pode seguir; no estado meio-aberto libera só uma sonda por vez.
+        Com wait, uma requisição que chega durante a sonda espera o resultado dela: segue
+        se o circuito fechou, é recusada se reabriu.
+        """
+        host = urlsplit(url).netloc
+        with self._lock:
+            while True:
+                state = self._state(host)
+                if state == self.CLOSED:
+                    return True
+                if state == self.HALF_OPEN and host not in self._probing:
+                    self._probing.add(host)
+                    logger.info("circuit_half_open_probe", host=host)
+                    return True
+                if state == self.OPEN or not wait:
+                    return False
+                self._probe_done.wait()
+
+    def record_success(self, url: str) -> None:
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host in self._opened_at:
+                logger.info("circuit_closed", host=host)
+            self._failures.pop(host, None)
+            self._opened_at.pop(host, None)
+            self._probing.discard(host)
+            self._probe_done.notify_all()
+
+    def record_failure(self, url: str, error: Optional[Exception] = None) -> None:
+        if error is not None and self._trips_on is not None and not self._trips_on(error):
+            self.record_success(url)
+            return
+        host = urlsplit(url).netloc
+        with self._lock:
+            failures = self._failures.get(host, 0) + 1
+            self._failures[host] = failures
+            probe_failed = host in self._probing
+            self._probing.discard(host)
+            self._probe_done.notify_all()
+            if probe_failed or failures >= self.failure_threshold:
+                if probe_failed or host not in self._opened_at:
+                    logger.warning("circuit_opened", host=host, failures=failures, reset_seconds=self.reset_seconds)
+                self._opened_at[host] = self._clock()
+
+def fetch_many(
+    urls: Iterable[str],
+    fetch_fn: Callable[[str], str],
+    max_workers: int = 4,
+    per_host_concurrency: int = 4,
+    breaker: Optional[CircuitBreaker] = None,
+) -> Iterator[FetchResult]:
+    """
+    Busca várias URLs em paralelo usando um pool de threads.
+    Os resultados são entregues na ordem em que ficam prontos, para que o chamador
+    possa processar (parse/match/armazenamento) enquanto o restante ainda baixa.
+    Erros não interrompem o lote: são devolvidos em FetchResult.error.
+    Com um breaker, URLs de host com circuito aberto voltam com CircuitOpenError sem acessar
+    a rede; durante a sonda do meio-aberto, as demais esperam o resultado dela.
+    """
+    url_list = list(urls)
+    if not url_list:
+        return
+
+    limiter = HostLimiter(per_host_concurrency)
+
+    def task(url: str) -> FetchResult:
+        with limiter.for_url(url):
+            if breaker is not None and not breaker.allow(url, wait=True):
+                return FetchResult(url=url, error=CircuitOpenError(urlsplit(url).netloc))
+            try:
+                content = fetch_fn(url)
+            except Exception as e:
+                if breaker is not None:
+                    breaker.record_failure(url, e)
+                return FetchResult(url=url, error=e)
+            if breaker is not None:
+                breaker.record_success(url)
+            return FetchResult(url=url, content=content)
+
+    workers = max(1, min(max_workers, len(url_list)))
+    logger.info("fetch_batch_started", count=len(url_list), workers=workers)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fetch") as pool:
+        futures = [pool.submit(task, url) for url in url_list]
+        for future in as_completed(futures):
+            yield future.result()
@@ -0,0 +1,212 @@
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+# Sufixo que torna um termo aproximado: "força nacional~1" aceita até 1 edição
+_EDITS_SUFFIX = re.compile(r"~(\d+)\s*$")
+
+def parse_term(term: str) -> Tuple[str, int]:
+    """Separa o termo do sufixo ~k (máximo de edições); sem sufixo, k = 0 (busca exata)."""
+    match = _EDITS_SUFFIX.search(term)
+    if match is None:
+        return term, 0
+    return term[:match.start()].rstrip(), int(match.group(1))
+
+def term_key(normalized: str, max_edits: int) -> str:
+    """Chave das ocorrências de um termo (exato e aproximado são termos distintos)."""
+    return f"{normalized}~{max_edits}" if max_edits else normalized
+
+def check_edits(normalized: str, max_edits: int) -> None:
+    """Com k edições num termo curto quase tudo corresponde: exige mais que 2k caracteres."""
+    if max_edits < 0 or (max_edits and len(normalized) <= 2 * max_edits):
+        raise ValueError(f"termo '{normalized}' curto demais para ~{max_edits} (precisa de mais de {2 * max_edits} caracteres)")
+
+@dataclass(frozen=True)
+class FuzzyHit:
+    start: int
+    end: int
+    distance: int  # Edições (inserção, remoção ou troca de caractere); 0 = ocorrência exata
+
+class FuzzyPattern:
+    """
+    Busca aproximada de um termo (distância de edição <= k) pelo algoritmo
+    bit-paralelo de Myers: uma coluna inteira da matriz de distâncias é atualizada
+    com poucas operações sobre inteiros por caractere do texto, então a varredura é
+    linear no tamanho do texto (não compara o termo com cada trecho).
+
+    Antes da varredura, um filtro de casas de pombo: partido o termo em k+1 pedaços,
+    toda ocorrência com até k edições contém algum pedaço intacto. Os pedaços são
+    localizados com str.find e só as janelas ao redor deles passam pelo Myers.
+    """
+
+    def __init__(self, pattern: str, max_edits: int):
+        check_edits(pattern, max_edits)
+        self.pattern = pattern
+        self.max_edits = max_edits
+        length = len(pattern)
+        self._mask = (1 << length) - 1
+        self._high = 1 << (length - 1)
+        self._peq: Dict[str, int] = {}
+        for i, ch in enumerate(pattern):
+            self._peq[ch] = self._peq.get(ch, 0) | (1 << i)
+
+        pieces = max_edits + 1
+        bounds = [length * i // pieces for i in range(pieces + 1)]
+        self._pieces = [(bounds[i], pattern[bounds[i]:bounds[i + 1]]) for i in range(pieces)]
+
+    def search(self, text: str) -> List[FuzzyHit]:
+        """
+        Ocorrências sem sobreposição, da esquerda para a direita (como a busca exata).
+        Nenhuma ocorrência possível fica de fora: toda ocorrência com até k edições
+        sobrepõe alguma das devolvidas.
+        """
+        hits: List[FuzzyHit] = []
+        next_free = 0
+        for lo, hi in self._windows(text):
+            for run in self._runs(text, lo, hi):
+                next_free = self._pick(text, run, next_free, hits)
+        return hits
+
+    def _windows(self, text: str) -> List[Tuple[int, int]]:
+        """Trechos que podem conter uma ocorrência (ao redor de pedaços intactos), já unidos."""
+        length, k = len(self.pattern), self.max_edits
+        windows = []
+        for offset, piece in self._pieces:
+            idx = text.find(piece)
+            while idx >= 0:
+                origin = idx - offset
+                windows.append((max(0, origin - k), min(len(text), origin + length + k)))
+                idx = text.find(piece, idx + 1)
+        windows.sort()
+
+        merged: List[Tuple[int, int]] = []
+        for lo, hi in windows:
+            if merged and lo <= merged[-1][1]:
+                if hi > merged[-1][1]:
+                    merged[-1] = (merged[-1][0], hi)
+            else:
+                merged.append((lo, hi))
+        return merged
+
+    def _runs(self, text: str, lo: int, hi: int) -> Iterator[List[Tuple[int, int]]]:
+        """
+        Fins (exclusivos) das ocorrências em text[lo:hi], com a menor distância de
+        cada um, agrupados em sequências: fins consecutivos dentro do limite são a
+        mesma ocorrência, até a distância voltar a cair depois de subir (um novo vale
+        é outra ocorrência encostada na anterior).
+        """
+        peq, mask, high, k = self._peq, self._mask, self._high, self.max_edits
+        pv, mv, score = mask, 0, len(self.pattern)
+        run: List[Tuple[int, int]] = []  # (fim, distância)
+        rising = False
+
+        for pos in range(lo, hi):
+            eq = peq.get(text[pos], 0)
+            xv = eq | mv
+            xh = (((eq & pv) + pv) ^ pv) | eq
+            ph = mv | (~(xh | pv) & mask)
+            mh = pv & xh
+            if ph & high:
+                score += 1
+            elif mh & high:
+                score -= 1
+            ph = (ph << 1) & mask
+            mh = (mh << 1) & mask
+            pv = mh | (~(xv | ph) & mask)
+            mv = ph & xv
+
+            if score > k:
+                continue
+            end = pos + 1
+            if run and run[-1][0] == pos:
+                previous = run[-1][1]
+                if score > previous:
+                    rising = True
+                elif score < previous and rising:
+                    yield run
+                    run, rising = [], False
+                run.append((end, score))
+            else:
+                if run:
+                    yield run
+                run, rising = [(end, score)], False
+        if run:
+            yield run
+
+    def _pick(self, text: str, run: List[Tuple[int, int]], lower: int, hits: List[FuzzyHit]) -> int:
+        """
+        Escolhe as ocorrências de uma sequência de fins que começam em lower ou depois:
+        a de menor distância (de preferência terminando numa fronteira de palavra), as
+        que cabem antes dela e, em seguida, as que vêm depois. Retorna o novo limite.
+        """
+        while run:
+            # A distância de Myers é um piso para a de uma ocorrência que começa em lower ou depois:
+            # só o fim escolhido passa pela programação dinâmica, e a escolha é refeita se o piso subir
+            bounds = {end: score for end, score in run if end > lower}
+            exact: Dict[int, Tuple[int, int]] = {}
+            while bounds:
+                end = min(bounds, key=lambda e: (bounds[e], not _at_boundary(text, e), e))
+                if end in exact:
+                    break
+                exact[end] = self._best_start(text, end, lower)
+                if exact[end][1] > self.max_edits:
+                    del bounds[end]
+                else:
+                    bounds[end] = exact[end][1]
+            if not bounds:
+                break
+
+            start, distance = exact[end]
+            lower = self._pick(text, [item for item in run if item[0] <= start], lower, hits)
+            hits.append(FuzzyHit(start, end, distance))
+            run, lower = [item for item in run if item[0] > end], end
+        return lower
+
+    def _best_start(self, text: str, end: int, lower: int = 0) -> Tuple[int, int]:
+        """
+        Início (em lower ou depois) da ocorrência que termina em end: programação
+        dinâmica de trás para frente numa janela curta.
+        """
+        pattern = self.pattern[::-1]
+        length, k = len(pattern), self.max_edits
+        window = text[max(lower, end - length - k):end][::-1]
+
+        previous = list(range(length + 1))
+        best = (previous[length], 0)  # (distância, tamanho)
+        for size, ch in enumerate(window, 1):
+            current = [size]
+            for i in range(1, length + 1):
+                current.append(min(
+                    previous[i] + 1,
+                    current[i - 1] + 1,
+                    previous[i - 1] + (pattern[i - 1] != ch),
+                ))
+            previous = current
+            distance = current[length]
+            if distance < best[0] or (distance == best[0] and abs(size - length) < abs(best[1] - length)):
+                best = (distance, size)
+        return end - best[1], best[0]
+
+def _at_boundary(text: str, end: int) -> bool:
+    return end >= len(text) or not text[end].isalnum()
+
+class FuzzyTerms:
+    """Conjunto de termos aproximados de uma seção, montado uma vez (como o TermAutomaton)."""
+
+    def __init__(self, terms: Iterable[Tuple[str, int]]):
+        unique = dict.fromkeys((normalized, edits) for normalized, edits in terms if normalized and edits)
+        self._patterns = [FuzzyPattern(normalized, edits) for normalized, edits in unique]
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    def search(self, text: str) -> Dict[str, List[FuzzyHit]]:
+        """Ocorrências por chave de termo (term_key), só dos termos encontrados."""
+        found: Dict[str, List[FuzzyHit]] = {}
+        if not text:
+            return found
+        for pattern in self._patterns:
+            hits = pattern.search(text)
+            if hits:
+                found[term_key(pattern.pattern, pattern.max_edits)] = hits
+        return found
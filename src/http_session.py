@@ -0,0 +1,78 @@
+import threading
+from typing import Callable, Mapping, Optional
+
+import requests
+import structlog
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+
+logger = structlog.get_logger()
+
+# urllib3 já calcula as codificações que consegue decodificar:
+# "gzip,deflate" sempre, "br" quando brotli/brotlicffi está instalado (extra opcional).
+SUPPORTED_ENCODINGS = ACCEPT_ENCODING
+
+class SessionManager:
+    """
+    Mantém uma única requests.Session compartilhada entre as threads de download:
+    pool de conexões dimensionado (keep-alive), negociação de compressão,
+    jar de cookies comum e aquecimento (cookie handshake) no primeiro uso.
+    throttle, se informado, é chamado antes da requisição de aquecimento (ex.: a
+    espera do orçamento global de requisições).
+    """
+
+    def __init__(
+        self,
+        headers: Mapping[str, str],
+        pool_size: int = 8,
+        warmup_url: Optional[str] = None,
+        timeout: float = 30,
+        throttle: Optional[Callable[[], object]] = None,
+    ):
+        self._headers = dict(headers)
+        self._pool_size = max(1, pool_size)
+        self._warmup_url = warmup_url
+        self._timeout = timeout
+        self._throttle = throttle
+        self._session: Optional[requests.Session] = None
+        self._lock = threading.Lock()
+
+    def _build(self) -> requests.Session:
+        session = requests.Session()
+        session.headers.update(self._headers)
+        session.headers["Accept-Encoding"] = SUPPORTED_ENCODINGS
+        session.headers["Connection"] = "keep-alive"
+
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self._pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def _warmup(self, session: requests.Session) -> None:
+        # Visitar a página inicial primeiro define os cookies que evitam a página de bloqueio
+        if self._throttle is not None:
+            self._throttle()
+        try:
+            session.get(self._warmup_url, timeout=self._timeout)
+            logger.info("session_warmed_up", url=self._warmup_url, cookies=len(session.cookies))
+        except requests.RequestException as e:
+            logger.warning("session_warmup_failed", url=self._warmup_url, error=str(e))
+
+    def get(self) -> requests.Session:
+        """Retorna a sessão compartilhada, criando e aquecendo na primeira chamada."""
+        with self._lock:
+            if self._session is None:
+                session = self._build()
+                if self._warmup_url:
+                    self._warmup(session)
+                self._session = session
+                logger.info("session_opened", pool_size=self._pool_size, encodings=SUPPORTED_ENCODINGS)
+            return self._session
+
+    def close(self) -> None:
+        """Fecha as conexões abertas. A próxima chamada a get() cria uma nova sessão."""
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+                logger.info("session_closed")
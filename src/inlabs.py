@@ -0,0 +1,142 @@
+import datetime
+import tempfile
+import zipfile
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Union
+
+import structlog
+from lxml import etree
+
+from . import downloader, matcher, parser, rule_plan, storage
+from .models import ArticleDocument, Config, MatchEntry
+
+logger = structlog.get_logger()
+
+# Arquivos XML maiores que isso são ignorados (proteção contra arquivos malformados)
+MAX_MEMBER_BYTES = 50 * 1024 * 1024
+
+def section_from_pub_name(pub_name: str) -> str:
+    """Converte o pubName do INLABS ('DO1', 'DO2E', ...) no slug de seção usado no projeto ('dou1', 'dou2e')."""
+    pub_name = (pub_name or "").strip().upper()
+    if pub_name.startswith("DO"):
+        return "dou" + pub_name[2:].lower()
+    return pub_name.lower()
+
+def _iso_date(pub_date: str) -> str:
+    try:
+        return datetime.datetime.strptime(pub_date.strip(), "%d/%m/%Y").date().isoformat()
+    except (AttributeError, ValueError):
+        return pub_date or ""
+
+def _child_text(body: etree._Element, tag: str) -> str:
+    node = body.find(tag)
+    if node is None or node.text is None:
+        return ""
+    return node.text.strip()
+
+def _document_from_article(article: etree._Element, member: str) -> ArticleDocument:
+    body = article.find("body")
+    if body is None:
+        body = article
+    title = _child_text(body, "Identifica") or article.get("name", "")
+    texto_html = _child_text(body, "Texto")
+    text = parser.extract_text(texto_html) if texto_html else ""
+
+    url = article.get("pdfPage") or f"inlabs://{member}#{article.get('id', '')}"
+    return ArticleDocument(
+        title=" ".join(title.split()),
+        text=text,
+        url=url,
+        section=section_from_pub_name(article.get("pubName", "")),
+        date=_iso_date(article.get("pubDate", "")),
+        metadata={
+            "id": article.get("id", ""),
+            "art_type": article.get("artType", ""),
+            "issuing_body": article.get("artCategory", ""),
+            "edition": article.get("editionNumber", ""),
+            "member": member,
+        },
+    )
+
+def iter_archive_documents(source: Union[str, Path, BinaryIO]) -> Iterator[ArticleDocument]:
+    """
+    Lê os atos de um arquivo zip de XMLs (formato INLABS: um <article> por XML),
+    abrindo cada membro como stream, sem extrair nada para o disco.
+    Membros inválidos são registrados no log e ignorados.
+    """
+    with zipfile.ZipFile(source) as archive:
+        for info in archive.infolist():
+            if info.is_dir() or not info.filename.lower().endswith(".xml"):
+                continue
+            if info.file_size > MAX_MEMBER_BYTES:
+                logger.warning("archive_member_too_large", member=info.filename, size=info.file_size)
+                continue
+            try:
+                with archive.open(info) as fh:
+                    tree = etree.parse(fh, etree.XMLParser(resolve_entities=False, huge_tree=True))
+            except (etree.XMLSyntaxError, zipfile.BadZipFile, OSError) as e:
+                logger.warning("archive_member_invalid", member=info.filename, error=str(e))
+                continue
+
+            for article in tree.iter("article"):
+                yield _document_from_article(article, info.filename)
+
+def download_archive(url: str, directory: Union[str, Path]) -> Path:
+    """
+    Baixa um arquivo zip para directory pela sessão HTTP compartilhada, gravando em
+    blocos (sem carregar o arquivo inteiro em memória), dentro do orçamento global de
+    requisições. Retorna o caminho local; apagá-lo fica a cargo de quem chama.
+    """
+    target_dir = Path(directory)
+    target_dir.mkdir(parents=True, exist_ok=True)
+    target = target_dir / (url.rstrip("/").rsplit("/", 1)[-1].split("?")[0] or "edicao.zip")
+
+    waited = downloader.wait_for_budget()
+    logger.info("archive_download_started", url=url, throttled_seconds=round(waited, 3))
+    with downloader.get_session().get(url, stream=True, timeout=300) as response:
+        response.raise_for_status()
+        with open(target, "wb") as f:
+            for chunk in response.iter_content(chunk_size=1024 * 1024):
+                f.write(chunk)
+    logger.info("archive_download_finished", url=url, path=str(target), size=target.stat().st_size)
+    return target
+
+def ingest_archive(
+    source: Union[str, Path, BinaryIO],
+    cfg: Config,
+    save_results: bool = True,
+) -> List[MatchEntry]:
+    """
+    Processa todos os atos de um zip de edição com as mesmas regras e keywords
+    da raspagem (roteadas pela seção de cada ato) e grava as correspondências.
+    `source` pode ser caminho local, arquivo aberto ou URL http(s); um zip baixado
+    fica num diretório temporário, removido ao final.
+    """
+    if isinstance(source, str) and source.startswith(("http://", "https://")):
+        with tempfile.TemporaryDirectory(prefix="inlabs-") as directory:
+            return ingest_archive(download_archive(source, directory), cfg, save_results)
+
+    all_matches: List[MatchEntry] = []
+    documents = 0
+    logger.info("archive_ingest_started", source=str(source))
+
+    plan = rule_plan.build_plan(cfg)
+    writer = storage.open_writer(cfg.storage) if save_results else None
+    try:
+        for doc in iter_archive_documents(source):
+            documents += 1
+            section_plan = plan.for_section(doc.section)
+            if not section_plan.keywords and not section_plan.rules:
+                continue
+
+            # Todas as regras da seção: no zip, título e corpo chegam juntos
+            matches = matcher.match_document(section_plan, text=doc.text, title=doc.title, date=doc.date, url=doc.url)
+            if writer is not None:
+                writer.write(matches)
+            all_matches.extend(matches)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    logger.info("archive_ingest_finished", documents=documents, matches=len(all_matches))
+    return all_matches
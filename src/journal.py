@@ -0,0 +1,225 @@
+import datetime
+import json
+import os
+import threading
+from collections import Counter
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional
+
+import structlog
+
+logger = structlog.get_logger()
+
+# Estados de processamento de uma URL, em ordem. "stored" é o estado final
+# (inclusive para artigos sem correspondências, que não têm nada a gravar).
+URL_STATES = ("discovered", "fetched", "parsed", "matched", "stored")
+_STATE_RANK = {state: i for i, state in enumerate(URL_STATES)}
+# Também final: artigo abandonado (erro permanente, como 404, ou tentativas esgotadas).
+# Não fica pendente, então não impede a seção nem a edição de serem concluídas
+_STATE_RANK["abandoned"] = _STATE_RANK["stored"]
+TERMINAL_STATES = ("stored", "abandoned")
+
+class CrawlJournal:
+    """
+    Diário de execução por data, gravado como log JSONL somente-anexação.
+    Registra as URLs descobertas por seção, o estado de cada URL e as seções/edição
+    concluídas. Ao abrir, o log é reaplicado; uma última linha truncada (processo
+    morto no meio de uma escrita) é ignorada e removida, então o diário sobrevive a
+    uma interrupção em qualquer ponto.
+    """
+
+    def __init__(self, path: Path, reset: bool = False):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._sections: dict[str, list[str]] = {}
+        self._states: dict[str, str] = {}
+        self._done_sections: set[str] = set()
+        self._complete = False
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if reset and self.path.exists():
+            self.path.unlink()
+        self._replay()
+        self._fh = open(self.path, "a", encoding="utf-8")
+
+    @classmethod
+    def for_date(cls, directory: str, date: datetime.date, reset: bool = False) -> "CrawlJournal":
+        return cls(Path(directory) / f"{date.isoformat()}.jsonl", reset=reset)
+
+    def _replay(self) -> None:
+        if not self.path.exists():
+            return
+        valid_bytes = 0
+        with open(self.path, "rb") as f:
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break
+                try:
+                    event = json.loads(raw)
+                except ValueError:
+                    break
+                self._apply(event)
+                valid_bytes += len(raw)
+        if valid_bytes < self.path.stat().st_size:
+            logger.warning("journal_truncated_tail_discarded", path=str(self.path))
+            with open(self.path, "r+b") as f:
+                f.truncate(valid_bytes)
+
+    def _apply(self, event: dict) -> None:
+        kind = event.get("event")
+        if kind == "discovered":
+            section = event["section"]
+            self._sections[section] = list(event["urls"])
+            for url in event["urls"]:
+                self._states.setdefault(url, "discovered")
+        elif kind == "url":
+            current = self._states.get(event["url"], "discovered")
+            if _STATE_RANK[event["state"]] >= _STATE_RANK[current]:
+                self._states[event["url"]] = event["state"]
+        elif kind == "section_done":
+            self._done_sections.add(event["section"])
+        elif kind == "complete":
+            self._complete = True
+
+    def _write(self, event: dict, durable: bool = False) -> None:
+        with self._lock:
+            self._apply(event)
+            self._fh.write(json.dumps(event, ensure_ascii=False) + "\n")
+            self._fh.flush()
+            if durable:
+                os.fsync(self._fh.fileno())
+
+    def record_discovered(self, section: str, urls: list[str]) -> None:
+        """Registra a lista de URLs a processar na seção."""
+        self._write({"event": "discovered", "section": section, "urls": list(urls)}, durable=True)
+
+    def mark(self, url: str, state: str) -> None:
+        """Avança o estado de uma URL (fetched, parsed, matched, stored ou abandoned)."""
+        if state not in _STATE_RANK:
+            raise ValueError(f"Estado desconhecido: {state}")
+        self._write({"event": "url", "url": url, "state": state}, durable=state in TERMINAL_STATES)
+
+    def mark_section_done(self, section: str) -> None:
+        self._write({"event": "section_done", "section": section}, durable=True)
+
+    def mark_complete(self) -> None:
+        self._write({"event": "complete"}, durable=True)
+
+    def state(self, url: str) -> Optional[str]:
+        return self._states.get(url)
+
+    def discovered(self, section: str) -> Optional[list[str]]:
+        """URLs registradas para a seção, ou None se a descoberta não chegou a ser gravada."""
+        return self._sections.get(section)
+
+    def pending(self, section: str) -> list[str]:
+        """URLs da seção que ainda não chegaram a um estado final."""
+        return [url for url in self._sections.get(section, []) if self._states.get(url) not in TERMINAL_STATES]
+
+    def section_done(self, section: str) -> bool:
+        return section in self._done_sections
+
+    def is_complete(self) -> bool:
+        return self._complete
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._fh.closed:
+                self._fh.close()
+
+@dataclass
+class DeferredItem:
+    """Artigo cujo download falhou, aguardando nova tentativa."""
+    url: str
+    section: str
+    date: str  # ISO (AAAA-MM-DD) da edição a que o artigo pertence
+    attempts: int = 0
+    error: str = ""
+
+class DeferredQueue:
+    """
+    Fila de artigos adiados, persistida em JSON no diretório do diário. Downloads que
+    falham não são repetidos na hora: entram aqui e são reprocessados no fim da
+    execução; o que continuar falhando fica para a próxima execução, até
+    `max_attempts` tentativas, quando o artigo é abandonado.
+    """
+
+    FILENAME = "deferred.json"
+
+    def __init__(self, path: Path, max_attempts: int = 3):
+        self.path = Path(path)
+        self.max_attempts = max(1, max_attempts)
+        self._lock = threading.Lock()
+        self._items: dict[str, DeferredItem] = {}
+        # Contagens da execução atual: deferred (novos adiados), recovered e abandoned
+        self.stats: Counter = Counter()
+        if self.path.exists():
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    for raw in json.load(f):
+                        item = DeferredItem(**raw)
+                        self._items[item.url] = item
+            except (ValueError, TypeError) as e:
+                logger.warning("deferred_queue_invalid", path=str(self.path), error=str(e))
+
+    @classmethod
+    def in_directory(cls, directory: str, max_attempts: int = 3) -> "DeferredQueue":
+        return cls(Path(directory) / cls.FILENAME, max_attempts=max_attempts)
+
+    def add(self, url: str, section: str, date: datetime.date | str, error: str = "", attempted: bool = True) -> bool:
+        """
+        Registra uma falha do artigo. `attempted=False` (ex.: circuito aberto) não conta
+        como tentativa. Retorna False se o artigo esgotou as tentativas e foi abandonado.
+        """
+        date_str = date.isoformat() if isinstance(date, datetime.date) else date
+        with self._lock:
+            item = self._items.get(url)
+            if item is None:
+                item = DeferredItem(url=url, section=section, date=date_str)
+                self.stats["deferred"] += 1
+            if attempted:
+                item.attempts += 1
+            item.error = error
+            if item.attempts >= self.max_attempts:
+                self._items.pop(url, None)
+                self.stats["abandoned"] += 1
+                logger.warning("deferred_abandoned", url=url, attempts=item.attempts, error=error)
+                return False
+            self._items[url] = item
+            return True
+
+    def abandon(self, url: str, error: str = "") -> None:
+        """Desiste de um artigo na hora (erro permanente, ex.: 404): não vale tentar de novo."""
+        with self._lock:
+            item = self._items.pop(url, None)
+            self.stats["abandoned"] += 1
+        logger.warning("deferred_abandoned", url=url, attempts=item.attempts if item else 1, error=error)
+
+    def mark_recovered(self, url: str) -> None:
+        """Remove da fila um artigo adiado que foi baixado com sucesso."""
+        with self._lock:
+            if self._items.pop(url, None) is not None:
+                self.stats["recovered"] += 1
+
+    def items(self) -> list[DeferredItem]:
+        with self._lock:
+            return list(self._items.values())
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._items
+
+    def save(self) -> None:
+        """Grava a fila de forma atômica (arquivo temporário + rename)."""
+        with self._lock:
+            payload = [asdict(item) for item in self._items.values()]
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
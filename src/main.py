@@ -1,15 +1,366 @@
 import argparse
+import functools
 import sys
 import time
 import datetime
 import structlog
-from src import config, downloader, parser, matcher, storage, scheduler
+from src import analysis, archive, backfill, config, downloader, fetcher, inlabs, journal, metrics, parser, matcher, rule_plan, sqlite_store, storage, scheduler
+from src.models import ArticleDocument
 
 logger = structlog.get_logger()
 
-def run_scraper(cfg: config.Config, target_date: datetime.date, save_results: bool = True):
+def _collect_matches(matches, url, writer, all_matches, on_flushed=None):
+    """
+    Grava (com writer, o MatchWriter da execução) e acumula as correspondências de um artigo.
+    on_flushed é chamado quando as linhas chegam ao arquivo (na hora, se não há o que gravar).
+    """
+    if matches:
+        logger.info("matches_found", url=url, count=len(matches))
+        all_matches.extend(matches)
+        if writer is not None:
+            writer.write(matches, on_flushed)
+            return
+    if on_flushed is not None:
+        on_flushed()
+
+def _process_article(
+    cfg, url, html, section_plan, target_date, all_matches, writer, crawl_journal, stage_metrics, rules=None
+):
+    """
+    Parsing, correspondência e gravação de um artigo já baixado, avançando o diário a cada etapa.
+    `html` pode ser um ArticleDocument já analisado durante o download (parser.streaming).
+    section_plan é o plano compilado da seção (termos já normalizados); rules, as regras
+    candidatas do artigo (None = todas as regras de corpo da seção).
+    """
+    if crawl_journal is not None:
+        crawl_journal.mark(url, "fetched")
+
+    if isinstance(html, ArticleDocument):
+        doc = html
+    else:
+        # Análise (Parsing)
+        with metrics.timed(stage_metrics, "parse"):
+            # Uma única análise da página: título, texto cru (para contexto) e metadados
+            doc = parser.parse_article(html, url=url, selectors=cfg.parser.body_selectors)
+
+    # Correspondência (Matching)
+    with metrics.timed(stage_metrics, "match"):
+        matches = matcher.match_article(
+            section_plan,
+            text=doc.text,
+            title=doc.title,
+            date=target_date.isoformat(),
+            url=url,
+            rules=rules,
+        )
+    _store_article(cfg, url, doc, matches, writer, all_matches, crawl_journal, stage_metrics)
+
+def _store_article(cfg, url, doc, matches, writer, all_matches, crawl_journal, stage_metrics):
+    """
+    Avança o diário de um artigo já analisado (parsed, matched) e grava as correspondências.
+    O estado "stored" só vai para o diário depois que o writer descarrega as linhas do artigo.
+    """
+    if doc.metadata.get("extraction") == parser.PAGE_STRATEGY:
+        # Layout diferente do esperado: a página inteira (com menus e rodapé) é analisada.
+        # Pode ser uma página de erro ou manutenção servida com status 200: não fica no cache
+        logger.warning("article_body_not_found", url=url)
+        downloader.discard_cached(url)
+    if crawl_journal is not None:
+        crawl_journal.mark(url, "parsed")
+        crawl_journal.mark(url, "matched")
+
+    on_flushed = functools.partial(crawl_journal.mark, url, "stored") if crawl_journal is not None else None
+    with metrics.timed(stage_metrics, "store"):
+        _collect_matches(matches, url, writer, all_matches, on_flushed)
+
+def _article_fetcher(cfg, single_attempt: bool):
+    """
+    Função de download dos artigos. Com parser.streaming, devolve o ArticleDocument
+    analisado durante o download; senão, o HTML. Com single_attempt (fila de adiados),
+    a falha não é repetida na hora.
+    """
+    if cfg.parser.streaming:
+        fetch = downloader.fetch_article_document if single_attempt else downloader.fetch_document
+        return functools.partial(fetch, selectors=cfg.parser.body_selectors)
+    return downloader.fetch_article if single_attempt else downloader.fetch_content
+
+def _build_breaker(cfg) -> fetcher.CircuitBreaker:
+    # Só falhas do servidor/rede abrem o circuito; um 404 não indica host degradado
+    return fetcher.CircuitBreaker(
+        failure_threshold=cfg.crawler.breaker_failure_threshold,
+        reset_seconds=cfg.crawler.breaker_reset_seconds,
+        trips_on=downloader.is_retryable_error,
+    )
+
+def _defer(deferred, url, section, target_date, error, crawl_journal=None) -> None:
+    """
+    Coloca um download que falhou na fila de adiados (circuito aberto não conta como
+    tentativa). Erros permanentes (ex.: 404) e tentativas esgotadas abandonam o artigo,
+    que fica com o estado final "abandoned" no diário da data em vez de pendente.
+    """
+    if downloader.is_permanent_error(error):
+        deferred.abandon(url, error=str(error))
+    else:
+        attempted = not isinstance(error, fetcher.CircuitOpenError)
+        if deferred.add(url, section, target_date, error=str(error), attempted=attempted):
+            logger.warning("article_deferred", url=url, error=str(error))
+            return
+    if crawl_journal is not None:
+        crawl_journal.mark(url, "abandoned")
+
+# Resultado do processamento de uma seção
+SECTION_DONE = "done"      # todos os artigos processados
+SECTION_EMPTY = "empty"    # listagem sem atos (sem edição ou ainda não publicada)
+SECTION_FAILED = "failed"  # falha na listagem ou em algum artigo
+
+def section_finished(status: str, target_date: datetime.date, today: datetime.date | None = None) -> bool:
+    """
+    Indica se a seção pode ser marcada como concluída no diário. Data passada sem
+    listagem = sem edição; hoje, a edição pode apenas não ter sido publicada ainda.
+    """
+    today = today or datetime.date.today()
+    return status == SECTION_DONE or (status == SECTION_EMPTY and target_date < today)
+
+def process_section(
+    cfg: config.Config,
+    section: str,
+    target_date: datetime.date,
+    all_matches: list,
+    save_results: bool = True,
+    resume: bool = False,
+    crawl_journal: journal.CrawlJournal | None = None,
+    stage_metrics: metrics.StageMetrics | None = None,
+    breaker: fetcher.CircuitBreaker | None = None,
+    deferred: journal.DeferredQueue | None = None,
+    analysis_pool: analysis.AnalysisPool | None = None,
+    plan: rule_plan.RulePlan | None = None,
+    writer: storage.MatchWriter | sqlite_store.SqliteMatchWriter | None = None,
+) -> str:
+    """
+    Processa uma seção de uma data: descoberta, filtragem, download, parsing,
+    correspondência e gravação. As correspondências são acumuladas em all_matches.
+    Com stage_metrics, a duração de cada etapa é registrada (usado pelo benchmark).
+    Com deferred, downloads que falham vão para a fila de adiados em vez de serem
+    repetidos na hora; breaker é o disjuntor por host (um novo se omitido).
+    Com analysis_pool, parsing e correspondência rodam nos processos do pool.
+    plan é o plano de regras compilado da configuração (montado se omitido).
+    writer é o MatchWriter da execução (com save_results, um próprio da seção se omitido);
+    ele é descarregado no fim da seção, antes de a seção poder ser marcada como concluída.
+    Retorna SECTION_DONE, SECTION_EMPTY ou SECTION_FAILED.
+    """
+    logger.info("processing_section", section=section)
+
+    # Regras aplicáveis a esta seção (ou globais) e keywords globais da seção, já compiladas.
+    # Regras sem body_terms são resolvidas direto dos metadados da listagem, sem baixar artigos
+    if plan is None:
+        plan = rule_plan.build_plan(cfg)
+    section_plan = plan.for_section(section)
+
+    own_writer = save_results and writer is None
+    if own_writer:
+        writer = storage.open_writer(cfg.storage)
+    elif not save_results:
+        writer = None
+
+    status = SECTION_FAILED
+    # Regras candidatas por URL (pelo título da listagem); None na retomada = todas as regras
+    candidates = None
+    try:
+        recorded_urls = crawl_journal.discovered(section) if resume and crawl_journal is not None else None
+        if recorded_urls is not None:
+            # Retomada: a descoberta já foi feita, processa apenas o que ficou pendente
+            urls = crawl_journal.pending(section)
+            logger.info("section_resumed", section=section, total=len(recorded_urls), pending=len(urls))
+        else:
+            with metrics.timed(stage_metrics, "discover"):
+                stubs = downloader.fetch_article_stubs(section, target_date)
+            # Log se não encontrar URLs
+            if not stubs:
+                 logger.info("no_articles_found", section=section)
+                 status = SECTION_EMPTY
+                 return status
+
+            if section_plan.title_only_rules:
+                for stub in stubs:
+                    stub_matches = matcher.match_title(
+                        section_plan, title=stub.title, date=target_date.isoformat(), url=stub.url
+                    )
+                    _collect_matches(stub_matches, stub.url, writer, all_matches)
+
+            # Só baixa o que ainda pode gerar correspondência no corpo; cada ato é avaliado
+            # só contra as regras que o título dele ainda permite
+            candidates = downloader.partition_by_rules(stubs, section_plan) if section_plan.body_rules else {}
+            if section_plan.keywords:
+                # Keywords globais não são filtráveis pelo título
+                urls = [stub.url for stub in stubs]
+            else:
+                urls = [stub.url for stub in stubs if stub.url in candidates]
+            if len(urls) < len(stubs):
+                logger.info("urls_filtered", original=len(stubs), remaining=len(urls))
+
+            if crawl_journal is not None:
+                # Correspondências só de título não têm URL a retomar: vão para os arquivos antes
+                # de a descoberta ser registrada (a retomada não reavalia os títulos)
+                if writer is not None and section_plan.title_only_rules:
+                    writer.flush()
+                crawl_journal.record_discovered(section, urls)
+
+        # Com fila de adiados, artigos têm uma única tentativa: a falha vai para a fila
+        fetch_fn = _article_fetcher(cfg, single_attempt=deferred is not None)
+        if stage_metrics is not None:
+            fetch_fn = stage_metrics.wrap("fetch", fetch_fn)
+        if breaker is None:
+            breaker = _build_breaker(cfg)
+
+        failed_urls = 0
+        fetched = fetcher.fetch_many(
+            urls,
+            fetch_fn,
+            max_workers=cfg.crawler.max_workers,
+            per_host_concurrency=cfg.crawler.per_host_concurrency,
+            breaker=breaker,
+        )
+
+        def downloaded():
+            """Pares (url, html) baixados com sucesso; falhas são contadas e adiadas aqui."""
+            nonlocal failed_urls
+            for result in fetched:
+                url = result.url
+                if not result.ok:
+                    failed_urls += 1
+                    if deferred is not None:
+                        _defer(deferred, url, section, target_date, result.error, crawl_journal)
+                    else:
+                        logger.error("article_processing_failed", url=url, error=str(result.error))
+                    continue
+                yield url, result.content
+
+        if analysis_pool is not None:
+            # Parsing e correspondência nos processos do pool, sobrepostos aos downloads
+            def submitted():
+                for url, html in downloaded():
+                    if crawl_journal is not None:
+                        crawl_journal.mark(url, "fetched")
+                    yield url, html
+
+            for result in analysis_pool.imap_unordered(submitted(), section, target_date, candidates):
+                url = result.url
+                try:
+                    if not result.ok:
+                        raise RuntimeError(result.error)
+                    if stage_metrics is not None:
+                        stage_metrics.record("parse", result.parse_seconds)
+                        stage_metrics.record("match", result.match_seconds)
+                    _store_article(cfg, url, result.document, result.matches, writer, all_matches, crawl_journal, stage_metrics)
+                    if deferred is not None and url in deferred:
+                        deferred.mark_recovered(url)
+                except Exception as e:
+                    failed_urls += 1
+                    logger.error("article_processing_failed", url=url, error=str(e))
+        else:
+            for url, html in downloaded():
+                try:
+                    _process_article(
+                        cfg, url, html, section_plan, target_date,
+                        all_matches, writer, crawl_journal, stage_metrics,
+                        rules=candidates.get(url, ()) if candidates is not None else None,
+                    )
+                    if deferred is not None and url in deferred:
+                        deferred.mark_recovered(url)
+                except Exception as e:
+                    failed_urls += 1
+                    logger.error("article_processing_failed", url=url, error=str(e))
+
+        status = SECTION_DONE if failed_urls == 0 else SECTION_FAILED
+                    
+    except Exception as e:
+        logger.error("section_processing_failed", section=section, error=str(e))
+
+    finally:
+        if own_writer:
+            writer.close()
+        elif writer is not None:
+            writer.flush()
+        logger.info("section_finished", section=section, status=status, rate_control=downloader.rate_state())
+
+    return status
+
+def _drain_deferred(cfg, plan, deferred, breaker, target_date, crawl_journal, all_matches, stage_metrics, writer) -> None:
+    """
+    Reprocessa a fila de adiados (falhas desta execução e sobras de execuções
+    anteriores, de qualquer data) com uma tentativa por artigo. Se o circuito do host
+    estiver aberto, espera a janela de sonda antes de começar. O que continua falhando
+    fica na fila para a próxima execução, até esgotar as tentativas.
+    """
+    items = {item.url: item for item in deferred.items()}
+    if not items:
+        return
+    wait = max(breaker.retry_in(url) for url in items)
+    if wait > 0:
+        logger.info("deferred_drain_waiting_for_circuit", seconds=round(wait, 1))
+        time.sleep(wait)
+    logger.info("deferred_drain_started", count=len(items))
+
+    # Diários de outras datas (itens herdados de execuções anteriores)
+    other_journals: dict[str, journal.CrawlJournal] = {}
+
+    def journal_for(item) -> journal.CrawlJournal | None:
+        if crawl_journal is not None and item.date == target_date.isoformat():
+            return crawl_journal
+        if item.date not in other_journals:
+            other_journals[item.date] = journal.CrawlJournal.for_date(
+                cfg.storage.journal_dir, datetime.date.fromisoformat(item.date)
+            )
+        return other_journals[item.date]
+
+    fetch_fn = _article_fetcher(cfg, single_attempt=True)
+    if stage_metrics is not None:
+        fetch_fn = stage_metrics.wrap("fetch", fetch_fn)
+    for result in fetcher.fetch_many(
+        list(items),
+        fetch_fn,
+        max_workers=cfg.crawler.max_workers,
+        per_host_concurrency=cfg.crawler.per_host_concurrency,
+        breaker=breaker,
+    ):
+        item = items[result.url]
+        item_date = datetime.date.fromisoformat(item.date)
+        if not result.ok:
+            _defer(deferred, item.url, item.section, item_date, result.error, journal_for(item))
+            continue
+        try:
+            _process_article(
+                cfg, item.url, result.content, plan.for_section(item.section), item_date,
+                all_matches, writer, journal_for(item), stage_metrics,
+            )
+            deferred.mark_recovered(item.url)
+        except Exception as e:
+            logger.error("article_processing_failed", url=item.url, error=str(e))
+    # Os recuperados só contam como "stored" depois de descarregados
+    writer.flush()
+
+    for day_journal in other_journals.values():
+        for item in items.values():
+            if day_journal.discovered(item.section) is not None and not day_journal.pending(item.section):
+                if not day_journal.section_done(item.section):
+                    day_journal.mark_section_done(item.section)
+        day_journal.close()
+
+def run_scraper(
+    cfg: config.Config,
+    target_date: datetime.date,
+    save_results: bool = True,
+    resume: bool = False,
+    stage_metrics: metrics.StageMetrics | None = None,
+):
     """
     Executa o processo de raspagem com a configuração e data fornecidas.
+    Quando save_results é True, o progresso é gravado no diário da data; com resume=True
+    apenas as URLs não concluídas são processadas e uma edição já concluída é ignorada.
+    stage_metrics, se informado, recebe as durações por etapa de todas as seções.
+    Downloads de artigos que falham não são repetidos na hora: um disjuntor por host
+    interrompe os downloads quando o servidor degrada e as falhas vão para a fila de
+    adiados, reprocessada no fim (o restante fica para a próxima execução).
     Retorna uma lista de todas as correspondências encontradas.
     """
     all_matches = []
@@ -21,118 +372,102 @@ def run_scraper(cfg: config.Config, target_date: datetime.date, save_results: bo
         # Ensure we return empty list if nothing to do, don't crash
         return []
 
+    # Diário da data (apenas quando os resultados são gravados; a busca do dashboard não usa)
+    crawl_journal = None
+    if save_results:
+        crawl_journal = journal.CrawlJournal.for_date(cfg.storage.journal_dir, target_date, reset=not resume)
+        if resume and crawl_journal.is_complete():
+            logger.info("edition_already_complete", date=str(target_date))
+            crawl_journal.close()
+            return []
+
+    # Orçamento global de requisições compartilhado por seções e artigos, e cache de respostas
+    # (configurados uma vez por processo: execuções seguintes com a mesma configuração os reaproveitam)
+    downloader.configure(cfg.crawler, cfg.cache)
+
+    # Disjuntor por host e fila de adiados (persistida só quando há diário)
+    breaker = _build_breaker(cfg)
+    deferred = None
+    if save_results:
+        deferred = journal.DeferredQueue.in_directory(cfg.storage.journal_dir, cfg.crawler.deferred_max_attempts)
+        carried_in = len(deferred)
+
     # Identifica todas as seções necessárias (Global + por Regra)
-    sections_to_process = set()
-    # Adiciona seções globais se houver keywords simples
-    if cfg.keywords:
-         # Use global sections definition or default
-         global_sections = cfg.sections if hasattr(cfg, 'sections') and cfg.sections else ["dou1", "dou2", "dou3"]
-         sections_to_process.update(global_sections)
-    
-    # Adiciona seções específicas de cada regra
-    for rule in cfg.rules:
-        # Check if rule has sections attribute and it is not empty
-        if hasattr(rule, 'sections') and rule.sections:
-            sections_to_process.update(rule.sections)
-        else:
-             # Se regra não tem seção, usa global
-             global_sections = cfg.sections if hasattr(cfg, 'sections') and cfg.sections else ["dou1", "dou2", "dou3"]
-             sections_to_process.update(global_sections)
-    
-    # Se ainda estiver vazio, fallback
-    if not sections_to_process:
-        sections_to_process = {"dou1", "dou2", "dou3"}
+    sections_to_process = config.sections_to_process(cfg)
+    # Termos normalizados e roteamento por seção, compilados uma vez (reaproveitados se as regras não mudaram)
+    plan = rule_plan.build_plan(cfg)
 
-    for section in sorted(list(sections_to_process)):
-        logger.info("processing_section", section=section)
-        try:
-            urls = downloader.fetch_article_urls(section, target_date)
-            # Log se não encontrar URLs
-            if not urls:
-                 logger.info("no_articles_found", section=section)
-                 continue
-            
-            # Apply Filtering Optimization
-            # Pass only rules that apply to this section (or global rules)
-            section_rules = []
-            for r in cfg.rules:
-                 if not hasattr(r, 'sections') or not r.sections or section in r.sections:
-                     section_rules.append(r)
-            
-            # Also if we have global keywords, we can't filter by rules alone 
-            # (unless we implemented keyword filtering in downloader too, which we haven't)
-            if not cfg.keywords:
-                initial_count = len(urls)
-                urls = downloader.apply_url_filtering(urls, section_rules)
-                if len(urls) < initial_count:
-                    logger.info("urls_filtered", original=initial_count, remaining=len(urls))
-
-            for url in urls:
-                try:
-                    html = downloader.fetch_content(url)
-                    
-                    # Análise (Parsing)
-                    title = parser.extract_title(html)
-                    # Precisamos do texto cru para contexto, Normalizado para correspondência
-                    text_raw = parser.extract_text(html)
-                    
-                    # Filtra regras aplicáveis a esta seção
-                    applicable_rules = []
-                    # Keywords globais
-                    keywords_for_section = []
-                    
-                    # Se houver keywords globais e a seção atual estiver na lista de seções globais
-                    global_sections = cfg.sections if hasattr(cfg, 'sections') and cfg.sections else ["dou1", "dou2", "dou3"]
-                    if section in global_sections:
-                        keywords_for_section = cfg.keywords
-
-                    for r in cfg.rules:
-                         # Se a regra define seções, verifica se a atual está incluída.
-                         # Se lista de seções da regra for vazia, assume fallback para globais (ou todas, dependendo da interpretação. Vamos assumir todas/globais.)
-                         if not hasattr(r, 'sections') or not r.sections or section in r.sections:
-                             applicable_rules.append(r)
-
-                    # Correspondência (Matching)
-                    matches = matcher.find_matches(
-                        text=text_raw, 
-                        keywords=keywords_for_section,
-                        date=target_date.isoformat(),
-                        section=section,
-                        url=url,
-                        title=title,
-                        rules=applicable_rules
-                    )
-                    
-                    if matches:
-                        logger.info("matches_found", url=url, count=len(matches))
-                        for match in matches:
-                            if save_results:
-                                storage.save_match(match, cfg.storage)
-                                logger.info("match_saved", keyword=match.keyword)
-                            all_matches.append(match)
-                        
-                except Exception as e:
-                        logger.error("article_processing_failed", url=url, error=str(e))
-                        
-        except Exception as e:
-            logger.error("section_processing_failed", section=section, error=str(e))
-                        
-        except Exception as e:
-            logger.error("section_processing_failed", section=section, error=str(e))
+    # Gravador das correspondências da execução: um handle por arquivo, escrita em lotes
+    writer = storage.open_writer(cfg.storage) if save_results else None
+
+    # Pool de processos para parsing/correspondência (opcional), criado uma vez por execução.
+    # Em modo streaming o parsing acontece durante o download, então o pool não é usado
+    use_pool = cfg.parser.workers > 0 and not cfg.parser.streaming
+    analysis_pool = analysis.AnalysisPool(cfg, cfg.parser.workers, cfg.parser.max_in_flight, plan=plan) if use_pool else None
+    try:
+        for section in sections_to_process:
+            if crawl_journal is not None and crawl_journal.section_done(section):
+                logger.info("section_already_done", section=section)
+                continue
+
+            status = process_section(
+                cfg, section, target_date, all_matches,
+                save_results=save_results, resume=resume, crawl_journal=crawl_journal,
+                stage_metrics=stage_metrics, breaker=breaker, deferred=deferred,
+                analysis_pool=analysis_pool, plan=plan, writer=writer,
+            )
+            if crawl_journal is not None and section_finished(status, target_date):
+                crawl_journal.mark_section_done(section)
+    finally:
+        if analysis_pool is not None:
+            analysis_pool.close()
 
-    logger.info("job_finished")
+    if deferred is not None:
+        _drain_deferred(cfg, plan, deferred, breaker, target_date, crawl_journal, all_matches, stage_metrics, writer)
+        deferred.save()
+        # Seções cujas únicas pendências eram artigos adiados e recuperados
+        for section in sections_to_process:
+            if (
+                not crawl_journal.section_done(section)
+                and crawl_journal.discovered(section) is not None
+                and not crawl_journal.pending(section)
+            ):
+                crawl_journal.mark_section_done(section)
+
+    if writer is not None:
+        # Última descarga e o único fsync de cada arquivo, antes de fechar a edição no diário
+        writer.close()
+
+    if crawl_journal is not None:
+        if all(crawl_journal.section_done(s) for s in sections_to_process):
+            crawl_journal.mark_complete()
+        crawl_journal.close()
+
+    # A sessão compartilhada continua aberta para as próximas execuções (e buscas do
+    # painel em andamento); downloader.close() roda na saída do processo
+
+    summary = {"matches": len(all_matches)}
+    if deferred is not None:
+        summary.update(
+            deferred=deferred.stats["deferred"],
+            recovered=deferred.stats["recovered"],
+            abandoned=deferred.stats["abandoned"],
+            carried_in=carried_in,
+            carried_over=len(deferred),
+        )
+    logger.info("job_finished", **summary)
     return all_matches
 
-def job_process_dou():
+def job_process_dou(resume: bool = False):
     """
     Função principal do job:
     1. Carrega configuração.
-    2. Executa o raspador para a data de hoje.
+    2. Executa o raspador para a data de hoje (retomando do diário se resume=True).
     """
     try:
         cfg = config.load_config()
         date_today = datetime.date.today()
-        run_scraper(cfg, date_today)
+        run_scraper(cfg, date_today, resume=resume)
 
     except Exception as e:
         logger.critical("job_crashed", error=str(e))
@@ -141,9 +476,20 @@ def main():
     """Ponto de entrada."""
     parser = argparse.ArgumentParser(description="Serviço Raspador DOU")
     parser.add_argument("--run-now", action="store_true", help="Executa o raspador imediatamente para hoje e sai")
+    parser.add_argument("--resume", action="store_true", help="Retoma a execução do dia a partir do diário, sem refazer URLs concluídas")
+    parser.add_argument("--from", dest="date_from", type=datetime.date.fromisoformat, metavar="AAAA-MM-DD", help="Início do backfill (reprocessa um intervalo de datas e sai)")
+    parser.add_argument("--to", dest="date_to", type=datetime.date.fromisoformat, metavar="AAAA-MM-DD", help="Fim do backfill (padrão: hoje)")
+    parser.add_argument("--workers", type=int, default=2, help="Processos paralelos do backfill (0 = no próprio processo)")
+    parser.add_argument("--include-weekends", action="store_true", help="No backfill, não pula sábados e domingos")
+    parser.add_argument("--ingest-zip", metavar="ARQUIVO_OU_URL", help="Processa uma edição completa a partir de um zip de XMLs (formato INLABS) e sai")
+    parser.add_argument("--compact", action="store_true", help="Move os dias fechados dos JSONL para o arquivo Parquet (ano/mês/seção) e sai")
+    parser.add_argument("--import-jsonl", action="store_true", help="Importa os JSONL de storage.output_dir para o banco SQLite (storage.format: sqlite) e sai")
     args = parser.parse_args()
+    if args.date_to and not args.date_from:
+        parser.error("--to só vale para o backfill: informe também --from")
 
-    logger.info("service_starting", mode="manual" if args.run_now else "daemon")
+    mode = "compact" if args.compact else "import" if args.import_jsonl else "ingest" if args.ingest_zip else "backfill" if args.date_from else "manual" if args.run_now else "daemon"
+    logger.info("service_starting", mode=mode)
     
     try:
         cfg = config.load_config()
@@ -152,9 +498,29 @@ def main():
         print(f"Falha ao carregar configuração ou configurar log: {e}")
         return
 
+    if args.date_from:
+        date_to = args.date_to or datetime.date.today()
+        backfill.run_backfill(
+            cfg, args.date_from, date_to, workers=args.workers, include_weekends=args.include_weekends
+        )
+        return
+
+    if args.compact:
+        archive.compact(cfg.storage.output_dir)
+        return
+
+    if args.import_jsonl:
+        sqlite_store.import_jsonl(cfg.storage.output_dir, sqlite_store.database_path(cfg.storage))
+        return
+
+    if args.ingest_zip:
+        logger.info("archive_ingest_triggered", source=args.ingest_zip)
+        inlabs.ingest_archive(args.ingest_zip, cfg)
+        return
+
     if args.run_now:
         logger.info("manual_run_triggered")
-        job_process_dou()
+        job_process_dou(resume=args.resume)
         logger.info("manual_run_completed")
         return
 
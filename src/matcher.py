@@ -1,11 +1,279 @@
+import functools
+import itertools
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, fields
 from datetime import datetime
-from typing import List
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
+from .automaton import TermAutomaton
+from .expression import evaluate, word_locator
+from .fuzzy import FuzzyHit, FuzzyTerms
 from .models import MatchEntry, AdvancedMatchRule
-from .parser import normalize_text
+from .parser import fold_text, normalize_text
+from .rule_plan import CompiledRule, CompiledTerm, RulePlan, SectionPlan, compile_section
 
 CONTEXT_PADDING = 150
 
+def _context(text: str, folded, idx: int, length: int) -> Tuple[str, int]:
+    """
+    Trecho do texto ORIGINAL ao redor de uma ocorrência (posições convertidas pelo mapa)
+    e o início da ocorrência no texto original.
+    """
+    orig_start, orig_end = folded.original_span(idx, idx + length)
+    start_context = max(0, orig_start - CONTEXT_PADDING)
+    end_context = min(len(text), orig_end + CONTEXT_PADDING)
+    return text[start_context:end_context], orig_start
+
+def _extent(fuzzy_hits: Dict[str, Dict[int, FuzzyHit]], key: str, idx: int, normalized: str) -> Tuple[int, bool]:
+    """Tamanho da ocorrência no texto normalizado e se ela é aproximada (termos ~k têm tamanho variável)."""
+    hit = fuzzy_hits.get(key, {}).get(idx)
+    if hit is None:
+        return len(normalized), False
+    return hit.end - hit.start, hit.distance > 0
+
+def _group_entries(
+    text: str,
+    folded,
+    found: Sequence[Tuple[int, int, str, bool]],
+    coalesce: bool,
+    date: str,
+    section: str,
+    url: str,
+    title: str,
+    group: str,
+) -> List[MatchEntry]:
+    """
+    Entradas de um grupo (keyword ou regra) a partir das ocorrências (início e tamanho
+    no texto normalizado, termo, aproximada). Sem coalescência, uma entrada por
+    ocorrência; com coalescência, janelas de contexto que se sobrepõem viram um só
+    trecho, com as posições de cada ocorrência dentro dele em `hits`.
+    """
+    timestamp = datetime.now().isoformat()
+    if not coalesce:
+        entries = []
+        for idx, length, keyword, approximate in found:
+            context, offset = _context(text, folded, idx, length)
+            entries.append(MatchEntry(
+                keyword=keyword,
+                context=context,
+                date=date,
+                section=section,
+                url=url,
+                title=title,
+                capture_timestamp=timestamp,
+                keyword_group=group,
+                fuzzy=approximate,
+                offset=offset,
+            ))
+        return entries
+
+    spans = sorted((*folded.original_span(idx, idx + length), keyword, approximate) for idx, length, keyword, approximate in found)
+    clusters: List[list] = []  # [ocorrências, maior fim entre elas]
+    for span in spans:
+        # Janelas [início - padding, fim + padding] que se tocam são o mesmo trecho
+        if clusters and span[0] - CONTEXT_PADDING <= clusters[-1][1] + CONTEXT_PADDING:
+            clusters[-1][0].append(span)
+            clusters[-1][1] = max(clusters[-1][1], span[1])
+        else:
+            clusters.append([[span], span[1]])
+
+    entries = []
+    for cluster, cluster_end in clusters:
+        window_start = max(0, cluster[0][0] - CONTEXT_PADDING)
+        window_end = min(len(text), cluster_end + CONTEXT_PADDING)
+        entries.append(MatchEntry(
+            keyword=", ".join(dict.fromkeys(hit[2] for hit in cluster)),
+            context=text[window_start:window_end],
+            date=date,
+            section=section,
+            url=url,
+            title=title,
+            capture_timestamp=timestamp,
+            keyword_group=group,
+            fuzzy=any(hit[3] for hit in cluster),
+            hits=[(start - window_start, end - window_start, keyword) for start, end, keyword, _ in cluster],
+            offset=window_start,
+        ))
+    return entries
+
+# Tipos de grupo devolvidos por _scan
+_TERMS = "terms"      # Ocorrências de termos no corpo
+_TITLE = "title"      # Regra só de título satisfeita
+_ARTICLE = "article"  # Expressão satisfeita sem ocorrências (ex.: "a OR NOT b" sem "a")
+
+# Ocorrência no texto normalizado: (início, tamanho, termo como configurado, aproximada)
+Occurrence = Tuple[int, int, str, bool]
+
+def _scan(
+    text: str,
+    title: str,
+    keywords: Sequence[CompiledTerm],
+    rules: Sequence[CompiledRule],
+    automaton: TermAutomaton,
+    fuzzy: Optional[FuzzyTerms] = None,
+):
+    """
+    Núcleo da correspondência, sem montar nenhum objeto de saída: devolve o texto
+    dobrado (ou None, se não houve varredura) e os grupos na ordem de saída
+    (keywords, depois regras), cada um como (nome do grupo, tipo, ocorrências).
+    """
+    groups: List[Tuple[str, str, List[Occurrence]]] = []
+    folded = None
+    hits = {}
+    fuzzy_hits: Dict[str, Dict[int, FuzzyHit]] = {}
+    if keywords or any(rule.body_terms for rule in rules):
+        # Pré-normaliza para pesquisa, com o mapa de posições de volta ao texto original
+        folded = fold_text(text)
+        hits = automaton.search(folded.text)
+        if fuzzy:
+            for key, found in fuzzy.search(folded.text).items():
+                fuzzy_hits[key] = {hit.start: hit for hit in found}
+                hits[key] = [hit.start for hit in found]
+
+    def located(term, positions) -> List[Tuple[int, int, bool]]:
+        if not term.max_edits:
+            length = len(term.normalized)
+            return [(idx, length, False) for idx in positions]
+        return [(idx, *_extent(fuzzy_hits, term.key, idx, term.normalized)) for idx in positions]
+
+    # --- 1. Keywords simples: o grupo é a própria keyword ---
+    for kw in keywords:
+        positions = hits.get(kw.key)
+        if positions:
+            found = [(idx, length, kw.term, approximate) for idx, length, approximate in located(kw, positions)]
+            groups.append((kw.term, _TERMS, found))
+
+    # --- 2. Regras avançadas, agrupadas pelo nome da regra ---
+    if rules:
+        normalized_title = normalize_text(title)
+        word_at = None
+
+        for rule in rules:
+            # Se a regra exige termos de título e nenhum foi encontrado, descarta a regra
+            if not rule.title_matches(normalized_title):
+                continue
+
+            # Se a regra NÃO tem body terms, e passou no title_terms, é match
+            if rule.title_only:
+                groups.append((rule.name, _TITLE, []))
+                continue
+
+            # Regra com expressão: avaliada sobre as listas de posições da mesma varredura;
+            # só as ocorrências que sustentam a expressão viram correspondências
+            if rule.expression is not None:
+                if rule.uses_near and word_at is None:
+                    word_at = word_locator(folded.text)
+                witnesses = evaluate(rule.expression, hits, word_at)
+                if witnesses is None:
+                    continue
+                if not witnesses:
+                    groups.append((rule.name, _ARTICLE, []))
+                    continue
+                unique = sorted({(idx, term) for term, idx in witnesses}, key=lambda hit: (hit[0], hit[1].text))
+                found = [
+                    (idx, length, term.text, approximate)
+                    for idx, term in unique
+                    for _, length, approximate in located(term, (idx,))
+                ]
+                groups.append((rule.name, _TERMS, found))
+                continue
+
+            # Se tem body terms, usa as ocorrências da varredura do corpo
+            found = [
+                (idx, length, term.term, approximate)
+                for term in rule.body_terms
+                for idx, length, approximate in located(term, hits.get(term.key, ()))
+            ]
+            if found:
+                groups.append((rule.name, _TERMS, found))
+
+    return folded, groups
+
+def match_compiled(
+    text: str,
+    title: str,
+    date: str,
+    section: str,
+    url: str,
+    keywords: Sequence[CompiledTerm],
+    rules: Sequence[CompiledRule],
+    automaton: TermAutomaton,
+    fuzzy: Optional[FuzzyTerms] = None,
+    coalesce: bool = False,
+) -> List[MatchEntry]:
+    """
+    Correspondência com termos já compilados (nenhuma normalização de termos aqui).
+    Keywords primeiro, depois as regras na ordem da configuração; cada termo de
+    corpo usa as ocorrências da varredura única do autômato (termos exatos) ou
+    da busca aproximada (termos ~k, marcadas com fuzzy=True quando não exatas).
+    Com coalesce, ocorrências próximas de um mesmo grupo viram um só trecho.
+    """
+    matches: List[MatchEntry] = []
+    folded, groups = _scan(text, title, keywords, rules, automaton, fuzzy)
+
+    for group, kind, found in groups:
+        if kind == _TERMS:
+            matches.extend(_group_entries(text, folded, found, coalesce, date, section, url, title, group))
+            continue
+        # Alerta pela regra inteira: só pelo título, ou por expressão satisfeita sem ocorrências
+        matches.append(MatchEntry(
+            keyword=group, # O termo é o próprio nome da regra
+            context=f"Alerta de Título: {title}" if kind == _TITLE else text[:2 * CONTEXT_PADDING],
+            date=date,
+            section=section,
+            url=url,
+            title=title,
+            capture_timestamp=datetime.now().isoformat(),
+            keyword_group=group
+        ))
+
+    return matches
+
+def match_article(
+    plan: SectionPlan,
+    text: str,
+    title: str,
+    date: str,
+    url: str,
+    rules: Optional[Sequence[CompiledRule]] = None,
+) -> List[MatchEntry]:
+    """
+    Correspondência no corpo de um artigo baixado: keywords e regras com termos de corpo
+    da seção, ou só as regras candidatas do artigo (rules, ver SectionPlan.candidate_rules).
+    """
+    if rules is None:
+        rules = plan.body_rules
+    return match_compiled(text, title, date, plan.section, url, plan.keywords, rules, plan.automaton, plan.fuzzy, plan.coalesce_contexts)
+
+def match_title(plan: SectionPlan, title: str, date: str, url: str) -> List[MatchEntry]:
+    """Regras só de título da seção, resolvidas pelo título da listagem (sem baixar o artigo)."""
+    return match_compiled("", title, date, plan.section, url, (), plan.title_only_rules, plan.automaton, plan.fuzzy, plan.coalesce_contexts)
+
+def match_document(plan: SectionPlan, text: str, title: str, date: str, url: str) -> List[MatchEntry]:
+    """Keywords e todas as regras da seção sobre título e corpo já disponíveis (ex.: atos de um zip)."""
+    return match_compiled(
+        text, title, date, plan.section, url, plan.keywords, plan.rules, plan.automaton, plan.fuzzy, plan.coalesce_contexts
+    )
+
+def _plan_key(keywords: List[str], rules: List[AdvancedMatchRule]) -> Tuple:
+    return (
+        tuple(keywords),
+        tuple(
+            (rule.name, tuple(rule.body_terms), tuple(rule.title_terms), getattr(rule, "expression", ""))
+            for rule in rules or ()
+        ),
+    )
+
+@functools.lru_cache(maxsize=32)
+def _compile_cached(key: Tuple) -> SectionPlan:
+    keywords, rules = key
+    return compile_section("", keywords, [
+        AdvancedMatchRule(name=name, body_terms=list(body), title_terms=list(title), expression=expression)
+        for name, body, title, expression in rules
+    ])
+
 def find_matches(
     text: str, 
     keywords: List[str], 
@@ -13,111 +281,145 @@ def find_matches(
     section: str, 
     url: str,
     title: str = "",
-    rules: List[AdvancedMatchRule] = None
+    rules: List[AdvancedMatchRule] = None,
+    coalesce: bool = False
 ) -> List[MatchEntry]:
     """
     Pesquisa por palavras-chave no texto fornecido (insensível a maiúsculas/acentos).
     Aceita lista simples de keywords E lista de regras avançadas.
     Retorna uma lista de objetos MatchEntry para cada ocorrência encontrada.
+    Os termos são compilados (normalizados + autômato) uma vez por conjunto de
+    keywords e regras; o raspador usa match_article com o plano da seção.
+    Com coalesce, ocorrências próximas de uma keyword ou regra viram um só trecho.
     """
-    matches: List[MatchEntry] = []
-    
-    # Pré-normaliza para pesquisa
-    searchable_text = normalize_text(text)
-    
-    # --- 1. Processamento de Keywords Simples ---
-    for kw in keywords:
-        searchable_kw = normalize_text(kw)
-        if not searchable_kw:
-            continue
-            
-        start_search_idx = 0
-        while True:
-            try:
-                idx = searchable_text.index(searchable_kw, start_search_idx)
-                
-                # Extrai contexto do texto ORIGINAL
-                start_context = max(0, idx - CONTEXT_PADDING)
-                end_context = min(len(text), idx + len(kw) + CONTEXT_PADDING)
-                context_slice = text[start_context:end_context]
-                
-                matches.append(MatchEntry(
-                    keyword=kw,
-                    context=context_slice,
-                    date=date,
-                    section=section,
-                    url=url,
-                    title=title,
-                    capture_timestamp=datetime.now().isoformat(),
-                    keyword_group=kw  # Para keywords simples, o grupo é a própria keyword
-                ))
-                
-                start_search_idx = idx + len(searchable_kw)
-                
-            except ValueError:
-                break
-
-    # --- 2. Processamento de Regras Avançadas ---
-    if rules:
-        normalized_title = normalize_text(title)
-        
-        for rule in rules:
-            # Verifica filtro de título (se houver termos definidos)
-            title_match_found = False
-            
-            if rule.title_terms:
-                for term in rule.title_terms:
-                    # Se achar QUALQUER termo no título, é match de título (lógica OR no título)
-                    if normalize_text(term) in normalized_title:
-                        title_match_found = True
-                        break
-                
-                # Se regra exige termos de título e nenhum foi encontrado, descarta a regra
-                if not title_match_found:
-                    continue 
+    plan = _compile_cached(_plan_key(keywords, rules))
+    return match_compiled(text, title, date, section, url, plan.keywords, plan.rules, plan.automaton, plan.fuzzy, coalesce)
 
-            # Se a regra NÃO tem body terms, e passou no title_terms, é match
-            if not rule.body_terms:
-                matches.append(MatchEntry(
-                    keyword=rule.name, # No caso de só título, o termo é o próprio nome da regra
-                    context=f"Alerta de Título: {title}",
-                    date=date,
-                    section=section,
-                    url=url,
-                    title=title,
-                    capture_timestamp=datetime.now().isoformat(),
-                    keyword_group=rule.name
-                ))
-                continue
+# Documento da API em lote: (id, título, texto, seção)
+BatchDocument = Tuple[str, str, str, str]
 
-            # Se tem body terms, busca no corpo
-            for term in rule.body_terms:
-                searchable_term = normalize_text(term)
-                if not searchable_term:
-                    continue
+# Documentos por tarefa do pool em match_batch
+BATCH_CHUNK_SIZE = 256
+
+@dataclass
+class MatchColumns:
+    """
+    Resultado colunar de match_batch: listas paralelas, uma posição por ocorrência, sem
+    um MatchEntry (nem um timestamp) por ocorrência. Posições no texto ORIGINAL; o
+    contexto é text[context_start:context_end]. Alertas sem ocorrência têm start = end = -1:
+    regra só de título (contexto -1, -1) ou expressão satisfeita sem termos (início do texto).
+    """
+    doc_id: List[str] = field(default_factory=list)
+    group: List[str] = field(default_factory=list)  # Regra, ou a própria keyword (MatchEntry.keyword_group)
+    term: List[str] = field(default_factory=list)   # Termo como configurado (MatchEntry.keyword)
+    start: List[int] = field(default_factory=list)
+    end: List[int] = field(default_factory=list)
+    context_start: List[int] = field(default_factory=list)
+    context_end: List[int] = field(default_factory=list)
+    fuzzy: List[bool] = field(default_factory=list)
 
-                start_search_idx = 0
-                while True:
-                    try:
-                        idx = searchable_text.index(searchable_term, start_search_idx)
-                        
-                        start_context = max(0, idx - CONTEXT_PADDING)
-                        end_context = min(len(text), idx + len(term) + CONTEXT_PADDING)
-                        context_slice = text[start_context:end_context]
-                        
-                        matches.append(MatchEntry(
-                            keyword=term, # O termo especfico encontrado
-                            context=context_slice,
-                            date=date,
-                            section=section,
-                            url=url,
-                            title=title,
-                            capture_timestamp=datetime.now().isoformat(),
-                            keyword_group=rule.name # Agrupamento pelo nome da regra
-                        ))
-                        
-                        start_search_idx = idx + len(searchable_term)
-                    except ValueError:
-                        break
+    def __len__(self) -> int:
+        return len(self.doc_id)
 
-    return matches
+    def extend(self, other: "MatchColumns") -> None:
+        for column in fields(self):
+            getattr(self, column.name).extend(getattr(other, column.name))
+
+    def append(self, doc_id, group, term, start, end, context_start, context_end, fuzzy) -> None:
+        self.doc_id.append(doc_id)
+        self.group.append(group)
+        self.term.append(term)
+        self.start.append(start)
+        self.end.append(end)
+        self.context_start.append(context_start)
+        self.context_end.append(context_end)
+        self.fuzzy.append(fuzzy)
+
+    def to_frame(self):
+        """As colunas como pandas.DataFrame (pandas só é importado aqui)."""
+        import pandas as pd
+
+        return pd.DataFrame({column.name: getattr(self, column.name) for column in fields(self)})
+
+def _match_chunk(plan: RulePlan, documents: Sequence[BatchDocument]) -> MatchColumns:
+    """Keywords e todas as regras da seção de cada documento (como match_document), em colunas."""
+    columns = MatchColumns()
+    section_plans: Dict[str, SectionPlan] = {}
+    for doc_id, title, text, section in documents:
+        section_plan = section_plans.get(section)
+        if section_plan is None:
+            section_plan = section_plans[section] = plan.for_section(section)
+        folded, groups = _scan(
+            text, title, section_plan.keywords, section_plan.rules, section_plan.automaton, section_plan.fuzzy
+        )
+        for group, kind, found in groups:
+            if kind == _TITLE:
+                columns.append(doc_id, group, group, -1, -1, -1, -1, False)
+            elif kind == _ARTICLE:
+                columns.append(doc_id, group, group, -1, -1, 0, min(len(text), 2 * CONTEXT_PADDING), False)
+            else:
+                spans = [folded.original_span(idx, idx + length) for idx, length, _, _ in found]
+                size = len(found)
+                columns.doc_id.extend(itertools.repeat(doc_id, size))
+                columns.group.extend(itertools.repeat(group, size))
+                columns.term.extend(term for _, _, term, _ in found)
+                columns.start.extend(start for start, _ in spans)
+                columns.end.extend(end for _, end in spans)
+                columns.context_start.extend(max(0, start - CONTEXT_PADDING) for start, _ in spans)
+                columns.context_end.extend(min(len(text), end + CONTEXT_PADDING) for _, end in spans)
+                columns.fuzzy.extend(approximate for _, _, _, approximate in found)
+    return columns
+
+def _chunked(documents: Iterable[BatchDocument], size: int) -> Iterator[List[BatchDocument]]:
+    source = iter(documents)
+    while True:
+        chunk = list(itertools.islice(source, size))
+        if not chunk:
+            return
+        yield chunk
+
+# Plano de regras de cada processo do pool de match_batch, definido uma vez no inicializador
+_batch_plan: Optional[RulePlan] = None
+
+def _init_batch_worker(plan: RulePlan) -> None:
+    global _batch_plan
+    _batch_plan = plan
+
+def _match_chunk_task(documents: List[BatchDocument]) -> MatchColumns:
+    return _match_chunk(_batch_plan, documents)
+
+def match_batch(
+    documents: Iterable[BatchDocument],
+    plan: RulePlan,
+    workers: int = 0,
+    chunk_size: int = BATCH_CHUNK_SIZE,
+) -> MatchColumns:
+    """
+    Reavaliação em lote (ex.: regras novas sobre milhares de atos já guardados): documentos
+    (id, título, texto, seção) contra o plano compilado, com resultado colunar (ver
+    MatchColumns, .to_frame() para um DataFrame). A saída segue a ordem dos documentos e,
+    em cada um, a ordem de find_matches. Com workers > 1, blocos de chunk_size documentos
+    vão para um pool de processos que recebe o plano uma única vez; a entrada é consumida
+    aos poucos (no máximo 2 x workers blocos pendentes).
+    """
+    columns = MatchColumns()
+    chunks = _chunked(documents, max(1, chunk_size))
+    if workers <= 1:
+        for chunk in chunks:
+            columns.extend(_match_chunk(plan, chunk))
+        return columns
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_batch_worker,
+        initargs=(plan,),
+    ) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_match_chunk_task, chunk))
+            if len(pending) >= 2 * workers:
+                columns.extend(pending.popleft().result())
+        while pending:
+            columns.extend(pending.popleft().result())
+    return columns
@@ -0,0 +1,70 @@
+import contextlib
+import functools
+import threading
+import time
+from typing import Callable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+def percentile(values: list[float], pct: float) -> float:
+    """Percentil por interpolação linear (pct entre 0 e 100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    lower = int(k)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (k - lower)
+
+class StageMetrics:
+    """
+    Coleta durações por etapa do pipeline (discover, fetch, parse, match, store).
+    Thread-safe: a etapa fetch é medida nas threads de download.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._samples: dict[str, list[float]] = {}
+
+    def record(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self._samples.setdefault(stage, []).append(seconds)
+
+    @contextlib.contextmanager
+    def time(self, stage: str) -> Iterator[None]:
+        started = self._clock()
+        try:
+            yield
+        finally:
+            self.record(stage, self._clock() - started)
+
+    def wrap(self, stage: str, func: Callable[..., T]) -> Callable[..., T]:
+        """Envolve uma função para medir cada chamada como uma amostra da etapa."""
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            with self.time(stage):
+                return func(*args, **kwargs)
+        return timed
+
+    def count(self, stage: str) -> int:
+        with self._lock:
+            return len(self._samples.get(stage, []))
+
+    def summary(self) -> dict:
+        """Por etapa: quantidade, total, p50 e p99 (segundos)."""
+        with self._lock:
+            samples = {stage: list(values) for stage, values in self._samples.items()}
+        return {
+            stage: {
+                "count": len(values),
+                "total": round(sum(values), 6),
+                "p50": round(percentile(values, 50), 6),
+                "p99": round(percentile(values, 99), 6),
+            }
+            for stage, values in samples.items()
+        }
+
+def timed(metrics: Optional[StageMetrics], stage: str):
+    """Contexto de medição que não faz nada quando não há coletor."""
+    return metrics.time(stage) if metrics is not None else contextlib.nullcontext()
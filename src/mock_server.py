@@ -0,0 +1,204 @@
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import structlog
+
+logger = structlog.get_logger()
+
+# Termo plantado em parte dos artigos, para que o benchmark exercite correspondência e gravação
+PLANTED_TERM = "Força Nacional de Segurança Pública"
+
+_FILLER = (
+    "O MINISTRO DE ESTADO, no uso das atribuições que lhe conferem os incisos I e II "
+    "do parágrafo único do art. 87 da Constituição, resolve: "
+)
+
+class MockDouServer:
+    """
+    Servidor HTTP local que imita as rotas do in.gov.br usadas pelo raspador,
+    para testes de ponta a ponta e benchmark sem tocar o site real:
+    - /leiturajornal: aquecimento da sessão (define um cookie);
+    - /leiturajornal?secao=..&data=..: listagem com o JSON <script id="params">;
+    - /web/dou/-/<slug>: página do ato, com o texto em div.texto-dou.
+    Latência e respostas 503/429 (com Retry-After: 0) podem ser injetadas; o sorteio
+    usa um gerador com semente, então execuções são reproduzíveis.
+    Uso: `with MockDouServer(articles=50) as server: ... server.base_url ...`
+    """
+
+    def __init__(
+        self,
+        articles: int = 100,
+        page_size: int = 20_000,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        match_every: int = 10,
+        seed: int = 0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.articles = articles
+        self.page_size = page_size
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.match_every = match_every
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = Counter()
+        self.statuses = Counter()
+        self.bytes_sent = 0
+
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockDouServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="mock-dou", daemon=True)
+        self._thread.start()
+        logger.info("mock_server_started", base_url=self.base_url, articles=self.articles)
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "MockDouServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    # Conteúdo ------------------------------------------------------------------
+
+    def slug(self, index: int) -> str:
+        return f"portaria-n-{index}-de-teste-{index:06d}"
+
+    def is_matching(self, index: int) -> bool:
+        return self.match_every > 0 and index % self.match_every == 0
+
+    def listing_html(self, section: str, date: str) -> str:
+        items = [
+            {
+                "urlTitle": self.slug(i),
+                "title": f"PORTARIA Nº {i}, DE TESTE",
+                "artType": "Portaria",
+                "hierarchyStr": "Ministério da Justiça e Segurança Pública",
+                "pubDate": date,
+                "editionNumber": "1",
+                "numberPage": str(i // 10 + 1),
+                "content": "Autoriza o emprego da Força Nacional" if self.is_matching(i) else "Dispõe sobre servidores",
+            }
+            for i in range(self.articles)
+        ]
+        params = json.dumps({"section": section, "jsonArray": items}, ensure_ascii=False)
+        return (
+            "<html><head><title>Leitura do Jornal</title></head><body>"
+            f'<script id="params" type="application/json">{params}</script>'
+            "</body></html>"
+        )
+
+    def article_html(self, index: int) -> str:
+        body = _FILLER
+        if self.is_matching(index):
+            body += f"Autorizar o emprego da {PLANTED_TERM} em apoio ao órgão solicitante. "
+        repeats = max(1, (self.page_size - len(body)) // len(_FILLER))
+        paragraphs = "".join(f"<p>{_FILLER}</p>" for _ in range(repeats))
+        return (
+            f"<html><head><title>PORTARIA Nº {index}, DE TESTE - DOU - Imprensa Nacional</title>"
+            "<script>var analytics = {};</script><style>p { margin: 0 }</style></head><body>"
+            '<header><nav>Início | Diário Oficial | Busca</nav></header>'
+            f'<div class="texto-dou"><p class="identifica">PORTARIA Nº {index}, DE TESTE</p>'
+            f"<p>{body}</p>{paragraphs}</div>"
+            "<footer>Imprensa Nacional</footer></body></html>"
+        )
+
+    # Servidor ------------------------------------------------------------------
+
+    def _draw_fault(self) -> int | None:
+        with self._lock:
+            roll = self._rng.random()
+        if roll < self.error_rate:
+            return 503
+        if roll < self.error_rate + self.throttle_rate:
+            return 429
+        return None
+
+    def _record(self, route: str, status: int, size: int) -> None:
+        with self._lock:
+            self.requests[route] += 1
+            self.statuses[status] += 1
+            self.bytes_sent += size
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Cabeçalhos e corpo saem em escritas separadas; sem isso o ACK atrasado domina a latência
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, route: str, status: int, body: str = "", headers: dict | None = None) -> None:
+                payload = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+                server._record(route, status, len(payload))
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                query = parse_qs(parts.query)
+                if server.latency:
+                    time.sleep(server.latency)
+
+                if parts.path == "/leiturajornal" and not query:
+                    self._send("warmup", 200, "<html></html>", {"Set-Cookie": "JSESSIONID=mock; Path=/"})
+                    return
+
+                route = "listing" if parts.path == "/leiturajornal" else "article"
+                fault = server._draw_fault()
+                if fault == 503:
+                    self._send(route, 503, "Service Unavailable")
+                    return
+                if fault == 429:
+                    self._send(route, 429, "Too Many Requests", {"Retry-After": "0"})
+                    return
+
+                if route == "listing":
+                    section = query.get("secao", [""])[0]
+                    date = query.get("data", [""])[0]
+                    self._send(route, 200, server.listing_html(section, date))
+                    return
+
+                prefix = "/web/dou/-/portaria-n-"
+                if parts.path.startswith(prefix):
+                    try:
+                        index = int(parts.path[len(prefix):].split("-", 1)[0])
+                    except ValueError:
+                        index = -1
+                    if 0 <= index < server.articles:
+                        self._send(route, 200, server.article_html(index))
+                        return
+                self._send(route, 404, "Not Found")
+
+        return Handler
@@ -1,6 +1,6 @@
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List, Literal
+from typing import Dict, List, Literal, Tuple
 
 @dataclass(frozen=True)
 class ScheduleConfig:
@@ -15,7 +15,50 @@ class LoggingConfig:
 @dataclass(frozen=True)
 class StorageConfig:
     output_dir: str = "data"
-    format: Literal["jsonl"] = "jsonl"
+    format: Literal["jsonl", "sqlite"] = "jsonl"  # sqlite: banco único (matches.db) com índice de texto livre
+    journal_dir: str = ".journal"  # Diário de execução por data (retomada após interrupção)
+    coalesce_contexts: bool = False  # Um trecho por grupo de ocorrências próximas (mesmo ato e regra), com as posições
+    write_buffer_kb: int = 256  # Linhas acumuladas pelo MatchWriter antes de descarregar nos arquivos
+    flush_seconds: float = 5.0  # Descarga também após esse tempo desde a última
+
+@dataclass(frozen=True)
+class CrawlerConfig:
+    base_url: str = "https://www.in.gov.br"
+    requests_per_second: float = 0.12  # Orçamento global (seções + artigos) para in.gov.br (~1 a cada 8 s)
+    min_requests_per_second: float = 0.03  # Limites do controle adaptativo (AIMD)
+    max_requests_per_second: float = 0.2  # Teto da aceleração (nunca abaixo de requests_per_second)
+    latency_target_seconds: float = 3.0  # Latência média acima disso reduz a taxa
+    burst: int = 1
+    max_workers: int = 4
+    per_host_concurrency: int = 4
+    pool_size: int = 8  # Conexões keep-alive mantidas no pool da sessão
+    warmup: bool = True  # Visita a página inicial para obter cookies antes do primeiro download
+    breaker_failure_threshold: int = 5  # Falhas seguidas que abrem o circuito do host
+    breaker_reset_seconds: float = 60.0  # Tempo com o circuito aberto até a requisição de sonda
+    deferred_max_attempts: int = 3  # Tentativas de um artigo adiado (entre execuções) antes de desistir
+
+@dataclass(frozen=True)
+class CacheConfig:
+    enabled: bool = True
+    directory: str = ".cache/http"
+    max_size_mb: int = 512
+    listing_ttl_seconds: int = 3600  # Artigos publicados não expiram; listagens sim
+
+# Cadeia padrão de seletores (XPath) do corpo do ato, em ordem de preferência.
+# No in.gov.br o título, os parágrafos e a assinatura ficam em div.texto-dou.
+DEFAULT_BODY_SELECTORS = [
+    "//div[contains(concat(' ', normalize-space(@class), ' '), ' texto-dou ')]",
+    "//div[contains(concat(' ', normalize-space(@class), ' '), ' journal-content-article ')]",
+    "//article",
+]
+
+@dataclass(frozen=True)
+class ParserConfig:
+    # Sem correspondência em nenhum seletor, usa-se o texto da página inteira
+    body_selectors: List[str] = field(default_factory=lambda: list(DEFAULT_BODY_SELECTORS))
+    workers: int = 0  # Processos para parsing/correspondência (0 = no próprio processo do raspador)
+    max_in_flight: int = 0  # Artigos aguardando análise no pool (0 = 2 x workers)
+    streaming: bool = False  # Parsing incremental durante o download (sem guardar o HTML inteiro)
 
 @dataclass(frozen=True)
 class AdvancedMatchRule:
@@ -23,6 +66,8 @@ class AdvancedMatchRule:
     body_terms: List[str]
     title_terms: List[str] = field(default_factory=list)
     sections: List[str] = field(default_factory=list)
+    # Condição do corpo como expressão (AND/OR/NOT, frases, NEAR/n); substitui body_terms
+    expression: str = ""
 
 @dataclass(frozen=True)
 class Config:
@@ -32,6 +77,32 @@ class Config:
     logging: LoggingConfig
     sections: List[str] = field(default_factory=lambda: ["dou1", "dou2", "dou3"]) # Deprecated global default
     rules: List[AdvancedMatchRule] = field(default_factory=list)
+    crawler: CrawlerConfig = field(default_factory=CrawlerConfig)
+    cache: CacheConfig = field(default_factory=CacheConfig)
+    parser: ParserConfig = field(default_factory=ParserConfig)
+
+@dataclass(frozen=True)
+class ArticleStub:
+    """Metadados de um ato extraídos do JSON embutido na página leiturajornal."""
+    url: str
+    url_title: str
+    title: str = ""
+    art_type: str = ""
+    issuing_body: str = ""
+    pub_date: str = ""
+    edition: str = ""
+    page: str = ""
+    summary: str = ""
+
+@dataclass
+class ArticleDocument:
+    """Ato já extraído (título, texto limpo e metadados), independente da origem."""
+    title: str
+    text: str
+    url: str = ""
+    section: str = ""
+    date: str = ""
+    metadata: Dict[str, str] = field(default_factory=dict)
 
 @dataclass
 class MatchEntry:
@@ -43,3 +114,9 @@ class MatchEntry:
     capture_timestamp: str
     title: str = ""
     keyword_group: str = ""
+    fuzzy: bool = False  # Ocorrência aproximada (termo~k com ao menos uma edição)
+    # Trecho coalescido: (início, fim, termo) de cada ocorrência, com posições relativas a context
+    hits: List[Tuple[int, int, str]] = field(default_factory=list)
+    # Início da ocorrência (ou do trecho coalescido) no texto original; -1 em alertas sem posição.
+    # Distingue ocorrências com o mesmo trecho (ato curto em que o termo se repete)
+    offset: int = -1
@@ -1,41 +1,285 @@
+import functools
+import re
 import unicodedata
-from bs4 import BeautifulSoup
+from array import array
+from typing import NamedTuple, Optional, Sequence
+
+import lxml.html
+import structlog
+from lxml import etree
+
+from .models import DEFAULT_BODY_SELECTORS, ArticleDocument
+
+logger = structlog.get_logger()
+
+# Estratégia reportada quando nenhum seletor encontra o corpo do ato
+PAGE_STRATEGY = "page"
+
+# Elementos sem texto visível, removidos antes da extração
+_NON_TEXT_TAGS = ("script", "style", "meta", "noscript", "template")
+
+def _class_xpath(css_class: str) -> etree.XPath:
+    return etree.XPath(f".//*[contains(concat(' ', normalize-space(@class), ' '), ' {css_class} ')]")
+
+# Metadados publicados na página de cada ato (bloco "Publicado em / Edição / Seção / Página / Órgão")
+_DOU_METADATA_CLASSES = {
+    "published": "publicado-dou-data",
+    "edition": "edicao-dou-data",
+    "section": "secao-dou-data",
+    "page": "pagina-dou-data",
+    "issuing_body": "orgao-dou-data",
+}
+_DOU_METADATA = {key: _class_xpath(css_class) for key, css_class in _DOU_METADATA_CLASSES.items()}
+
+def _collapse(text: str) -> str:
+    return " ".join(text.split())
+
+def _parse_html(html_content) -> etree._Element | None:
+    if not html_content or not html_content.strip():
+        return None
+    try:
+        return lxml.html.document_fromstring(html_content)
+    except ValueError:
+        # lxml recusa str com declaração de encoding (<?xml ... encoding=...?>)
+        return lxml.html.document_fromstring(html_content.encode("utf-8"))
+    except etree.ParserError:
+        return None
+
+@functools.lru_cache(maxsize=64)
+def _compile_selector(selector: str) -> Optional[etree.XPath]:
+    try:
+        return etree.XPath(selector)
+    except etree.XPathSyntaxError as e:
+        logger.warning("invalid_body_selector", selector=selector, error=str(e))
+        return None
+
+def _container_text(root: etree._Element, selectors: Sequence[str]) -> tuple[str, str]:
+    """
+    Texto do corpo do ato pelo primeiro seletor que encontrar texto (todos os nós
+    encontrados por ele, em ordem). Retorna (texto, estratégia); sem correspondência,
+    o texto é vazio e a estratégia é PAGE_STRATEGY.
+    """
+    for selector in selectors:
+        xpath = _compile_selector(selector)
+        if xpath is None:
+            continue
+        nodes = [node for node in xpath(root) if isinstance(node, etree._Element)]
+        text = _collapse(" ".join(chunk for node in nodes for chunk in node.itertext()))
+        if text:
+            return text, selector
+    return "", PAGE_STRATEGY
+
+def parse_article(
+    html_content: str,
+    url: str = "",
+    selectors: Optional[Sequence[str]] = None,
+) -> ArticleDocument:
+    """
+    Analisa a página de um ato uma única vez (lxml) e devolve título, texto limpo
+    e os metadados do DOU encontrados (publicação, edição, seção, página, órgão).
+    O texto é só o corpo do ato, localizado pela cadeia de seletores XPath
+    (padrão: DEFAULT_BODY_SELECTORS); sem correspondência, é o da página inteira.
+    A estratégia usada fica em metadata["extraction"] (o seletor ou "page").
+    selectors=() desliga a busca pelo corpo.
+    O texto preserva acentos e maiúsculas/minúsculas (formato de armazenamento),
+    com espaços em branco colapsados.
+    """
+    root = _parse_html(html_content)
+    if root is None:
+        return ArticleDocument(title="", text="", url=url)
+
+    title_node = root.find(".//title")
+    title = _collapse(title_node.text_content()) if title_node is not None else ""
+
+    metadata = {}
+    for key, xpath in _DOU_METADATA.items():
+        nodes = xpath(root)
+        if nodes:
+            value = _collapse(nodes[0].text_content())
+            if value:
+                metadata[key] = value
+
+    # Remove comentários e tags sem texto visível, preservando o texto que vem depois delas
+    etree.strip_elements(root, etree.Comment, *_NON_TEXT_TAGS, with_tail=False)
+    text, strategy = _container_text(root, DEFAULT_BODY_SELECTORS if selectors is None else selectors)
+    if not text:
+        text = _collapse(" ".join(root.itertext()))
+    metadata["extraction"] = strategy
+
+    return ArticleDocument(title=title, text=text, url=url, metadata=metadata)
+
+# Seletores avaliáveis durante o parsing em fluxo: //tag ou //tag com teste de classe
+_STREAMABLE_SELECTOR = re.compile(
+    r"^//(\*|[\w-]+)"
+    r"(?:\[contains\(concat\(' ', normalize-space\(@class\), ' '\), ' ([\w-]+) '\)\])?$"
+)
+
+def _streamable(selector: str) -> Optional[tuple[str, Optional[str]]]:
+    match = _STREAMABLE_SELECTOR.match(selector.strip())
+    if match is None:
+        return None
+    return match.group(1), match.group(2)
+
+class _ArticleTarget:
+    """
+    Alvo do parser lxml em fluxo: recebe eventos de tags e texto e guarda só o
+    necessário (título, metadados, texto da página e dos contêineres do corpo).
+    Os pedaços de texto são agrupados por nó, como em itertext().
+    """
+
+    def __init__(self, selectors: Sequence[str]):
+        self._selectors = [(selector, _streamable(selector)) for selector in selectors]
+        for selector, parsed in self._selectors:
+            if parsed is None:
+                logger.warning("body_selector_not_streamable", selector=selector)
+        self._inside = [0] * len(self._selectors)
+        self._containers: list[list[str]] = [[] for _ in self._selectors]
+        self._page: list[str] = []
+        self._buffer: list[str] = []
+        self._stack: list[tuple[bool, list[int], list[str], bool]] = []
+        self._skip = 0
+        self._title: Optional[list[str]] = None
+        self._title_done = False
+        self._meta_active: dict[str, list[str]] = {}
+        self.metadata: dict[str, str] = {}
+
+    def _flush(self) -> None:
+        if not self._buffer:
+            return
+        text = "".join(self._buffer)
+        self._buffer.clear()
+        if self._title is not None:
+            self._title.append(text)
+        for chunks in self._meta_active.values():
+            chunks.append(text)
+        if self._skip:
+            return
+        # Espaços já normalizados por nó: o texto final é só a junção dos pedaços
+        text = _collapse(text)
+        if not text:
+            return
+        self._page.append(text)
+        for index, depth in enumerate(self._inside):
+            if depth:
+                self._containers[index].append(text)
+
+    def start(self, tag, attrib) -> None:
+        self._flush()
+        if not isinstance(tag, str):
+            tag = ""
+        classes = (attrib.get("class") or "").split()
+
+        opened = []
+        for index, (_, parsed) in enumerate(self._selectors):
+            if parsed is None:
+                continue
+            wanted_tag, wanted_class = parsed
+            if wanted_tag in ("*", tag) and (wanted_class is None or wanted_class in classes):
+                self._inside[index] += 1
+                opened.append(index)
+
+        opened_meta = []
+        for key, css_class in _DOU_METADATA_CLASSES.items():
+            if css_class in classes and key not in self.metadata and key not in self._meta_active:
+                self._meta_active[key] = []
+                opened_meta.append(key)
+
+        is_title = tag == "title" and not self._title_done and self._title is None
+        if is_title:
+            self._title = []
+
+        skip = tag in _NON_TEXT_TAGS
+        if skip:
+            self._skip += 1
+        self._stack.append((skip, opened, opened_meta, is_title))
+
+    def end(self, tag) -> None:
+        self._flush()
+        if not self._stack:
+            return
+        skip, opened, opened_meta, is_title = self._stack.pop()
+        if skip:
+            self._skip -= 1
+        for index in opened:
+            self._inside[index] -= 1
+        for key in opened_meta:
+            value = _collapse("".join(self._meta_active.pop(key)))
+            if value:
+                self.metadata[key] = value
+        if is_title:
+            self.title = _collapse("".join(self._title))
+            self._title = None
+            self._title_done = True
+
+    def data(self, text: str) -> None:
+        self._buffer.append(text)
+
+    def comment(self, text: str) -> None:
+        # Comentários não têm texto visível, mas separam nós de texto
+        self._flush()
+
+    def close(self) -> ArticleDocument:
+        self._flush()
+        metadata = dict(self.metadata)
+        strategy, text = PAGE_STRATEGY, ""
+        for (selector, _), chunks in zip(self._selectors, self._containers):
+            if chunks:
+                strategy, text = selector, " ".join(chunks)
+                break
+        else:
+            text = " ".join(self._page)
+        metadata["extraction"] = strategy
+        return ArticleDocument(title=getattr(self, "title", ""), text=text, metadata=metadata)
+
+class StreamingArticleParser:
+    """
+    Parsing incremental de uma página de ato: recebe os blocos da resposta à medida
+    que chegam (feed) e devolve o ArticleDocument em close(), sem montar a árvore
+    nem guardar o HTML inteiro. Resultado equivalente ao de parse_article; dos
+    seletores do corpo, só os da forma //tag e //tag[contains(...@class...)] são
+    avaliados (os demais são ignorados, com aviso).
+    """
+
+    def __init__(self, url: str = "", selectors: Optional[Sequence[str]] = None, encoding: Optional[str] = None):
+        self.url = url
+        self._target = _ArticleTarget(DEFAULT_BODY_SELECTORS if selectors is None else selectors)
+        self._parser = etree.HTMLParser(target=self._target, encoding=encoding)
+        self._fed = False
+
+    def feed(self, data) -> None:
+        if data:
+            self._fed = True
+            self._parser.feed(data)
+
+    def close(self) -> ArticleDocument:
+        if not self._fed:
+            return ArticleDocument(title="", text="", url=self.url)
+        try:
+            doc = self._parser.close()
+        except etree.XMLSyntaxError:
+            doc = self._target.close()
+        doc.url = self.url
+        return doc
 
 def extract_title(html_content: str) -> str:
     """
     Extrai o título do conteúdo HTML.
     Retorna o texto da tag <title>, ou string vazia se não encontrado.
     """
-    soup = BeautifulSoup(html_content, "lxml")
-    if soup.title and soup.title.string:
-        return soup.title.string.strip()
-    return ""
+    return parse_article(html_content).title
 
 def extract_text(html_content: str) -> str:
     """
-    Extrai texto limpo do HTML, removendo scripts, estilos e tags.
+    Extrai texto limpo do HTML inteiro, removendo scripts, estilos e tags.
     Preserva acentos originais e maiúsculas/minúsculas (formato de armazenamento).
     """
-    soup = BeautifulSoup(html_content, "lxml")
-    
-    # Remove tags indesejadas
-    for script in soup(["script", "style", "meta", "noscript"]):
-        script.extract()
-        
-    # Obtém texto
-    text = soup.get_text(separator=" ")
-    
-    # Normaliza espaços em branco: colapsa múltiplos espaços/novas linhas em espaço único
-    # Isso torna a correspondência regex e o armazenamento muito mais limpos
-    clean_text = " ".join(text.split())
-    
-    return clean_text
+    return parse_article(html_content, selectors=()).text
 
-def normalize_text(text: str) -> str:
+def normalize_text_nfd(text: str) -> str:
     """
-    Normaliza o texto para correspondência de pesquisa:
-    1. Minúsculas
-    2. Remove acentos (decomposição NFD -> filtra marcas sem espaçamento)
+    Implementação de referência (mais lenta) de normalize_text: decomposição NFD
+    de todo o texto e filtragem caractere a caractere. Mantida para testes de
+    equivalência e para o benchmark do normalizador.
     """
     # Normaliza para a forma NFD (decompõe caracteres de acentos)
     nfkd_form = unicodedata.normalize('NFD', text)
@@ -45,3 +289,82 @@ def normalize_text(text: str) -> str:
     
     # Retorna em minúsculas (e NFC recomposto principalmente para aparência ascii padrão, embora NFD esteja bem também)
     return no_accents.lower()
+
+@functools.lru_cache(maxsize=4096)
+def _fold_char(char: str) -> str:
+    """Dobra um caractere isolado (minúsculas, sem acentos); pode resultar em 0 ou mais caracteres."""
+    return normalize_text_nfd(char)
+
+# Tabela pré-calculada para Latin-1 e Latin Extended-A/B (acentos do português e afins);
+# outros caracteres não-ASCII usam o caminho lento, com cache
+_FOLD_TABLE = {chr(code): _fold_char(chr(code)) for code in range(0x80, 0x250)}
+_NON_ASCII = re.compile(r"[^\x00-\x7f]")
+
+def _fold_non_ascii(char: str) -> str:
+    folded = _FOLD_TABLE.get(char)
+    return folded if folded is not None else _fold_char(char)
+
+class FoldedText(NamedTuple):
+    """
+    Texto dobrado (minúsculas, sem acentos) e o mapa de posições de volta ao original:
+    offsets[i] é o índice no original do caractere i do texto dobrado, com uma
+    sentinela final igual ao tamanho do original. offsets é None quando as posições
+    coincidem (caso comum: nenhum caractere some nem se expande ao ser dobrado).
+    """
+    text: str
+    offsets: Optional[array]
+
+    def original_span(self, start: int, end: int) -> tuple[int, int]:
+        """Converte o intervalo [start, end) do texto dobrado para o texto original."""
+        if self.offsets is None:
+            return start, end
+        return self.offsets[start], self.offsets[end]
+
+def fold_text(text: str) -> FoldedText:
+    """
+    Versão rápida de normalize_text que também devolve o mapa de posições para o
+    texto original. O texto passa por str.lower() (em C) e só os caracteres não-ASCII
+    são trocados pela tabela. Se algum caractere some (marca combinante) ou vira
+    vários (ex.: ligaduras), refaz a dobra por trechos montando o mapa de posições.
+    """
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        irregular = []
+
+        def fold_match(match: re.Match) -> str:
+            folded = _fold_non_ascii(match.group())
+            if len(folded) != 1:
+                irregular.append(match.start())
+            return folded
+
+        folded = _NON_ASCII.sub(fold_match, lowered)
+        if not irregular:
+            return FoldedText(folded, None)
+
+    parts: list[str] = []
+    offsets = array("I")
+    position = 0
+    for match in _NON_ASCII.finditer(text):
+        index = match.start()
+        if index > position:
+            parts.append(text[position:index].lower())
+            offsets.extend(range(position, index))
+        folded = _fold_non_ascii(text[index])
+        parts.append(folded)
+        offsets.extend([index] * len(folded))
+        position = index + 1
+    if position < len(text):
+        parts.append(text[position:].lower())
+        offsets.extend(range(position, len(text)))
+    offsets.append(len(text))
+    return FoldedText("".join(parts), offsets)
+
+def normalize_text(text: str) -> str:
+    """
+    Normaliza o texto para correspondência de pesquisa:
+    1. Minúsculas
+    2. Remove acentos
+    Caminho rápido por tabela (ver fold_text); mesmo resultado
+    de normalize_text_nfd para textos em português.
+    """
+    return fold_text(text).text
@@ -0,0 +1,237 @@
+import datetime
+import email.utils
+import multiprocessing
+import threading
+import time
+from typing import Callable, Optional
+
+import structlog
+
+logger = structlog.get_logger()
+
+class TokenBucket:
+    """
+    Balde de tokens thread-safe usado como orçamento global de requisições.
+    Cada requisição consome um token; os tokens são repostos a `rate` por segundo
+    até o limite `capacity` (rajada máxima permitida).
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if rate <= 0:
+            raise ValueError("rate deve ser positivo")
+        self._rate = float(rate)
+        self._capacity = max(1.0, float(capacity))
+        self._tokens = self._capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self) -> float:
+        return self._rate
+
+    @property
+    def capacity(self) -> float:
+        return self._capacity
+
+    def set_rate(self, rate: float) -> None:
+        """Altera a taxa de reposição sem perder os tokens já acumulados."""
+        if rate <= 0:
+            raise ValueError("rate deve ser positivo")
+        with self._lock:
+            self._refill()
+            self._rate = float(rate)
+
+    def _refill(self) -> None:
+        now = self._clock()
+        elapsed = now - self._last
+        if elapsed > 0:
+            self._tokens = min(self._capacity, self._tokens + elapsed * self._rate)
+            self._last = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Consome tokens se disponíveis imediatamente. Retorna False caso contrário."""
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Bloqueia até que `tokens` estejam disponíveis e os consome.
+        Retorna:
+            Tempo total (segundos) esperado pelo chamador.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                # Tempo até o balde acumular o que falta
+                wait = (tokens - self._tokens) / self._rate
+            self._sleep(wait)
+            waited += wait
+
+def _shared_field(index: int) -> property:
+    return property(
+        lambda self: self._shared[index],
+        lambda self, value: self._shared.__setitem__(index, value),
+    )
+
+class SharedTokenBucket(TokenBucket):
+    """
+    TokenBucket cujo estado (taxa, capacidade, tokens, último abastecimento) fica em
+    memória compartilhada, protegido por um multiprocessing.Lock. Passado aos processos
+    filhos na criação (ex.: initargs do pool), faz todos consumirem um único orçamento.
+    """
+
+    _rate = _shared_field(0)
+    _capacity = _shared_field(1)
+    _tokens = _shared_field(2)
+    _last = _shared_field(3)
+
+    def __init__(self, rate: float, capacity: float = 1.0, ctx=None, **kwargs):
+        ctx = ctx or multiprocessing.get_context()
+        self._shared = ctx.RawArray("d", 4)
+        super().__init__(rate, capacity, **kwargs)
+        self._lock = ctx.Lock()
+
+def parse_retry_after(value: Optional[str], now: Optional[datetime.datetime] = None) -> Optional[float]:
+    """
+    Converte o cabeçalho Retry-After (segundos ou data HTTP) em segundos de espera.
+    Retorna None se ausente ou inválido.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=datetime.timezone.utc)
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    return max(0.0, (when - now).total_seconds())
+
+class AdaptiveRateController:
+    """
+    Controlador AIMD (aumento aditivo, redução multiplicativa) sobre um TokenBucket.
+    - Respostas 2xx rápidas aumentam a taxa em `increase` req/s até `max_rate`.
+    - 429/5xx, falhas de rede ou latência acima de `latency_target` multiplicam a taxa
+      por `decrease` (no máximo uma redução a cada `decrease_cooldown` segundos).
+    - Retry-After pausa todas as requisições até o instante indicado pelo servidor.
+    """
+
+    def __init__(
+        self,
+        bucket: TokenBucket,
+        min_rate: float = 0.1,
+        max_rate: float = 2.0,
+        increase: float = 0.05,
+        decrease: float = 0.5,
+        latency_target: float = 3.0,
+        decrease_cooldown: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self._bucket = bucket
+        self._min_rate = min_rate
+        self._max_rate = max(max_rate, min_rate)
+        self._increase = increase
+        self._decrease = decrease
+        self._latency_target = latency_target
+        self._decrease_cooldown = decrease_cooldown
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+        self._last_decrease = float("-inf")
+        self._latency_ewma: Optional[float] = None
+        self._successes = 0
+        self._throttles = 0
+        self._failures = 0
+        self._set_rate(bucket.rate)
+
+    @property
+    def rate(self) -> float:
+        return self._bucket.rate
+
+    def _set_rate(self, rate: float) -> None:
+        self._bucket.set_rate(min(self._max_rate, max(self._min_rate, rate)))
+
+    def _back_off(self, reason: str) -> None:
+        now = self._clock()
+        if now - self._last_decrease < self._decrease_cooldown:
+            return
+        self._last_decrease = now
+        old = self._bucket.rate
+        self._set_rate(old * self._decrease)
+        logger.warning("rate_backoff", reason=reason, old_rate=round(old, 3), new_rate=round(self._bucket.rate, 3))
+
+    def record_response(self, status_code: int, latency: float, retry_after: Optional[str] = None) -> None:
+        """Alimenta o controlador com o resultado de uma requisição concluída."""
+        with self._lock:
+            if self._latency_ewma is None:
+                self._latency_ewma = latency
+            else:
+                self._latency_ewma = 0.8 * self._latency_ewma + 0.2 * latency
+
+            if status_code == 429 or status_code >= 500:
+                self._throttles += 1
+                pause = parse_retry_after(retry_after)
+                if pause is not None:
+                    self._paused_until = max(self._paused_until, self._clock() + pause)
+                    logger.warning("rate_retry_after", seconds=pause, status=status_code)
+                self._back_off(f"status_{status_code}")
+            elif self._latency_ewma > self._latency_target:
+                self._back_off("latency")
+            elif 200 <= status_code < 300:
+                self._successes += 1
+                self._set_rate(self._bucket.rate + self._increase)
+
+    def record_failure(self) -> None:
+        """Registra falha de rede (timeout, conexão recusada)."""
+        with self._lock:
+            self._failures += 1
+            self._back_off("network_error")
+
+    def pause_remaining(self) -> float:
+        """Segundos restantes da pausa imposta por Retry-After (0 se não houver)."""
+        return max(0.0, self._paused_until - self._clock())
+
+    def wait_for_clearance(self) -> float:
+        """Bloqueia enquanto houver pausa Retry-After ativa. Retorna o tempo esperado."""
+        waited = 0.0
+        while True:
+            remaining = self.pause_remaining()
+            if remaining <= 0:
+                return waited
+            self._sleep(remaining)
+            waited += remaining
+
+    def state(self) -> dict:
+        """Estado atual para logs: taxa, pausa, latência média e contadores."""
+        with self._lock:
+            return {
+                "rate": round(self._bucket.rate, 3),
+                "min_rate": self._min_rate,
+                "max_rate": self._max_rate,
+                "paused_for": round(self.pause_remaining(), 3),
+                "latency_ewma": round(self._latency_ewma, 3) if self._latency_ewma is not None else None,
+                "successes": self._successes,
+                "throttled": self._throttles,
+                "failures": self._failures,
+            }
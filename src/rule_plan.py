@@ -0,0 +1,214 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from functools import cached_property
+from typing import Dict, Iterable, Optional, Tuple
+
+import structlog
+
+from . import config
+from .automaton import TermAutomaton
+from .fuzzy import FuzzyTerms, check_edits, parse_term, term_key
+from .expression import Node, contains_near, parse_expression, terms as expression_terms
+from .models import AdvancedMatchRule, Config
+from .parser import normalize_text
+
+logger = structlog.get_logger()
+
+# Incrementar quando a forma compilada mudar (invalida planos em cache)
+PLAN_VERSION = 3
+
+@dataclass(frozen=True)
+class CompiledTerm:
+    term: str        # Como escrito na configuração, sem o sufixo ~k (vai para MatchEntry.keyword)
+    normalized: str  # Minúsculo e sem acentos, pronto para a busca
+    max_edits: int = 0  # > 0: termo aproximado, buscado pelo FuzzyTerms e não pelo autômato
+
+    @property
+    def key(self) -> str:
+        """Chave das ocorrências do termo no resultado da varredura."""
+        return term_key(self.normalized, self.max_edits)
+
+@dataclass(frozen=True)
+class CompiledRule:
+    name: str
+    title_terms: Tuple[str, ...]  # Já normalizados
+    body_terms: Tuple[CompiledTerm, ...]  # Com expressão: todos os termos dela (para a varredura)
+    expression: Optional[Node] = None
+    uses_near: bool = False  # A expressão precisa das posições em palavras
+
+    @property
+    def title_only(self) -> bool:
+        """Regra resolvida só pelo título (dispensa baixar o artigo)."""
+        return not self.body_terms
+
+    @property
+    def requires_title(self) -> bool:
+        return bool(self.title_terms)
+
+    def title_matches(self, normalized_title: str) -> bool:
+        """Sem title_terms, qualquer título serve; senão, basta um termo (lógica OR)."""
+        return not self.title_terms or any(term in normalized_title for term in self.title_terms)
+
+@dataclass(frozen=True)
+class SectionPlan:
+    """
+    Tudo o que a correspondência de uma seção precisa, já compilado: keywords e
+    regras com termos normalizados, o autômato dos termos exatos de corpo e os
+    padrões dos termos aproximados (`termo~k`).
+    """
+    section: str
+    keywords: Tuple[CompiledTerm, ...]
+    rules: Tuple[CompiledRule, ...]
+    automaton: TermAutomaton = field(compare=False, repr=False)
+    fuzzy: FuzzyTerms = field(default_factory=lambda: FuzzyTerms(()), compare=False, repr=False)
+    coalesce_contexts: bool = False  # storage.coalesce_contexts: um trecho por grupo de ocorrências próximas
+
+    @cached_property
+    def title_only_rules(self) -> Tuple[CompiledRule, ...]:
+        return tuple(rule for rule in self.rules if rule.title_only)
+
+    @cached_property
+    def body_rules(self) -> Tuple[CompiledRule, ...]:
+        return tuple(rule for rule in self.rules if not rule.title_only)
+
+    @cached_property
+    def title_automaton(self) -> TermAutomaton:
+        """Termos de título das regras de corpo: uma varredura do título da listagem aponta as regras candidatas."""
+        return TermAutomaton(term for rule in self.body_rules for term in rule.title_terms)
+
+    def candidate_rules(self, normalized_title: str) -> Tuple[CompiledRule, ...]:
+        """
+        Regras de corpo que ainda podem casar com um ato, pelo título já normalizado
+        (da listagem ou do slug): as sem title_terms e as com algum termo no título.
+        """
+        found = self.title_automaton.search(normalized_title)
+        return tuple(
+            rule for rule in self.body_rules
+            if not any(rule.title_terms) or any(term in found for term in rule.title_terms)
+        )
+
+    @property
+    def needs_body(self) -> bool:
+        """Se algum artigo da seção precisa ser baixado (keywords ou regras com termos de corpo)."""
+        return bool(self.keywords) or bool(self.body_rules)
+
+@dataclass(frozen=True)
+class RulePlan:
+    """
+    Plano de regras de uma configuração, identificado pelo hash das regras: a tabela
+    de roteamento seção -> SectionPlan, mais o plano das demais seções (só as regras
+    sem seções definidas, ex.: seções extras de um zip do INLABS).
+    """
+    key: str
+    sections: Dict[str, SectionPlan]
+    other_sections: SectionPlan
+
+    def for_section(self, section: str) -> SectionPlan:
+        plan = self.sections.get(section)
+        if plan is None:
+            plan = replace(self.other_sections, section=section)
+        return plan
+
+def compile_term(term: str) -> CompiledTerm:
+    """Keyword ou termo de corpo; `termo~k` vira um termo aproximado com até k edições."""
+    text, max_edits = parse_term(term)
+    normalized = normalize_text(text)
+    check_edits(normalized, max_edits)
+    return CompiledTerm(text, normalized, max_edits)
+
+def _compile_rule(rule: AdvancedMatchRule) -> CompiledRule:
+    title_terms = tuple(normalize_text(term) for term in rule.title_terms)
+    if getattr(rule, "expression", ""):
+        expression = parse_expression(rule.expression)
+        body_terms = tuple(dict.fromkeys(
+            CompiledTerm(term.text, term.normalized, term.max_edits) for term in expression_terms(expression)
+        ))
+        return CompiledRule(rule.name, title_terms, body_terms, expression, contains_near(expression))
+    return CompiledRule(
+        name=rule.name,
+        title_terms=title_terms,
+        body_terms=tuple(compile_term(term) for term in rule.body_terms),
+    )
+
+def compile_section(
+    section: str,
+    keywords: Iterable[str],
+    rules: Iterable[AdvancedMatchRule],
+    coalesce_contexts: bool = False,
+) -> SectionPlan:
+    """Compila keywords e regras de uma seção (autômato para os termos exatos, Myers para os aproximados)."""
+    compiled_keywords = tuple(compile_term(kw) for kw in keywords)
+    compiled_rules = tuple(_compile_rule(rule) for rule in rules)
+    terms = list(compiled_keywords) + [term for rule in compiled_rules for term in rule.body_terms]
+    return SectionPlan(
+        section,
+        compiled_keywords,
+        compiled_rules,
+        TermAutomaton(term.normalized for term in terms if not term.max_edits),
+        FuzzyTerms((term.normalized, term.max_edits) for term in terms if term.max_edits),
+        coalesce_contexts,
+    )
+
+def config_hash(cfg: Config) -> str:
+    """Hash estável da parte da configuração que define a correspondência (keywords, seções, regras e trechos)."""
+    payload = {
+        "version": PLAN_VERSION,
+        "coalesce_contexts": bool(getattr(cfg.storage, "coalesce_contexts", False)),
+        "keywords": list(cfg.keywords),
+        "sections": list(cfg.sections) if getattr(cfg, "sections", None) else None,
+        "rules": [
+            [
+                rule.name,
+                list(rule.body_terms),
+                list(rule.title_terms),
+                list(getattr(rule, "sections", None) or []),
+                getattr(rule, "expression", ""),
+            ]
+            for rule in cfg.rules
+        ],
+    }
+    data = json.dumps(payload, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+# Planos já compilados, por hash da configuração (reaproveitados entre execuções do daemon)
+_MAX_CACHED_PLANS = 8
+_plans: "OrderedDict[str, RulePlan]" = OrderedDict()
+_plans_lock = threading.Lock()
+
+def build_plan(cfg: Config) -> RulePlan:
+    """
+    Plano compilado da configuração. Configurações com as mesmas regras (mesmo hash)
+    recebem o mesmo plano, então recarregar o config.yaml sem mudanças não recompila nada.
+    """
+    key = config_hash(cfg)
+    coalesce = bool(getattr(cfg.storage, "coalesce_contexts", False))
+    with _plans_lock:
+        plan = _plans.get(key)
+        if plan is not None:
+            _plans.move_to_end(key)
+            return plan
+
+    sections = {
+        section: compile_section(
+            section, config.keywords_for_section(cfg, section), config.rules_for_section(cfg, section), coalesce
+        )
+        for section in config.sections_to_process(cfg)
+    }
+    unsectioned = [rule for rule in cfg.rules if not getattr(rule, "sections", None)]
+    plan = RulePlan(key=key, sections=sections, other_sections=compile_section("", [], unsectioned, coalesce))
+    logger.info(
+        "rule_plan_compiled",
+        key=key[:12],
+        sections=len(sections),
+        terms=sum(len(section.automaton) for section in sections.values()),
+        fuzzy_terms=sum(len(section.fuzzy) for section in sections.values()),
+    )
+
+    with _plans_lock:
+        _plans[key] = plan
+        while len(_plans) > _MAX_CACHED_PLANS:
+            _plans.popitem(last=False)
+    return plan
@@ -0,0 +1,279 @@
+import datetime
+import hashlib
+import json
+import sqlite3
+import threading
+from collections import Counter
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import structlog
+
+from .models import MatchEntry, StorageConfig
+
+logger = structlog.get_logger()
+
+# Banco dentro de storage.output_dir (ao lado dos JSONL, quando importados)
+DATABASE_NAME = "matches.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    id INTEGER PRIMARY KEY,
+    digest BLOB NOT NULL,        -- Identidade da ocorrência (url, regra, termo, trecho, posição): evita duplicatas
+    date TEXT NOT NULL,          -- AAAA-MM-DD
+    section TEXT NOT NULL,
+    url TEXT NOT NULL,
+    rule TEXT NOT NULL,          -- keyword_group (regra ou keyword)
+    term TEXT NOT NULL,          -- keyword (termo encontrado)
+    context TEXT NOT NULL,
+    title TEXT NOT NULL DEFAULT '',
+    capture_timestamp TEXT NOT NULL DEFAULT '',
+    fuzzy INTEGER NOT NULL DEFAULT 0,
+    hits TEXT NOT NULL DEFAULT '[]'
+);
+CREATE UNIQUE INDEX IF NOT EXISTS matches_digest ON matches(digest);
+CREATE INDEX IF NOT EXISTS matches_date ON matches(date, section);
+CREATE INDEX IF NOT EXISTS matches_rule ON matches(rule, date);
+CREATE INDEX IF NOT EXISTS matches_section ON matches(section, date);
+
+-- Índice de texto livre sobre trechos e títulos (sem acentos), mantido por gatilhos
+CREATE VIRTUAL TABLE IF NOT EXISTS matches_fts USING fts5(
+    context, title, content='matches', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS matches_fts_insert AFTER INSERT ON matches BEGIN
+    INSERT INTO matches_fts(rowid, context, title) VALUES (new.id, new.context, new.title);
+END;
+CREATE TRIGGER IF NOT EXISTS matches_fts_delete AFTER DELETE ON matches BEGIN
+    INSERT INTO matches_fts(matches_fts, rowid, context, title) VALUES ('delete', old.id, old.context, old.title);
+END;
+"""
+
+_INSERT = (
+    "INSERT OR IGNORE INTO matches "
+    "(digest, date, section, url, rule, term, context, title, capture_timestamp, fuzzy, hits) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+Row = Tuple[Any, ...]
+
+def database_path(config: StorageConfig) -> Path:
+    return Path(config.output_dir) / DATABASE_NAME
+
+def connect(path: Union[str, Path]) -> sqlite3.Connection:
+    """Abre (e cria, se preciso) o banco com o esquema. WAL: o painel lê enquanto o raspador grava."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path), check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+def iso_date(value: str) -> str:
+    """Data no formato do banco (AAAA-MM-DD); registros antigos podem estar em DD/MM/AAAA."""
+    value = (value or "").strip()
+    for fmt in ("%Y-%m-%d", "%d/%m/%Y"):
+        try:
+            return datetime.datetime.strptime(value, fmt).date().isoformat()
+        except ValueError:
+            continue
+    return value
+
+def identity(entry: Dict[str, Any], ordinals: Optional[Counter] = None) -> Tuple[str, ...]:
+    """
+    Identidade de uma ocorrência: url, regra, termo, trecho e início no texto (offset),
+    que separa ocorrências com o mesmo trecho (termo repetido num ato curto). Registros
+    antigos não têm offset: recebem o número de ordem entre as linhas iguais já vistas
+    (ordinals, contado por lote de leitura), então reler o mesmo lote dá as mesmas identidades.
+    """
+    key = (
+        entry.get("url") or "",
+        entry.get("keyword_group") or entry.get("keyword") or "",
+        entry.get("keyword") or "",
+        entry.get("context") or "",
+    )
+    offset = entry.get("offset")
+    if offset is not None:
+        return key + (str(offset),)
+    ordinal = 0
+    if ordinals is not None:
+        ordinal = ordinals[key]
+        ordinals[key] += 1
+    return key + (f"#{ordinal}",)
+
+def _row(entry: Dict[str, Any], ordinals: Optional[Counter] = None) -> Row:
+    """Linha da tabela a partir de um MatchEntry (como dicionário, o mesmo formato dos JSONL)."""
+    url, rule, term, context, _ = key = identity(entry, ordinals)
+    digest = hashlib.blake2b("\x1f".join(key).encode("utf-8"), digest_size=16).digest()
+    return (
+        digest,
+        iso_date(entry.get("date") or ""),
+        entry.get("section") or "",
+        url,
+        rule,
+        term,
+        context,
+        entry.get("title") or "",
+        entry.get("capture_timestamp") or "",
+        int(bool(entry.get("fuzzy"))),
+        json.dumps(entry.get("hits") or [], ensure_ascii=False),
+    )
+
+class SqliteMatchWriter:
+    """
+    Gravador das correspondências no banco, com a mesma interface do MatchWriter
+    (storage.open_writer escolhe pelo storage.format). As linhas são inseridas em
+    lote (executemany) ao passar de flush_rows, dentro de uma transação que só é
+    confirmada em flush() ou close(). Os callbacks de write() (ex.: "stored" no
+    diário) rodam depois do commit.
+    """
+
+    def __init__(self, config: StorageConfig, flush_rows: int = 1000):
+        self.path = database_path(config)
+        self.flush_rows = flush_rows
+        self._conn = connect(self.path)
+        self._rows: List[Row] = []
+        self._callbacks: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self.lines_written = 0  # Ocorrências novas (duplicatas são ignoradas)
+        self.flushes = 0
+
+    def write(self, matches: Iterable[MatchEntry], on_flushed: Optional[Callable[[], None]] = None) -> None:
+        with self._lock:
+            if self._closed:
+                raise ValueError("SqliteMatchWriter já fechado")
+            self._rows.extend(_row(asdict(match)) for match in matches)
+            if on_flushed is not None:
+                self._callbacks.append(on_flushed)
+            if len(self._rows) >= self.flush_rows:
+                self._insert_locked()
+
+    def flush(self) -> None:
+        """Insere o que falta e confirma a transação."""
+        with self._lock:
+            self._commit_locked()
+
+    def _insert_locked(self) -> None:
+        if not self._rows:
+            return
+        # rowcount conta só as linhas inseridas (não as ignoradas nem as do índice FTS)
+        self.lines_written += self._conn.executemany(_INSERT, self._rows).rowcount
+        self._rows = []
+
+    def _commit_locked(self) -> None:
+        self._insert_locked()
+        if self._conn.in_transaction:
+            self._conn.commit()
+            self.flushes += 1
+        callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            try:
+                self._commit_locked()
+            finally:
+                self._closed = True
+                self._conn.close()
+        logger.info("match_writer_closed", database=str(self.path), lines=self.lines_written, flushes=self.flushes)
+
+    def __enter__(self) -> "SqliteMatchWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+def import_jsonl(data_dir: Union[str, Path], db_path: Union[str, Path]) -> int:
+    """
+    Importa os arquivos *.jsonl de data_dir para o banco numa única transação.
+    Pode ser repetido: ocorrências já presentes são ignoradas. Retorna quantas foram inseridas.
+    """
+    data_dir = Path(data_dir)
+    conn = connect(db_path)
+    files = lines = inserted = 0
+    try:
+        with conn:
+            for path in sorted(data_dir.glob("*.jsonl")):
+                files += 1
+                rows = []
+                ordinals: Counter = Counter()
+                with open(path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except json.JSONDecodeError:
+                            continue
+                        lines += 1
+                        # Registros sem regra nem termo: o nome do arquivo é o grupo (como no painel)
+                        if not entry.get("keyword_group") and not entry.get("keyword"):
+                            entry["keyword_group"] = path.stem
+                        rows.append(_row(entry, ordinals))
+                inserted += conn.executemany(_INSERT, rows).rowcount
+    finally:
+        conn.close()
+    logger.info("jsonl_import_finished", files=files, lines=lines, inserted=inserted, database=str(db_path))
+    return inserted
+
+def fts_query(text: str) -> str:
+    """Busca livre do usuário como consulta FTS5: cada palavra entre aspas (sem operadores), todas obrigatórias."""
+    return " ".join('"' + word.replace('"', '""') + '"' for word in text.split())
+
+def available_dates(conn: sqlite3.Connection) -> List[str]:
+    return [row[0] for row in conn.execute("SELECT DISTINCT date FROM matches ORDER BY date DESC")]
+
+def available_rules(conn: sqlite3.Connection) -> List[str]:
+    return [row[0] for row in conn.execute("SELECT DISTINCT rule FROM matches ORDER BY rule")]
+
+def query_matches(
+    conn: sqlite3.Connection,
+    date: Optional[str] = None,
+    rules: Optional[Sequence[str]] = None,
+    sections: Optional[Sequence[str]] = None,
+    text: str = "",
+) -> List[Dict[str, Any]]:
+    """
+    Ocorrências filtradas por data, regras, seções e texto livre (índice FTS sobre
+    trecho e título), no formato dos registros JSONL (keyword, keyword_group, ...).
+    """
+    where, params = [], []
+    if date:
+        where.append("m.date = ?")
+        params.append(iso_date(date))
+    if rules:
+        where.append(f"m.rule IN ({', '.join('?' * len(rules))})")
+        params.extend(rules)
+    if sections:
+        where.append(f"m.section IN ({', '.join('?' * len(sections))})")
+        params.extend(sections)
+    if text.strip():
+        where.append("m.id IN (SELECT rowid FROM matches_fts WHERE matches_fts MATCH ?)")
+        params.append(fts_query(text))
+
+    sql = (
+        "SELECT m.term, m.context, m.date, m.section, m.url, m.capture_timestamp, m.title, m.rule, m.fuzzy, m.hits "
+        "FROM matches m"
+    )
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY m.date DESC, m.section, m.id"
+
+    return [
+        {
+            "keyword": term,
+            "context": context,
+            "date": date_value,
+            "section": section,
+            "url": url,
+            "capture_timestamp": captured,
+            "title": title,
+            "keyword_group": rule,
+            "fuzzy": bool(fuzzy),
+            "hits": json.loads(hits),
+        }
+        for term, context, date_value, section, url, captured, title, rule, fuzzy, hits in conn.execute(sql, params)
+    ]
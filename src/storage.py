@@ -1,10 +1,20 @@
+import functools
 import json
+import os
 import re
+import threading
+import time
 from dataclasses import asdict
 from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Iterable, List, Optional, Union
 
+import structlog
+
+from . import sqlite_store
 from .models import MatchEntry, StorageConfig
 
+logger = structlog.get_logger()
+
 def slugify(text: str) -> str:
     """
     Higieniza uma string para ser segura para nomes de arquivos.
@@ -17,6 +27,11 @@ def slugify(text: str) -> str:
     # Remove hifens à esquerda/direita e converte para minúsculas
     return text.strip('-').lower()
 
+@functools.lru_cache(maxsize=1024)
+def file_stem(group_name: str) -> str:
+    """Nome do arquivo JSONL de um grupo (regra ou keyword), memorizado: os mesmos grupos se repetem a execução toda."""
+    return slugify(group_name)
+
 def save_match(match: MatchEntry, config: StorageConfig) -> None:
     """
     Anexa uma entrada de correspondência a um arquivo JSONL dedicado à sua palavra-chave/categoria.
@@ -28,7 +43,7 @@ def save_match(match: MatchEntry, config: StorageConfig) -> None:
     # Determina o nome do arquivo a partir da regra ou palavra-chave (keyword_group)
     # Se keyword_group estiver vazio (legado), usa keyword
     group_name = match.keyword_group if match.keyword_group else match.keyword
-    safe_keyword = slugify(group_name)
+    safe_keyword = file_stem(group_name)
     file_path = output_dir / f"{safe_keyword}.jsonl"
     
     # Prepara dados
@@ -37,3 +52,133 @@ def save_match(match: MatchEntry, config: StorageConfig) -> None:
     # Anexa ao arquivo
     with open(file_path, "a", encoding="utf-8") as f:
         f.write(json.dumps(data, ensure_ascii=False) + "\n")
+
+def _repair_tail(path: Path) -> None:
+    """Descarta uma última linha incompleta (processo morto no meio de uma escrita)."""
+    try:
+        size = path.stat().st_size
+    except FileNotFoundError:
+        return
+    if size == 0:
+        return
+    with open(path, "r+b") as f:
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            return
+        # Procura o último "\n" de trás para frente, em blocos
+        end = size
+        while end > 0:
+            start = max(0, end - 65536)
+            f.seek(start)
+            newline = f.read(end - start).rfind(b"\n")
+            if newline >= 0:
+                f.truncate(start + newline + 1)
+                break
+            end = start
+        else:
+            f.truncate(0)
+    logger.warning("storage_truncated_tail_discarded", path=str(path))
+
+class MatchWriter:
+    """
+    Gravador das correspondências de uma execução inteira: um handle por arquivo de
+    grupo, aberto uma vez, e as linhas JSON acumuladas em memória. O buffer é
+    descarregado ao passar de flush_bytes ou de flush_seconds desde a última
+    descarga, e no close(), que faz o único fsync por arquivo.
+
+    Cada descarga escreve só linhas completas; ao abrir um arquivo, uma última linha
+    incompleta deixada por uma execução interrompida é removida, então um arquivo
+    nunca fica com meia linha JSON seguida de dados válidos.
+
+    write() aceita um callback (ex.: marcar a URL como "stored" no diário) chamado
+    quando as linhas daquela chamada já foram descarregadas para o arquivo.
+    """
+
+    def __init__(self, config: StorageConfig, flush_bytes: Optional[int] = None, flush_seconds: Optional[float] = None):
+        self.output_dir = Path(config.output_dir)
+        self.flush_bytes = flush_bytes if flush_bytes is not None else config.write_buffer_kb * 1024
+        self.flush_seconds = flush_seconds if flush_seconds is not None else config.flush_seconds
+        self._handles: Dict[str, BinaryIO] = {}
+        self._buffers: Dict[str, List[bytes]] = {}
+        self._buffered = 0
+        self._callbacks: List[Callable[[], None]] = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._closed = False
+        self.lines_written = 0
+        self.flushes = 0
+
+    def write(self, matches: Iterable[MatchEntry], on_flushed: Optional[Callable[[], None]] = None) -> None:
+        with self._lock:
+            if self._closed:
+                raise ValueError("MatchWriter já fechado")
+            for match in matches:
+                # Arquivo pela regra ou keyword (keyword_group); legado sem grupo usa keyword
+                name = file_stem(match.keyword_group or match.keyword)
+                line = (json.dumps(asdict(match), ensure_ascii=False) + "\n").encode("utf-8")
+                self._buffers.setdefault(name, []).append(line)
+                self._buffered += len(line)
+            if on_flushed is not None:
+                self._callbacks.append(on_flushed)
+            if self._buffered >= self.flush_bytes or time.monotonic() - self._last_flush >= self.flush_seconds:
+                self._flush_locked()
+
+    def flush(self) -> None:
+        """Descarrega o buffer para os arquivos (sem fsync)."""
+        with self._lock:
+            self._flush_locked()
+
+    def _handle(self, name: str) -> BinaryIO:
+        handle = self._handles.get(name)
+        if handle is None:
+            if not self._handles:
+                self.output_dir.mkdir(parents=True, exist_ok=True)
+            path = self.output_dir / f"{name}.jsonl"
+            _repair_tail(path)
+            handle = self._handles[name] = open(path, "ab")
+        return handle
+
+    def _flush_locked(self, sync: bool = False) -> None:
+        for name, lines in self._buffers.items():
+            handle = self._handle(name)
+            # Um único write por arquivo, só com linhas inteiras
+            handle.write(b"".join(lines))
+            handle.flush()
+            self.lines_written += len(lines)
+        if self._buffers:
+            self.flushes += 1
+        if sync:
+            for handle in self._handles.values():
+                os.fsync(handle.fileno())
+        self._buffers = {}
+        self._buffered = 0
+        self._last_flush = time.monotonic()
+
+        callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def close(self) -> None:
+        """Descarrega o que falta, faz o fsync de cada arquivo e fecha os handles."""
+        with self._lock:
+            if self._closed:
+                return
+            try:
+                self._flush_locked(sync=True)
+            finally:
+                self._closed = True
+                for handle in self._handles.values():
+                    handle.close()
+        logger.info("match_writer_closed", files=len(self._handles), lines=self.lines_written, flushes=self.flushes)
+
+    def __enter__(self) -> "MatchWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+def open_writer(config: StorageConfig) -> Union[MatchWriter, "sqlite_store.SqliteMatchWriter"]:
+    """Gravador da execução conforme storage.format: arquivos JSONL por grupo ou o banco SQLite."""
+    if config.format == "sqlite":
+        return sqlite_store.SqliteMatchWriter(config)
+    return MatchWriter(config)
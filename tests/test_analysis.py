@@ -0,0 +1,51 @@
+import datetime
+
+from src import analysis, rule_plan
+from src.models import AdvancedMatchRule, Config, LoggingConfig, ScheduleConfig, StorageConfig
+
+def make_config(tmp_path):
+    return Config(
+        schedule=ScheduleConfig(time="06:00"),
+        keywords=[],
+        storage=StorageConfig(output_dir=str(tmp_path / "data"), journal_dir=str(tmp_path / "journal")),
+        logging=LoggingConfig(),
+        rules=[AdvancedMatchRule(name="FN", body_terms=["força nacional"], sections=["dou1"])],
+    )
+
+def article(index: int, matching: bool) -> str:
+    body = "Autoriza o emprego da Força Nacional." if matching else "Dispõe sobre servidores."
+    return f'<html><head><title>Ato {index}</title></head><body><nav>Menu</nav><div class="texto-dou"><p>{body}</p></div></body></html>'
+
+def test_analyze_article_parses_and_matches():
+    """Testa parsing e correspondência de um artigo, com os tempos de cada etapa."""
+    plan = rule_plan.compile_section("dou1", [], [AdvancedMatchRule(name="FN", body_terms=["forca nacional"])])
+    result = analysis.analyze_article(article(1, True), "http://a", plan, "2026-02-10")
+
+    assert result.ok
+    assert result.document.title == "Ato 1"
+    assert result.document.text == "Autoriza o emprego da Força Nacional."
+    assert [m.keyword_group for m in result.matches] == ["FN"]
+    assert result.parse_seconds >= 0 and result.match_seconds >= 0
+
+def test_analysis_pool_processes_all_with_bounded_in_flight(tmp_path):
+    """Testa o pool de processos: todos os artigos analisados, entrada consumida aos poucos e erros devolvidos."""
+    pulled = []
+
+    def articles():
+        for i in range(8):
+            pulled.append(i)
+            yield f"http://a/{i}", article(i, matching=i % 4 == 0)
+        yield "http://a/bad", 12345  # entrada inválida: o erro volta no resultado
+
+    with analysis.AnalysisPool(make_config(tmp_path), workers=2, max_in_flight=2) as pool:
+        results = {}
+        for result in pool.imap_unordered(articles(), "dou1", datetime.date(2026, 2, 10)):
+            # Nunca há mais que max_in_flight artigos puxados e ainda sem resultado
+            assert len(pulled) - len(results) <= pool.max_in_flight
+            results[result.url] = result
+
+    assert len(results) == 9
+    assert not results["http://a/bad"].ok
+    matched = sorted(url for url, r in results.items() if r.ok and r.matches)
+    assert matched == ["http://a/0", "http://a/4"]
+    assert results["http://a/4"].matches[0].date == "2026-02-10"
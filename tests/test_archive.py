@@ -0,0 +1,108 @@
+import datetime
+import json
+
+from src import archive, matcher, storage
+from src.models import StorageConfig
+
+def _line(date, url, context="ctx", section="dou1", group="Regra A", **extra):
+    entry = {
+        "keyword": "força nacional", "context": context, "date": date, "section": section, "url": url,
+        "capture_timestamp": "t", "title": "Portaria", "keyword_group": group,
+    }
+    entry.update(extra)
+    return json.dumps(entry, ensure_ascii=False) + "\n"
+
+def _write(path, lines):
+    path.write_text("".join(lines), encoding="utf-8")
+
+def test_compact_moves_closed_days_to_partitions(tmp_path):
+    """Testa se só os dias fechados vão para o Parquet (por ano/mês/seção) e o dia corrente fica no JSONL."""
+    _write(tmp_path / "regra-a.jsonl", [
+        _line("2026-01-30", "http://1", hits=[[0, 3, "ctx"]]),
+        _line("10/02/2026", "http://2", section="dou2"),
+        _line("2026-02-11", "http://3"),
+        '{"keyword": "cortad\n',
+    ])
+
+    stats = archive.compact(tmp_path, today=datetime.date(2026, 2, 11))
+    assert stats["archived"] == 2 and stats["kept"] == 2 and stats["parts"] == 2
+
+    remaining = (tmp_path / "regra-a.jsonl").read_text(encoding="utf-8").splitlines()
+    assert json.loads(remaining[0])["url"] == "http://3"
+    assert remaining[1] == '{"keyword": "cortad'
+    assert (tmp_path / "archive" / "year=2026" / "month=01" / "section=dou1" / "part-2026-01-30.parquet").exists()
+    assert (tmp_path / "archive" / "year=2026" / "month=02" / "section=dou2" / "part-2026-02-10.parquet").exists()
+
+    frame = archive.read_archive(tmp_path)
+    rows = frame.sort_values("url").to_dict("records")
+    assert [row["date"] for row in rows] == [datetime.date(2026, 1, 30), datetime.date(2026, 2, 10)]
+    assert rows[0]["hits"] == [(0, 3, "ctx")] and rows[1]["hits"] == []
+    assert str(frame["keyword_group"].dtype) == "category"
+
+def test_compact_is_repeatable_and_keeps_archived_days(tmp_path):
+    """Testa se compactar de novo não duplica linhas e se um dia novo não reescreve os já arquivados."""
+    path = tmp_path / "regra-a.jsonl"
+    _write(path, [_line("2026-02-09", "http://1")])
+    archive.compact(tmp_path, today=datetime.date(2026, 2, 10))
+    first_day = tmp_path / "archive" / "year=2026" / "month=02" / "section=dou1" / "part-2026-02-09.parquet"
+    written = first_day.read_bytes()
+    mtime = first_day.stat().st_mtime_ns
+
+    # Interrupção simulada: a mesma linha volta ao JSONL junto com um dia novo
+    _write(path, [_line("2026-02-09", "http://1"), _line("2026-02-10", "http://2")])
+    stats = archive.compact(tmp_path, today=datetime.date(2026, 2, 11))
+    assert stats["archived"] == 1 and stats["duplicates"] == 1
+    assert path.read_text(encoding="utf-8") == ""
+    assert first_day.read_bytes() == written and first_day.stat().st_mtime_ns == mtime
+    assert (first_day.parent / "part-2026-02-10.parquet").exists()
+
+    frame = archive.read_archive(tmp_path)
+    assert sorted(frame["url"]) == ["http://1", "http://2"]
+
+def test_read_archive_prunes_partitions(tmp_path):
+    """Testa os filtros por intervalo de datas, seção e regra, e a leitura só de algumas colunas."""
+    _write(tmp_path / "a.jsonl", [
+        _line("2025-12-31", "http://1"),
+        _line("2026-01-15", "http://2", section="dou3"),
+        _line("2026-02-01", "http://3", group="Regra B"),
+    ])
+    archive.compact(tmp_path, today=datetime.date(2026, 3, 1))
+
+    def urls(**filters):
+        return sorted(archive.read_archive(tmp_path, **filters)["url"])
+
+    assert urls(date_from=datetime.date(2026, 1, 1)) == ["http://2", "http://3"]
+    assert urls(date_to=datetime.date(2026, 1, 15)) == ["http://1", "http://2"]
+    assert urls(date_from=datetime.date(2026, 1, 15), date_to=datetime.date(2026, 1, 15)) == ["http://2"]
+    assert urls(sections=["dou1"]) == ["http://1", "http://3"]
+    assert urls(rules=["Regra B"]) == ["http://3"]
+    assert list(archive.read_archive(tmp_path, columns=["date", "keyword_group"]).columns) == ["date", "keyword_group"]
+
+def test_read_archive_without_archive(tmp_path):
+    assert archive.read_archive(tmp_path).empty
+
+def test_compact_keeps_repeated_occurrences_with_same_context(tmp_path):
+    """Testa se um termo repetido num ato curto (mesmo trecho nas duas ocorrências) não vira duplicata."""
+    matches = matcher.find_matches(
+        "A Força Nacional e a Força Nacional.", ["força nacional"], date="2026-02-10", section="dou1", url="http://a"
+    )
+    assert len(matches) == 2 and matches[0].context == matches[1].context
+    with storage.MatchWriter(StorageConfig(output_dir=str(tmp_path))) as writer:
+        writer.write(matches)
+
+    stats = archive.compact(tmp_path, today=datetime.date(2026, 2, 11))
+    assert stats["archived"] == 2 and stats["duplicates"] == 0
+    assert sorted(archive.read_archive(tmp_path)["offset"]) == [2, 21]
+
+def test_compact_legacy_lines_without_offset(tmp_path):
+    """Testa se linhas antigas iguais (sem offset) continuam distintas, também ao compactar de novo."""
+    path = tmp_path / "a.jsonl"
+    lines = [_line("2026-02-09", "http://1"), _line("2026-02-09", "http://1")]
+    _write(path, lines)
+    assert archive.compact(tmp_path, today=datetime.date(2026, 2, 10))["archived"] == 2
+
+    # Interrupção antes de reescrever o JSONL: as mesmas linhas voltam
+    _write(path, lines)
+    stats = archive.compact(tmp_path, today=datetime.date(2026, 2, 10))
+    assert stats["archived"] == 0 and stats["duplicates"] == 2
+    assert len(archive.read_archive(tmp_path)) == 2
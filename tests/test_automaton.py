@@ -0,0 +1,40 @@
+import random
+
+from src import automaton
+from src.automaton import TermAutomaton
+
+def _reference(terms, text):
+    """Laço de str.find por termo, avançando pelo tamanho do termo (semântica do matcher antigo)."""
+    found = {}
+    for term in dict.fromkeys(t for t in terms if t):
+        idx = text.find(term)
+        while idx >= 0:
+            found.setdefault(term, []).append(idx)
+            idx = text.find(term, idx + len(term))
+    return found
+
+def test_overlapping_terms_and_shared_prefixes():
+    """Testa termos que se sobrepõem, compartilham prefixo ou são sufixo de outro."""
+    terms = ["forca nacional", "forca", "nacional", "al", "aa", ""] + [f"filler{i}" for i in range(150)]
+    text = "forca nacional da forca aaaa nacionalal"
+    engine = TermAutomaton(terms)
+
+    assert len(engine) == 155  # termo vazio descartado
+    assert engine.search(text) == _reference(terms, text)
+    assert engine.search(text)["aa"] == [24, 26]
+
+def test_random_equivalence_with_direct_search(monkeypatch):
+    """Testa o autômato contra a busca direta em textos e termos aleatórios."""
+    rng = random.Random(0)
+    for _ in range(300):
+        text = "".join(rng.choice("ab c") for _ in range(rng.randrange(80)))
+        terms = ["".join(rng.choice("ab c") for _ in range(rng.randrange(5))) for _ in range(rng.randrange(1, 30))]
+        monkeypatch.setattr(automaton, "DIRECT_SEARCH_MAX_TERMS", 0)
+        scanned = TermAutomaton(terms).search(text)
+        monkeypatch.setattr(automaton, "DIRECT_SEARCH_MAX_TERMS", 1000)
+        direct = TermAutomaton(terms).search(text)
+        assert scanned == direct == _reference(terms, text)
+
+def test_empty_inputs():
+    assert TermAutomaton([]).search("qualquer texto") == {}
+    assert TermAutomaton(["termo"]).search("") == {}
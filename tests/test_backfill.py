@@ -0,0 +1,63 @@
+import datetime
+import json
+from unittest.mock import patch
+from src import backfill, journal, main
+from src.models import AdvancedMatchRule, Config, LoggingConfig, MatchEntry, ScheduleConfig, StorageConfig
+
+def make_config(tmp_path):
+    rule = AdvancedMatchRule(name="Força Nacional", body_terms=["força nacional"], sections=["dou1", "dou2"])
+    return Config(
+        schedule=ScheduleConfig(time="00:00"),
+        keywords=[],
+        storage=StorageConfig(output_dir=str(tmp_path / "data"), journal_dir=str(tmp_path / "journal")),
+        logging=LoggingConfig(),
+        rules=[rule],
+    )
+
+def test_iter_dates_skips_weekends():
+    """Testa que sábados e domingos são pulados por padrão."""
+    # 2026-02-06 é sexta-feira
+    dates = list(backfill.iter_dates(datetime.date(2026, 2, 6), datetime.date(2026, 2, 9)))
+    assert dates == [datetime.date(2026, 2, 6), datetime.date(2026, 2, 9)]
+    assert len(list(backfill.iter_dates(datetime.date(2026, 2, 6), datetime.date(2026, 2, 9), include_weekends=True))) == 4
+
+def test_run_backfill_stores_results_and_is_restartable(tmp_path):
+    """Testa a gravação pelo processo pai, o diário por data e a retomada sem refazer tarefas."""
+    cfg = make_config(tmp_path)
+    calls = []
+
+    def fake_process_section(cfg, section, target_date, all_matches, save_results=True, **kwargs):
+        calls.append((target_date, section))
+        assert save_results is False  # só o processo pai grava
+        if section == "dou2" and target_date != datetime.date(2026, 2, 10):
+            return main.SECTION_EMPTY
+        all_matches.append(MatchEntry(
+            keyword="força nacional", context="...", date=target_date.isoformat(), section=section,
+            url=f"http://x/{target_date}/{section}", capture_timestamp="t", keyword_group="Força Nacional",
+        ))
+        # Um artigo falhou nessa seção: as correspondências dela não podem ser gravadas
+        if section == "dou2":
+            return main.SECTION_FAILED
+        return main.SECTION_DONE
+
+    start, end = datetime.date(2026, 2, 9), datetime.date(2026, 2, 10)
+    with patch("src.main.process_section", side_effect=fake_process_section), patch("src.backfill.downloader"):
+        summary = backfill.run_backfill(cfg, start, end, workers=0)
+
+    assert summary["tasks"] == 4
+    assert summary["matches"] == 2
+    assert summary["unfinished_tasks"] == 1
+    lines = (tmp_path / "data" / "for-a-nacional.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["date"] for line in lines] == ["2026-02-09", "2026-02-10"]
+
+    assert journal.CrawlJournal.for_date(cfg.storage.journal_dir, start).is_complete()
+    assert not journal.CrawlJournal.for_date(cfg.storage.journal_dir, end).is_complete()
+
+    # Reinício: apenas a tarefa que falhou é refeita
+    calls.clear()
+    with patch("src.main.process_section", side_effect=fake_process_section), patch("src.backfill.downloader"):
+        summary = backfill.run_backfill(cfg, start, end, workers=0)
+    assert calls == [(end, "dou2")]
+    assert summary["dates_skipped"] == 1
+    # Seção inacabada refeita a cada reinício sem duplicar linhas
+    assert (tmp_path / "data" / "for-a-nacional.jsonl").read_text(encoding="utf-8").splitlines() == lines
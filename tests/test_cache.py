@@ -0,0 +1,83 @@
+import os
+from src.cache import ResponseCache, cache_key, is_listing_url
+
+ARTICLE = "https://www.in.gov.br/web/dou/-/portaria-1"
+LISTING = "https://www.in.gov.br/leiturajornal?secao=dou1&data=10-02-2026"
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+def test_put_and_get_roundtrip(tmp_path):
+    """Testa gravação e leitura com corpo comprimido e validadores."""
+    cache = ResponseCache(str(tmp_path), max_bytes=10_000_000)
+    cache.put(ARTICLE, "<html>Força Nacional</html>", etag='"abc"', last_modified="Tue, 10 Feb 2026 10:00:00 GMT")
+
+    entry = cache.get(ARTICLE)
+    assert entry.body == "<html>Força Nacional</html>"
+    assert entry.fresh
+    assert entry.validators() == {
+        "If-None-Match": '"abc"',
+        "If-Modified-Since": "Tue, 10 Feb 2026 10:00:00 GMT",
+    }
+    assert cache.get("https://www.in.gov.br/outra") is None
+
+def test_listing_pages_expire_but_articles_do_not(tmp_path):
+    """Testa a política de TTL: listagens expiram, artigos não."""
+    clock = FakeClock()
+    cache = ResponseCache(str(tmp_path), max_bytes=10_000_000, listing_ttl=60, clock=clock)
+    cache.put(ARTICLE, "artigo")
+    cache.put(LISTING, "listagem")
+
+    clock.now += 120
+    assert cache.get(ARTICLE).fresh
+    assert not cache.get(LISTING).fresh
+    assert is_listing_url(LISTING)
+    assert not is_listing_url(ARTICLE)
+
+def test_lru_eviction_by_size(tmp_path):
+    """Testa que as entradas menos usadas são removidas quando o limite é excedido."""
+    body = os.urandom(2000).hex()  # pouco compressível
+    first = ResponseCache(str(tmp_path), max_bytes=10_000_000)
+    first.put("https://x/1", body)
+    entry_size = first.size()
+
+    cache = ResponseCache(str(tmp_path), max_bytes=int(entry_size * 2.5))
+    cache.put("https://x/2", body)
+    os.utime(tmp_path / cache_key("https://x/1")[:2] / f"{cache_key('https://x/1')}.z", (1, 1))
+    cache.put("https://x/3", body)
+
+    assert cache.get("https://x/1") is None
+    assert cache.get("https://x/2") is not None
+    assert cache.get("https://x/3") is not None
+    assert cache.size() <= entry_size * 2.5
+
+def test_corrupted_entry_is_discarded(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_bytes=10_000_000)
+    cache.put(ARTICLE, "ok")
+    key = cache_key(ARTICLE)
+    (tmp_path / key[:2] / f"{key}.z").write_bytes(b"lixo")
+
+    assert cache.get(ARTICLE) is None
+    assert not (tmp_path / key[:2] / f"{key}.z").exists()
+
+def test_writer_streams_entry_and_discards_on_error(tmp_path):
+    """Testa a gravação em blocos: a entrada só aparece se a escrita terminar sem erro."""
+    cache = ResponseCache(str(tmp_path), max_bytes=10_000_000)
+    with cache.writer(ARTICLE, etag='"v1"') as writer:
+        writer.write("<html>Força ")
+        writer.write("Nacional</html>")
+    assert cache.get(ARTICLE).body == "<html>Força Nacional</html>"
+    assert cache.get(ARTICLE).etag == '"v1"'
+
+    try:
+        with cache.writer(ARTICLE) as writer:
+            writer.write("<html>incompleto")
+            raise ConnectionError("conexão perdida")
+    except ConnectionError:
+        pass
+    assert cache.get(ARTICLE).body == "<html>Força Nacional</html>"
+    assert list(tmp_path.glob("*/*.tmp*")) == []
@@ -3,7 +3,7 @@ import pytest
 import yaml
 from pathlib import Path
 from src import config
-from src.models import Config, ScheduleConfig, LoggingConfig, StorageConfig
+from src.models import DEFAULT_BODY_SELECTORS, Config, ScheduleConfig, LoggingConfig, StorageConfig
 
 @pytest.fixture
 def valid_config_data():
@@ -65,6 +65,10 @@ def test_load_config_default_values(tmp_path):
     assert cfg.storage.format == "jsonl"
     assert cfg.logging.level == "INFO"
     assert cfg.logging.file == "logs/scrapper.log"
+    assert cfg.crawler.requests_per_second == 0.12
+    assert cfg.crawler.burst == 1
+    assert cfg.crawler.max_workers == 4
+    assert cfg.parser.body_selectors == DEFAULT_BODY_SELECTORS
 
 def test_setup_logging(config_file):
     """Testa se setup_logging roda sem erro."""
@@ -84,3 +88,44 @@ def test_setup_logging(config_file):
     finally:
         # Restaura manipuladores
         logger.handlers = original_handlers
+
+def test_load_config_rule_expression(tmp_path):
+    """Testa regras com expressão: carregada como texto e validada na leitura."""
+    data = {
+        "schedule": {"time": "08:00"},
+        "rules": [{"name": "FN", "expression": "nomeação AND força nacional NOT exoneração", "sections": ["dou2"]}],
+    }
+    p = tmp_path / "expr.yaml"
+    p.write_text(yaml.dump(data, allow_unicode=True), encoding="utf-8")
+    cfg = config.load_config(str(p))
+    assert cfg.rules[0].expression == "nomeação AND força nacional NOT exoneração"
+    assert cfg.rules[0].body_terms == []
+
+    data["rules"][0]["expression"] = "nomeação AND"
+    p.write_text(yaml.dump(data, allow_unicode=True), encoding="utf-8")
+    with pytest.raises(ValueError, match="FN"):
+        config.load_config(str(p))
+
+def test_load_config_rejects_short_fuzzy_terms(tmp_path):
+    """Testa que termos ~k curtos demais são recusados na leitura, com o nome da regra."""
+    data = {"schedule": {"time": "08:00"}, "keywords": ["licitação~1"], "rules": [{"name": "FN", "body_terms": ["cnpj~2"]}]}
+    p = tmp_path / "fuzzy.yaml"
+    p.write_text(yaml.dump(data, allow_unicode=True), encoding="utf-8")
+    with pytest.raises(ValueError, match="FN"):
+        config.load_config(str(p))
+
+    data["rules"][0]["body_terms"] = ["força nacional~2"]
+    p.write_text(yaml.dump(data, allow_unicode=True), encoding="utf-8")
+    assert config.load_config(str(p)).rules[0].body_terms == ["força nacional~2"]
+
+def test_load_config_storage_format(tmp_path):
+    """Testa a escolha do backend de armazenamento e a recusa de formatos desconhecidos."""
+    data = {"schedule": {"time": "08:00"}, "storage": {"format": "sqlite"}}
+    p = tmp_path / "storage.yaml"
+    p.write_text(yaml.dump(data), encoding="utf-8")
+    assert config.load_config(str(p)).storage.format == "sqlite"
+
+    data["storage"]["format"] = "csv"
+    p.write_text(yaml.dump(data), encoding="utf-8")
+    with pytest.raises(ValueError, match="storage.format"):
+        config.load_config(str(p))
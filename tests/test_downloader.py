@@ -4,6 +4,7 @@ from unittest.mock import MagicMock, call
 import requests
 import responses
 from src import downloader
+from src.models import AdvancedMatchRule, ArticleStub, CacheConfig, CrawlerConfig
 
 # Respostas de exemplo com JSON embutido em tags script (correspondendo ao comportamento real do site)
 HTML_LIST_PAGE_JSON = """
@@ -25,6 +26,13 @@ HTML_LIST_PAGE_JSON = """
 </html>
 """
 
+@pytest.fixture(autouse=True)
+def fresh_session():
+    """Sessão nova (sem aquecimento) e orçamento folgado para cada teste."""
+    downloader.configure(CrawlerConfig(requests_per_second=100, max_requests_per_second=100, burst=10, warmup=False))
+    yield
+    downloader.close()
+
 @pytest.fixture
 def mocked_responses():
     with responses.RequestsMock() as rsps:
@@ -109,3 +117,234 @@ def test_fetch_content_404_logic(mocked_responses):
     
     with pytest.raises(requests.exceptions.HTTPError):
         downloader.fetch_content(url)
+
+def test_fetch_content_reuses_session(mocked_responses):
+    """Testa que downloads consecutivos usam a mesma sessão com compressão negociada."""
+    url = "https://www.in.gov.br/web/dou/-/artigo"
+    mocked_responses.add(responses.GET, url, body="a", status=200)
+    mocked_responses.add(responses.GET, url, body="b", status=200)
+
+    assert downloader.fetch_content(url) == "a"
+    session = downloader.get_session()
+    assert downloader.fetch_content(url) == "b"
+    assert downloader.get_session() is session
+
+    sent = mocked_responses.calls[0].request.headers
+    assert "gzip" in sent["Accept-Encoding"]
+    assert sent["User-Agent"] == downloader.HEADERS["User-Agent"]
+
+def test_session_warmup_sets_cookies(mocked_responses):
+    """Testa o aquecimento da sessão (cookie handshake) apenas no primeiro uso."""
+    downloader.configure(CrawlerConfig(requests_per_second=100, max_requests_per_second=100, burst=10, warmup=True))
+    url = "https://www.in.gov.br/web/dou/-/artigo"
+    mocked_responses.add(
+        responses.GET, downloader.URL_LEITURA, status=200, headers={"Set-Cookie": "JSESSIONID=abc; Path=/"}
+    )
+    mocked_responses.add(responses.GET, url, body="ok", status=200)
+    mocked_responses.add(responses.GET, url, body="ok", status=200)
+
+    downloader.fetch_content(url)
+    downloader.fetch_content(url)
+
+    assert [c.request.url for c in mocked_responses.calls].count(downloader.URL_LEITURA) == 1
+    assert "JSESSIONID=abc" in mocked_responses.calls[1].request.headers["Cookie"]
+
+def test_fetch_content_honours_retry_after(mocked_responses):
+    """Testa que 429 com Retry-After reduz a taxa e é tentado novamente após a pausa."""
+    url = "https://www.in.gov.br/web/dou/-/lento"
+    mocked_responses.add(responses.GET, url, status=429, headers={"Retry-After": "0"})
+    mocked_responses.add(responses.GET, url, body="ok", status=200)
+
+    before = downloader.rate_state()["rate"]
+    assert downloader.fetch_content(url) == "ok"
+
+    state = downloader.rate_state()
+    assert state["throttled"] == 1
+    assert state["successes"] == 1
+    assert state["rate"] < before
+
+def test_long_retry_after_is_not_retried_inline(mocked_responses):
+    """Testa que uma pausa Retry-After longa interrompe as tentativas imediatas."""
+    url = "https://www.in.gov.br/web/dou/-/bloqueado"
+    mocked_responses.add(responses.GET, url, status=429, headers={"Retry-After": "3600"})
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        downloader.fetch_content(url)
+    assert len(mocked_responses.calls) == 1
+    assert downloader.rate_state()["paused_for"] > 3000
+
+def test_fetch_content_serves_cached_article(mocked_responses, tmp_path):
+    """Testa que um artigo já baixado é servido do cache sem nova requisição."""
+    downloader.configure(
+        CrawlerConfig(requests_per_second=100, max_requests_per_second=100, warmup=False),
+        CacheConfig(directory=str(tmp_path)),
+    )
+    url = "https://www.in.gov.br/web/dou/-/portaria-em-cache"
+    html = '<html><body><div class="texto-dou">original</div></body></html>'
+    mocked_responses.add(responses.GET, url, body=html, status=200)
+
+    assert downloader.fetch_content(url) == html
+    assert downloader.fetch_content(url) == html
+    assert len(mocked_responses.calls) == 1
+
+def test_article_without_body_not_cached(mocked_responses, tmp_path):
+    """Testa que uma página 200 sem o corpo do ato (ex.: manutenção) não fica no cache para sempre."""
+    downloader.configure(
+        CrawlerConfig(requests_per_second=100, max_requests_per_second=100, warmup=False),
+        CacheConfig(directory=str(tmp_path)),
+    )
+    url = "https://www.in.gov.br/web/dou/-/portaria-em-manutencao"
+    maintenance = "<html><body><h1>Sistema em manutenção</h1></body></html>"
+    html = '<html><body><div class="texto-dou">Força Nacional</div></body></html>'
+    mocked_responses.add(responses.GET, url, body=maintenance, status=200)
+    mocked_responses.add(responses.GET, url, body=maintenance, status=200)
+    mocked_responses.add(responses.GET, url, body=html, status=200)
+
+    # Leitura de uma vez: quem analisa a página retira a entrada (uma só análise por página)
+    assert downloader.fetch_content(url) == maintenance
+    downloader.discard_cached(url)
+    # Em fluxo: a entrada nem chega a ser confirmada
+    assert downloader.fetch_document(url).metadata["extraction"] == "page"
+    assert downloader.fetch_document(url).text == "Força Nacional"
+    assert downloader.fetch_content(url) == html  # Agora sim, servido do cache
+    assert len(mocked_responses.calls) == 3
+
+def test_fetch_content_revalidates_stale_listing(mocked_responses, tmp_path):
+    """Testa a revalidação condicional (ETag -> 304) de uma listagem expirada."""
+    downloader.configure(
+        CrawlerConfig(requests_per_second=100, max_requests_per_second=100, warmup=False),
+        CacheConfig(directory=str(tmp_path), listing_ttl_seconds=0),
+    )
+    url = downloader.get_section_url("dou1", datetime.date(2026, 2, 10))
+    mocked_responses.add(responses.GET, url, body="<html>lista</html>", status=200, headers={"ETag": '"v1"'})
+    mocked_responses.add(responses.GET, url, status=304)
+
+    assert downloader.fetch_content(url) == "<html>lista</html>"
+    assert downloader.fetch_content(url) == "<html>lista</html>"
+    assert mocked_responses.calls[1].request.headers["If-None-Match"] == '"v1"'
+
+def test_fetch_document_streams_into_parser_and_cache(mocked_responses, tmp_path):
+    """Testa o download em fluxo: documento analisado durante a leitura e corpo gravado no cache."""
+    downloader.configure(
+        CrawlerConfig(requests_per_second=100, max_requests_per_second=100, warmup=False),
+        CacheConfig(directory=str(tmp_path)),
+    )
+    url = "https://www.in.gov.br/web/dou/-/portaria-em-fluxo"
+    html = '<html><head><title>Ato</title></head><body><nav>Menu</nav><div class="texto-dou">Força Nacional</div></body></html>'
+    mocked_responses.add(
+        responses.GET, url, body=html.encode("utf-8"), status=200, content_type="text/html"
+    )
+
+    doc = downloader.fetch_document(url)
+    assert (doc.url, doc.title, doc.text) == (url, "Ato", "Força Nacional")
+
+    # Segunda chamada: servida do cache, com o mesmo resultado
+    assert downloader.fetch_document(url).text == "Força Nacional"
+    assert downloader.fetch_content(url) == html
+    assert len(mocked_responses.calls) == 1
+
+def test_fetch_article_document_single_attempt(mocked_responses):
+    """Testa que a versão de artigos não repete a tentativa em erro do servidor."""
+    url = "https://www.in.gov.br/web/dou/-/portaria-indisponivel"
+    mocked_responses.add(responses.GET, url, status=503)
+
+    with pytest.raises(requests.HTTPError):
+        downloader.fetch_article_document(url)
+    assert len(mocked_responses.calls) == 1
+
+HTML_LIST_PAGE_FULL = """
+<html><head>
+<script id="params" type="application/json">
+{"jsonArray": [
+  {"pubName": "DO1", "urlTitle": "portaria-mjsp-n-1.154-de-24-de-fevereiro-de-2026-688964488",
+   "title": "PORTARIA MJSP Nº 1.154, DE 24 DE FEVEREIRO DE 2026", "artType": "Portaria",
+   "hierarchyStr": "Ministério da Justiça e Segurança Pública/Gabinete do Ministro",
+   "pubDate": "26/02/2026", "editionNumber": "38", "numberPage": "45", "content": "Autoriza o emprego..."},
+  {"pubName": "DO1", "urlTitle": "aviso-de-licitacao-123", "title": "AVISO DE LICITAÇÃO Nº 12/2026", "artType": "Aviso"}
+]}
+</script></head><body></body></html>
+"""
+
+def test_parse_listing_builds_typed_stubs():
+    """Testa a conversão do JSON embutido em stubs com metadados reais."""
+    stubs = downloader.parse_listing(HTML_LIST_PAGE_FULL)
+
+    assert len(stubs) == 2
+    first = stubs[0]
+    assert first.url == "https://www.in.gov.br/web/dou/-/portaria-mjsp-n-1.154-de-24-de-fevereiro-de-2026-688964488"
+    assert first.title == "PORTARIA MJSP Nº 1.154, DE 24 DE FEVEREIRO DE 2026"
+    assert first.art_type == "Portaria"
+    assert first.issuing_body.startswith("Ministério da Justiça")
+    assert first.pub_date == "26/02/2026"
+    assert first.edition == "38"
+    assert first.page == "45"
+
+def test_parse_listing_regex_fallback():
+    """Testa o fallback por Regex quando o JSON não é válido."""
+    html = '<script id="params">{"jsonArray": [{"urlTitle": "portaria-x-1", broken</script>'
+    stubs = downloader.parse_listing(html)
+    assert [s.url_title for s in stubs] == ["portaria-x-1"]
+    assert stubs[0].title == "portaria x 1"
+
+def test_apply_url_filtering_uses_real_titles():
+    """Testa que a filtragem usa o título normalizado (sem acentos) dos stubs."""
+    stubs = downloader.parse_listing(HTML_LIST_PAGE_FULL)
+    rule = AdvancedMatchRule(name="Licitações", title_terms=["Aviso de Licitação"], body_terms=["obra"])
+
+    kept = downloader.apply_url_filtering(stubs, [rule])
+    assert [s.url_title for s in kept] == ["aviso-de-licitacao-123"]
+
+    # URLs simples continuam sendo filtradas pelo slug, agora também sem acentos
+    kept_urls = downloader.apply_url_filtering([s.url for s in stubs], [rule])
+    assert kept_urls == ["https://www.in.gov.br/web/dou/-/aviso-de-licitacao-123"]
+
+def test_partition_by_rules_per_url():
+    """Testa a partição por regra: só URLs com regra candidata entram, cada uma com as suas regras."""
+    from src import rule_plan
+
+    plan = rule_plan.compile_section("dou3", [], [
+        AdvancedMatchRule(name="Licitações", title_terms=["Aviso de Licitação"], body_terms=["obra"]),
+        AdvancedMatchRule(name="Extratos", title_terms=["extrato"], body_terms=["contrato"]),
+    ])
+    stubs = downloader.parse_listing(HTML_LIST_PAGE_FULL)
+
+    candidates = downloader.partition_by_rules(stubs, plan)
+    assert {url: [rule.name for rule in rules] for url, rules in candidates.items()} == {
+        "https://www.in.gov.br/web/dou/-/aviso-de-licitacao-123": ["Licitações"],
+    }
+    # URLs simples: o slug da URL é usado no lugar do título
+    assert list(downloader.partition_by_rules([s.url for s in stubs], plan)) == list(candidates)
+
+def test_rate_ceiling_defaults_near_base_rate():
+    """Testa que o teto padrão do controle adaptativo fica perto da taxa base, e que uma taxa base maior não é cortada pelo teto."""
+    downloader.configure(CrawlerConfig(warmup=False))
+    state = downloader.rate_state()
+    assert state["rate"] == CrawlerConfig.requests_per_second
+    assert state["max_rate"] <= 2 * CrawlerConfig.requests_per_second
+
+    downloader.configure(CrawlerConfig(requests_per_second=0.5, warmup=False))
+    assert downloader.rate_state()["rate"] == 0.5
+
+def test_configure_is_idempotent_per_process():
+    """Testa que reconfigurar com a mesma configuração mantém sessão e controle de taxa (execuções simultâneas do painel)."""
+    crawler = CrawlerConfig(requests_per_second=100, max_requests_per_second=100, burst=10, warmup=False)
+    session = downloader.get_session()
+    controller = downloader._controller
+
+    downloader.configure(crawler)
+    assert downloader.get_session() is session
+    assert downloader._controller is controller
+
+    downloader.configure(CrawlerConfig(requests_per_second=50, max_requests_per_second=100, warmup=False))
+    assert downloader._controller is not controller
+
+def test_session_warmup_goes_through_rate_limiter(mocked_responses, monkeypatch):
+    """Testa que a requisição de aquecimento também consome o orçamento global."""
+    downloader.configure(CrawlerConfig(requests_per_second=100, max_requests_per_second=100, burst=10, warmup=True))
+    acquired = []
+    monkeypatch.setattr(downloader._rate_limiter, "acquire", lambda: acquired.append(1) or 0.0)
+    mocked_responses.add(responses.GET, downloader.URL_LEITURA, status=200)
+
+    downloader.get_session()
+
+    assert acquired == [1]
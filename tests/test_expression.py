@@ -0,0 +1,57 @@
+import pytest
+
+from src.expression import And, ExpressionError, Near, Not, Or, Term, evaluate, parse_expression, terms, word_locator
+
+def test_parse_operators_phrases_and_precedence():
+    """Testa frases (aspas ou palavras soltas), 'a NOT b' como AND NOT e a precedência de OR."""
+    node = parse_expression('nomeação AND força nacional NOT exoneração OR "Cessão"')
+
+    assert node == Or((
+        And((
+            Term("nomeação", "nomeacao"),
+            Term("força nacional", "forca nacional"),
+            Not(Term("exoneração", "exoneracao")),
+        )),
+        Term("Cessão", "cessao"),
+    ))
+    assert parse_expression("cessão NEAR/20 servidor") == Near(Term("cessão", "cessao"), Term("servidor", "servidor"), 20)
+
+@pytest.mark.parametrize("source", ["", "a OR", "(a AND b", '"sem fim', "NOT a", "a NEAR/2 (b OR c)", "a ) b"])
+def test_parse_errors(source):
+    with pytest.raises(ExpressionError):
+        parse_expression(source)
+
+def test_evaluate_returns_supporting_hits():
+    """Testa a avaliação sobre listas de posições: falsa -> None; verdadeira -> ocorrências que a sustentam."""
+    node = parse_expression("nomeacao AND (forca OR policia) NOT exoneracao")
+    hits = {"nomeacao": [0], "forca": [10, 40]}
+    assert [(term.normalized, start) for term, start in evaluate(node, hits)] == [
+        ("nomeacao", 0), ("forca", 10), ("forca", 40),
+    ]
+    assert evaluate(node, {**hits, "exoneracao": [60]}) is None
+    assert evaluate(node, {"forca": [10]}) is None
+
+def test_evaluate_near_counts_words_in_any_order():
+    """Testa NEAR/n em palavras, nos dois sentidos, considerando termos de várias palavras."""
+    text = "a cessao do servidor publico e outro servidor muito depois da cessao"
+    word_at = word_locator(text)
+    hits = {"cessao": [2, text.rindex("cessao")], "servidor publico": [12]}
+
+    near = parse_expression("cessao NEAR/2 servidor publico")
+    assert [(t.normalized, s) for t, s in evaluate(near, hits, word_at)] == [("cessao", 2), ("servidor publico", 12)]
+    assert evaluate(parse_expression("cessao NEAR/1 servidor publico"), hits, word_at) is None
+    # "publico" (palavra 4) está a 7 palavras da segunda "cessao", mas a 2 da primeira
+    reverse = parse_expression("servidor publico NEAR/2 cessao")
+    assert len(evaluate(reverse, hits, word_at)) == 2
+
+def test_fuzzy_terms_in_expression():
+    """Testa o sufixo ~k em palavras soltas e frases; a avaliação usa a chave do termo aproximado."""
+    node = parse_expression('"força nacional"~1 AND nomeação~1 NOT exoneração')
+    fuzzy, nomeacao = terms(node)[:2]
+    assert (fuzzy.normalized, fuzzy.max_edits, fuzzy.key) == ("forca nacional", 1, "forca nacional~1")
+    assert (nomeacao.text, nomeacao.max_edits) == ("nomeação", 1)
+
+    assert evaluate(node, {"forca nacional": [0], "nomeacao~1": [20]}) is None
+    assert evaluate(node, {"forca nacional~1": [0], "nomeacao~1": [20]}) is not None
+    with pytest.raises(ExpressionError, match="curto demais"):
+        parse_expression("abc~2 AND nomeação")
@@ -0,0 +1,129 @@
+import threading
+import time
+from src import fetcher
+
+def test_fetch_many_returns_all_results():
+    """Testa que todas as URLs são buscadas e os erros são devolvidos sem interromper o lote."""
+    def fake_fetch(url):
+        if url.endswith("bad"):
+            raise RuntimeError("boom")
+        return f"<html>{url}</html>"
+
+    urls = ["https://a/1", "https://a/2", "https://a/bad"]
+    results = {r.url: r for r in fetcher.fetch_many(urls, fake_fetch, max_workers=3)}
+
+    assert set(results) == set(urls)
+    assert results["https://a/1"].content == "<html>https://a/1</html>"
+    assert results["https://a/1"].ok
+    assert not results["https://a/bad"].ok
+    assert isinstance(results["https://a/bad"].error, RuntimeError)
+
+def test_fetch_many_respects_per_host_concurrency():
+    """Testa que o limite por host é respeitado mesmo com mais workers disponíveis."""
+    lock = threading.Lock()
+    active = {"now": 0, "peak": 0}
+
+    def slow_fetch(url):
+        with lock:
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+        time.sleep(0.02)
+        with lock:
+            active["now"] -= 1
+        return "ok"
+
+    urls = [f"https://www.in.gov.br/web/dou/-/artigo-{i}" for i in range(10)]
+    results = list(fetcher.fetch_many(urls, slow_fetch, max_workers=8, per_host_concurrency=2))
+
+    assert len(results) == 10
+    assert active["peak"] <= 2
+
+def test_fetch_many_empty():
+    assert list(fetcher.fetch_many([], lambda u: "x")) == []
+
+def test_circuit_breaker_opens_and_probes():
+    """Testa a abertura após falhas seguidas, a sonda única no estado meio-aberto e o fechamento."""
+    now = [0.0]
+    breaker = fetcher.CircuitBreaker(failure_threshold=2, reset_seconds=10, clock=lambda: now[0])
+    url = "https://www.in.gov.br/web/dou/-/a"
+
+    breaker.record_failure(url)
+    assert breaker.allow(url)
+    breaker.record_failure(url)
+    assert breaker.state(url) == fetcher.CircuitBreaker.OPEN
+    assert not breaker.allow(url)
+    assert breaker.allow("https://outro.host/x")  # circuito é por host
+    assert breaker.retry_in(url) == 10
+
+    now[0] = 10.0
+    assert breaker.allow(url)      # sonda
+    assert not breaker.allow(url)  # só uma sonda por vez
+    breaker.record_failure(url)    # sonda falhou: reabre
+    assert not breaker.allow(url)
+
+    now[0] = 20.0
+    assert breaker.allow(url)
+    breaker.record_success(url)
+    assert breaker.state(url) == fetcher.CircuitBreaker.CLOSED
+    assert breaker.allow(url)
+
+def test_circuit_breaker_ignores_non_host_errors():
+    """Testa que erros filtrados por trips_on (ex.: 404) não abrem o circuito."""
+    breaker = fetcher.CircuitBreaker(failure_threshold=1, trips_on=lambda e: not isinstance(e, KeyError))
+    breaker.record_failure("https://a/1", KeyError("404"))
+    assert breaker.allow("https://a/1")
+    breaker.record_failure("https://a/1", RuntimeError("503"))
+    assert not breaker.allow("https://a/1")
+
+def test_fetch_many_fails_fast_when_circuit_open():
+    """Testa que, com o circuito aberto, as URLs restantes falham sem chamar fetch_fn."""
+    calls = []
+
+    def failing_fetch(url):
+        calls.append(url)
+        raise RuntimeError("503")
+
+    breaker = fetcher.CircuitBreaker(failure_threshold=2, reset_seconds=60)
+    urls = [f"https://www.in.gov.br/web/dou/-/artigo-{i}" for i in range(6)]
+    results = list(fetcher.fetch_many(urls, failing_fetch, max_workers=1, breaker=breaker))
+
+    assert len(calls) == 2
+    assert sum(isinstance(r.error, fetcher.CircuitOpenError) for r in results) == 4
+
+def _open_circuit(now):
+    breaker = fetcher.CircuitBreaker(failure_threshold=1, reset_seconds=10, clock=lambda: now[0])
+    breaker.record_failure("https://www.in.gov.br/x")
+    now[0] += 11  # Janela de sonda
+    return breaker
+
+def test_fetch_many_waits_for_half_open_probe():
+    """Testa que, no meio-aberto, as demais URLs esperam a sonda e seguem quando o circuito fecha."""
+    now = [0.0]
+    breaker = _open_circuit(now)
+
+    def slow_fetch(url):
+        time.sleep(0.01)
+        return "ok"
+
+    urls = [f"https://www.in.gov.br/web/dou/-/artigo-{i}" for i in range(20)]
+    results = list(fetcher.fetch_many(urls, slow_fetch, max_workers=8, breaker=breaker))
+
+    assert sum(r.ok for r in results) == 20
+    assert breaker.state(urls[0]) == fetcher.CircuitBreaker.CLOSED
+
+def test_fetch_many_rejects_waiters_when_probe_fails():
+    """Testa que, se a sonda falha, quem esperava por ela é recusado sem ir à rede."""
+    now = [0.0]
+    breaker = _open_circuit(now)
+    calls = []
+
+    def failing_fetch(url):
+        calls.append(url)
+        time.sleep(0.01)
+        raise RuntimeError("503")
+
+    urls = [f"https://www.in.gov.br/web/dou/-/artigo-{i}" for i in range(10)]
+    results = list(fetcher.fetch_many(urls, failing_fetch, max_workers=4, breaker=breaker))
+
+    assert len(calls) == 1
+    assert sum(isinstance(r.error, fetcher.CircuitOpenError) for r in results) == 9
@@ -0,0 +1,91 @@
+import random
+
+import pytest
+
+from src.fuzzy import FuzzyPattern, FuzzyTerms, check_edits, parse_term, term_key
+
+def _distance(a, b):
+    """Distância de edição (Levenshtein) por programação dinâmica direta."""
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+def test_parse_term_suffix():
+    assert parse_term("força nacional~1") == ("força nacional", 1)
+    assert parse_term("força nacional ~2 ") == ("força nacional", 2)
+    assert parse_term("força nacional") == ("força nacional", 0)
+    assert term_key("forca nacional", 1) == "forca nacional~1"
+    assert term_key("forca nacional", 0) == "forca nacional"
+
+def test_short_terms_rejected():
+    """Termos com até 2k caracteres corresponderiam a quase qualquer trecho."""
+    check_edits("licitacao", 2)
+    with pytest.raises(ValueError):
+        check_edits("ab", 1)
+    with pytest.raises(ValueError):
+        FuzzyPattern("abcd", 2)
+
+def test_typos_and_split_words():
+    """Testa troca de letra, palavra partida e palavras coladas contra o termo exato."""
+    text = "emprego da forca nacionai de seguranca; forca nacio nal; forca nacional; forcanacional"
+    hits = FuzzyPattern("forca nacional", 1).search(text)
+
+    found = [(text[hit.start:hit.end], hit.distance) for hit in hits]
+    assert found == [
+        ("forca nacionai", 1),
+        ("forca nacio nal", 1),
+        ("forca nacional", 0),
+        ("forcanacional", 1),
+    ]
+
+def test_random_hits_match_edit_distance():
+    """Cada ocorrência devolvida tem a distância informada, sem sobreposição; só há ocorrências se alguma existir."""
+    rng = random.Random(0)
+    for _ in range(150):
+        pattern = "".join(rng.choice("abc") for _ in range(rng.randint(5, 8)))
+        text = "".join(rng.choice("abcd ") for _ in range(rng.randrange(40)))
+        k = rng.randint(1, 2)
+        hits = FuzzyPattern(pattern, k).search(text)
+
+        for hit in hits:
+            assert _distance(pattern, text[hit.start:hit.end]) == hit.distance <= k
+        for a, b in zip(hits, hits[1:]):
+            assert a.end <= b.start
+        exists = any(
+            _distance(pattern, text[start:end]) <= k
+            for end in range(len(text) + 1)
+            for start in range(max(0, end - len(pattern) - k), end + 1)
+        )
+        assert bool(hits) == exists
+
+def test_touching_occurrences_kept():
+    """Ocorrências encostadas (fins consecutivos dentro do limite) não se fundem numa só."""
+    text = "  babcabbbb aabc"
+    hits = FuzzyPattern("aba", 1).search(text)
+    assert [(hit.start, hit.end, hit.distance) for hit in hits] == [(1, 4, 1), (6, 8, 1), (13, 16, 1)]
+
+def test_random_occurrences_never_dropped():
+    """Força bruta: toda ocorrência com até k edições sobrepõe alguma das devolvidas."""
+    rng = random.Random(1)
+    for _ in range(400):
+        pattern = "".join(rng.choice("ab") for _ in range(rng.randint(3, 7)))
+        k = rng.randint(1, (len(pattern) - 1) // 2)
+        text = "".join(rng.choice("abc ") for _ in range(rng.randrange(30)))
+        hits = FuzzyPattern(pattern, k).search(text)
+
+        for a, b in zip(hits, hits[1:]):
+            assert a.end <= b.start
+        for start in range(len(text)):
+            for end in range(start + 1, min(len(text), start + len(pattern) + k) + 1):
+                if _distance(pattern, text[start:end]) <= k:
+                    assert any(hit.start < end and start < hit.end for hit in hits), (pattern, k, text, start, end)
+
+def test_fuzzy_terms_keys():
+    terms = FuzzyTerms([("forca nacional", 1), ("forca nacional", 1), ("nomeacao", 0)])
+    assert len(terms) == 1  # duplicado e termo exato descartados
+    assert list(terms.search("a forca nacionai")) == ["forca nacional~1"]
+    assert terms.search("") == {}
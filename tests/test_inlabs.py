@@ -0,0 +1,95 @@
+import io
+import zipfile
+import pytest
+import responses
+from src import downloader, inlabs
+from src.models import AdvancedMatchRule, Config, LoggingConfig, ScheduleConfig, StorageConfig
+
+ARTICLE_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<xml>
+  <article id="{id}" name="Portaria {id}" pubName="{pub}" artType="Portaria" pubDate="26/02/2026"
+           artCategory="Ministério da Justiça e Segurança Pública/Gabinete do Ministro"
+           pdfPage="https://pesquisa.in.gov.br/imprensa/jsp/visualiza/index.jsp?data=26/02/2026&amp;pagina={id}"
+           editionNumber="38">
+    <body>
+      <Identifica><![CDATA[PORTARIA MJSP Nº {id}, DE 24 DE FEVEREIRO DE 2026]]></Identifica>
+      <Ementa />
+      <Texto><![CDATA[<p class="identifica">PORTARIA MJSP Nº {id}</p><p>{body}</p><p class="assina">FULANO</p>]]></Texto>
+    </body>
+  </article>
+</xml>
+"""
+
+def build_archive(articles):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+        for i, (pub, body) in enumerate(articles):
+            zf.writestr(f"{i}.xml", ARTICLE_XML.format(id=1000 + i, pub=pub, body=body))
+        zf.writestr("imagem.jpg", b"\xff\xd8")
+        zf.writestr("quebrado.xml", "<xml><article>")
+    buffer.seek(0)
+    return buffer
+
+def make_config(tmp_path, rules):
+    return Config(
+        schedule=ScheduleConfig(time="00:00"),
+        keywords=[],
+        storage=StorageConfig(output_dir=str(tmp_path / "data")),
+        logging=LoggingConfig(),
+        rules=rules,
+    )
+
+def test_iter_archive_documents_maps_fields():
+    """Testa o mapeamento de cada ato XML para título/texto/url/seção."""
+    archive = build_archive([("DO1", "Autoriza o emprego da Força Nacional."), ("DO2E", "Nomeia servidor.")])
+    docs = list(inlabs.iter_archive_documents(archive))
+
+    assert len(docs) == 2  # imagem e XML quebrado são ignorados
+    first = docs[0]
+    assert first.title == "PORTARIA MJSP Nº 1000, DE 24 DE FEVEREIRO DE 2026"
+    assert "Autoriza o emprego da Força Nacional." in first.text
+    assert "<p" not in first.text
+    assert first.section == "dou1"
+    assert first.date == "2026-02-26"
+    assert first.url.startswith("https://pesquisa.in.gov.br/")
+    assert first.metadata["art_type"] == "Portaria"
+    assert docs[1].section == "dou2e"
+
+def test_ingest_archive_matches_and_stores(tmp_path):
+    """Testa que a ingestão aplica as regras por seção e grava as correspondências."""
+    rule = AdvancedMatchRule(
+        name="Força Nacional", title_terms=["PORTARIA MJSP"], body_terms=["força nacional"], sections=["dou1"]
+    )
+    archive_path = tmp_path / "edicao.zip"
+    archive_path.write_bytes(
+        build_archive([("DO1", "Autoriza o emprego da Força Nacional."), ("DO2", "Força Nacional na seção 2.")]).read()
+    )
+
+    matches = inlabs.ingest_archive(str(archive_path), make_config(tmp_path, [rule]))
+
+    assert len(matches) == 1
+    assert matches[0].section == "dou1"
+    assert matches[0].date == "2026-02-26"
+    assert (tmp_path / "data" / "for-a-nacional.jsonl").exists()
+
+def test_ingest_archive_from_url_cleans_up_and_uses_budget(tmp_path, monkeypatch):
+    """Testa que o zip baixado passa pelo orçamento de requisições e não fica no disco."""
+    rule = AdvancedMatchRule(name="Força Nacional", body_terms=["força nacional"], sections=["dou1"])
+    temp_root = tmp_path / "tmp"
+    temp_root.mkdir()
+    monkeypatch.setattr(inlabs.tempfile, "tempdir", str(temp_root))
+    budget_calls = []
+    monkeypatch.setattr(downloader, "wait_for_budget", lambda: budget_calls.append(1) or 0.0)
+
+    url = "https://inlabs.in.gov.br/index.php?p=2026-02-26&dl=2026-02-26-DO1.zip"
+    with responses.RequestsMock() as mocked:
+        mocked.add(responses.GET, url, body=build_archive([("DO1", "Força Nacional.")]).read(), status=200)
+        matches = inlabs.ingest_archive(url, make_config(tmp_path, [rule]), save_results=False)
+
+    assert len(matches) == 1
+    assert budget_calls == [1]
+    assert list(temp_root.iterdir()) == []
+
+@pytest.mark.parametrize("pub,expected", [("DO1", "dou1"), ("DO3", "dou3"), ("do1e", "dou1e")])
+def test_section_from_pub_name(pub, expected):
+    assert inlabs.section_from_pub_name(pub) == expected
@@ -0,0 +1,105 @@
+import datetime
+from src.journal import CrawlJournal, DeferredQueue
+
+DATE = datetime.date(2026, 2, 10)
+
+def test_journal_tracks_url_states(tmp_path):
+    """Testa o registro de descoberta, estados e conclusão, e a releitura do log."""
+    j = CrawlJournal.for_date(str(tmp_path), DATE)
+    j.record_discovered("dou1", ["u1", "u2", "u3"])
+    j.mark("u1", "fetched")
+    j.mark("u1", "stored")
+    j.mark("u2", "parsed")
+    j.close()
+
+    reopened = CrawlJournal.for_date(str(tmp_path), DATE)
+    assert reopened.discovered("dou1") == ["u1", "u2", "u3"]
+    assert reopened.state("u1") == "stored"
+    assert reopened.state("u2") == "parsed"
+    assert reopened.pending("dou1") == ["u2", "u3"]
+    assert reopened.discovered("dou2") is None
+    assert not reopened.section_done("dou1")
+
+    reopened.mark_section_done("dou1")
+    reopened.mark_complete()
+    reopened.close()
+
+    final = CrawlJournal.for_date(str(tmp_path), DATE)
+    assert final.section_done("dou1")
+    assert final.is_complete()
+    final.close()
+
+def test_journal_survives_truncated_tail(tmp_path):
+    """Testa que uma linha parcial (processo morto durante a escrita) é descartada."""
+    j = CrawlJournal.for_date(str(tmp_path), DATE)
+    j.record_discovered("dou1", ["u1"])
+    j.mark("u1", "stored")
+    j.close()
+
+    path = tmp_path / f"{DATE.isoformat()}.jsonl"
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"event": "url", "url": "u1", "sta')
+
+    reopened = CrawlJournal.for_date(str(tmp_path), DATE)
+    assert reopened.state("u1") == "stored"
+    reopened.mark_section_done("dou1")
+    reopened.close()
+
+    # O log continua válido após a nova escrita
+    assert CrawlJournal.for_date(str(tmp_path), DATE).section_done("dou1")
+
+def test_journal_reset_starts_fresh(tmp_path):
+    j = CrawlJournal.for_date(str(tmp_path), DATE)
+    j.record_discovered("dou1", ["u1"])
+    j.close()
+
+    fresh = CrawlJournal.for_date(str(tmp_path), DATE, reset=True)
+    assert fresh.discovered("dou1") is None
+    fresh.close()
+
+def test_journal_states_never_regress(tmp_path):
+    j = CrawlJournal.for_date(str(tmp_path), DATE)
+    j.record_discovered("dou1", ["u1"])
+    j.mark("u1", "stored")
+    j.mark("u1", "fetched")
+    assert j.state("u1") == "stored"
+    j.close()
+
+def test_deferred_queue_persists_and_abandons(tmp_path):
+    """Testa a fila de adiados: persistência entre execuções, circuito aberto sem custo e abandono."""
+    queue = DeferredQueue.in_directory(str(tmp_path), max_attempts=2)
+    assert queue.add("http://a", "dou1", datetime.date(2026, 2, 10), error="503")
+    assert queue.add("http://b", "dou2", "2026-02-10", error="circuito aberto", attempted=False)
+    queue.save()
+
+    reloaded = DeferredQueue.in_directory(str(tmp_path), max_attempts=2)
+    assert {item.url: item.attempts for item in reloaded.items()} == {"http://a": 1, "http://b": 0}
+    assert reloaded.items()[0].date == "2026-02-10"
+
+    assert not reloaded.add("http://a", "dou1", "2026-02-10", error="503")  # segunda tentativa: abandonado
+    reloaded.mark_recovered("http://b")
+    assert len(reloaded) == 0
+    assert reloaded.stats["abandoned"] == 1
+    assert reloaded.stats["recovered"] == 1
+
+def test_abandoned_url_is_terminal(tmp_path):
+    """Testa que um artigo abandonado sai das pendências e não volta a ser buscado ao retomar."""
+    j = CrawlJournal.for_date(str(tmp_path), DATE)
+    j.record_discovered("dou1", ["u1", "u2"])
+    j.mark("u1", "abandoned")
+    j.mark("u1", "fetched")
+    assert j.state("u1") == "abandoned"
+    assert j.pending("dou1") == ["u2"]
+    j.close()
+
+    reloaded = CrawlJournal.for_date(str(tmp_path), DATE)
+    assert reloaded.state("u1") == "abandoned"
+    reloaded.close()
+
+def test_deferred_queue_abandon_removes_item(tmp_path):
+    queue = DeferredQueue.in_directory(str(tmp_path))
+    queue.add("http://a", "dou1", DATE, error="503")
+    queue.abandon("http://a", error="404")
+    queue.abandon("http://b", error="404")  # Nunca adiado: só conta
+    assert len(queue) == 0
+    assert queue.stats["abandoned"] == 2
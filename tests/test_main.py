@@ -1,10 +1,12 @@
 import pytest
 from unittest.mock import MagicMock, patch
-from src import main
+import requests
+from src import downloader, journal, main, storage
+from src.models import Config, LoggingConfig, ScheduleConfig, AdvancedMatchRule, ArticleDocument, ArticleStub, CrawlerConfig, MatchEntry, ParserConfig, StorageConfig
 import datetime
 
 @pytest.fixture
-def mock_dependencies():
+def mock_dependencies(tmp_path):
     with patch("src.main.config.load_config") as mock_conf, \
          patch("src.main.downloader") as mock_dl, \
          patch("src.main.parser") as mock_parser, \
@@ -15,31 +17,38 @@ def mock_dependencies():
         mock_config_obj = MagicMock()
         mock_config_obj.keywords = ["test"]
         mock_config_obj.sections = ["dou1"]
+        mock_config_obj.crawler = CrawlerConfig()
+        mock_config_obj.parser = ParserConfig()
+        mock_config_obj.storage = StorageConfig(output_dir=str(tmp_path / "data"), journal_dir=str(tmp_path / "journal"))
         mock_conf.return_value = mock_config_obj
+        # Gravação real (no tmp_path): o diário só marca "stored" quando o writer descarrega
+        mock_storage.open_writer = storage.open_writer
+        mock_dl.is_permanent_error = downloader.is_permanent_error
         
         yield mock_conf, mock_dl, mock_parser, mock_matcher, mock_storage
 
-def test_job_process_dou_flow(mock_dependencies):
+def test_job_process_dou_flow(mock_dependencies, tmp_path):
     mock_conf, mock_dl, mock_parser, mock_matcher, mock_storage = mock_dependencies
     
     # Setup mocks
-    mock_dl.fetch_article_urls.return_value = ["http://fake.url"]
-    mock_dl.fetch_content.return_value = "<html>Title<p>test content</p></html>"
+    mock_dl.fetch_article_stubs.return_value = [ArticleStub(url="http://fake.url", url_title="fake-url")]
+    mock_dl.fetch_article.return_value = "<html>Title<p>test content</p></html>"
     
-    mock_parser.extract_text.return_value = "test content"
-    mock_parser.extract_title.return_value = "Title"
+    mock_parser.parse_article.return_value = ArticleDocument(title="Title", text="test content")
     
-    mock_matcher.find_matches.return_value = ["match"]
+    match = MatchEntry(keyword="test", context="...", date="d", section="dou1", url="http://fake.url", capture_timestamp="")
+    mock_matcher.match_article.return_value = [match]
     
     # Run
     main.job_process_dou()
     
     # Verify flow
-    mock_dl.fetch_article_urls.assert_called()
-    mock_dl.fetch_content.assert_called_with("http://fake.url")
-    mock_parser.extract_text.assert_called()
-    mock_matcher.find_matches.assert_called()
-    mock_storage.save_match.assert_called()
+    mock_dl.fetch_article_stubs.assert_called()
+    mock_dl.fetch_article.assert_called_with("http://fake.url")
+    mock_parser.parse_article.assert_called_once()
+    mock_matcher.match_article.assert_called()
+    saved = tmp_path / "data" / "test.jsonl"
+    assert saved.read_text(encoding="utf-8").count("\n") == 1
 
 def test_main_entry_setup():
     """Testa que main inicializa configuração e agendador."""
@@ -55,3 +64,220 @@ def test_main_entry_setup():
         mock_sched.create_scheduler.assert_called()
         mock_sched.schedule_daily_job.assert_called()
         mock_sched.start_scheduler.assert_called()
+
+def test_main_rejects_to_without_from(capsys):
+    """Testa que --to sem --from é recusado em vez de ignorado."""
+    with patch("sys.argv", ["main.py", "--to", "2026-02-10"]), \
+         patch("src.main.backfill.run_backfill") as mock_backfill, \
+         pytest.raises(SystemExit) as exc:
+        main.main()
+    assert exc.value.code == 2
+    assert "--from" in capsys.readouterr().err
+    mock_backfill.assert_not_called()
+
+def test_article_without_body_discarded_from_cache(mock_dependencies):
+    """Testa que um artigo cuja análise não encontra o corpo do ato é retirado do cache."""
+    mock_conf, mock_dl, mock_parser, mock_matcher, mock_storage = mock_dependencies
+    mock_parser.PAGE_STRATEGY = "page"
+    mock_dl.fetch_article_stubs.return_value = [
+        ArticleStub(url="http://a", url_title="a"), ArticleStub(url="http://b", url_title="b"),
+    ]
+    mock_dl.fetch_article.return_value = "<html></html>"
+    mock_parser.parse_article.side_effect = lambda html, url, selectors: ArticleDocument(
+        title="", text="", url=url, metadata={"extraction": "page" if url == "http://a" else "//article"}
+    )
+    mock_matcher.match_article.return_value = []
+
+    main.run_scraper(mock_conf.return_value, datetime.date(2026, 2, 10))
+
+    mock_dl.discard_cached.assert_called_once_with("http://a")
+
+def test_run_scraper_resume_skips_finished_urls(mock_dependencies, tmp_path):
+    """Testa que a retomada processa apenas URLs pendentes e pula edição concluída."""
+    mock_conf, mock_dl, mock_parser, mock_matcher, mock_storage = mock_dependencies
+    cfg = mock_conf.return_value
+    date = datetime.date(2026, 2, 10)
+
+    # Simula execução anterior interrompida: duas URLs descobertas, uma concluída
+    previous = journal.CrawlJournal.for_date(cfg.storage.journal_dir, date)
+    previous.record_discovered("dou1", ["http://a", "http://b"])
+    previous.mark("http://a", "stored")
+    previous.close()
+
+    mock_dl.fetch_article.return_value = "<html></html>"
+    mock_matcher.match_article.return_value = []
+
+    main.run_scraper(cfg, date, resume=True)
+
+    mock_dl.fetch_article_stubs.assert_not_called()
+    mock_dl.fetch_article.assert_called_once_with("http://b")
+
+    # Tudo concluído: nova retomada não faz nada
+    mock_dl.fetch_article.reset_mock()
+    assert main.run_scraper(cfg, date, resume=True) == []
+    mock_dl.fetch_article.assert_not_called()
+
+def test_title_only_rule_resolved_from_listing(tmp_path):
+    """Testa que regras só de título são avaliadas pelos stubs, sem baixar artigos."""
+    rule = AdvancedMatchRule(name="Licitações", title_terms=["aviso de licitação"], body_terms=[], sections=["dou3"])
+    cfg = Config(
+        schedule=ScheduleConfig(time="00:00"),
+        keywords=[],
+        storage=StorageConfig(output_dir=str(tmp_path / "data"), journal_dir=str(tmp_path / "journal")),
+        logging=LoggingConfig(),
+        rules=[rule],
+    )
+    stubs = [
+        ArticleStub(url="http://a", url_title="a", title="AVISO DE LICITAÇÃO Nº 10/2026"),
+        ArticleStub(url="http://b", url_title="b", title="PORTARIA Nº 5"),
+    ]
+    with patch("src.main.downloader") as mock_dl:
+        mock_dl.fetch_article_stubs.return_value = stubs
+        matches = main.run_scraper(cfg, datetime.date(2026, 2, 10), save_results=False)
+
+    mock_dl.fetch_content.assert_not_called()
+    assert [m.url for m in matches] == ["http://a"]
+    assert matches[0].title == "AVISO DE LICITAÇÃO Nº 10/2026"
+
+def test_title_only_matches_written_before_discovery_is_journaled(tmp_path):
+    """Testa que uma queda logo após registrar a descoberta não perde as correspondências só de título."""
+    rule = AdvancedMatchRule(name="Lic", title_terms=["aviso de licitação"], body_terms=[], sections=["dou3"])
+    cfg = Config(
+        schedule=ScheduleConfig(time="00:00"),
+        keywords=[],
+        storage=StorageConfig(output_dir=str(tmp_path / "data"), journal_dir=str(tmp_path / "journal")),
+        logging=LoggingConfig(),
+        rules=[rule],
+    )
+    stubs = [ArticleStub(url="http://a", url_title="a", title="AVISO DE LICITAÇÃO Nº 10/2026")]
+    on_disk = []
+
+    def record_discovered(self, section, urls):
+        # Instante em que a descoberta vira durável: o que já está nos arquivos
+        path = tmp_path / "data" / "lic.jsonl"
+        on_disk.append(path.read_text(encoding="utf-8") if path.exists() else "")
+
+    with patch("src.main.downloader") as mock_dl, \
+         patch.object(journal.CrawlJournal, "record_discovered", record_discovered):
+        mock_dl.fetch_article_stubs.return_value = stubs
+        main.run_scraper(cfg, datetime.date(2026, 2, 10))
+
+    assert len(on_disk) == 1
+    assert "http://a" in on_disk[0]
+
+def test_articles_evaluated_only_against_candidate_rules(tmp_path):
+    """Testa a partição por regra: cada ato baixado só é avaliado contra as regras que o título permite."""
+    from src import downloader, matcher
+
+    rules = [
+        AdvancedMatchRule(name="FN", title_terms=["portaria mjsp"], body_terms=["força nacional"], sections=["dou1"]),
+        AdvancedMatchRule(name="Licitações", title_terms=["aviso de licitação"], body_terms=["obra"], sections=["dou1"]),
+        AdvancedMatchRule(name="Amplo", body_terms=["servidor"], sections=["dou1"]),
+    ]
+    cfg = Config(
+        schedule=ScheduleConfig(time="00:00"),
+        keywords=[],
+        sections=["dou1"],
+        storage=StorageConfig(output_dir=str(tmp_path / "data"), journal_dir=str(tmp_path / "journal")),
+        logging=LoggingConfig(),
+        rules=rules,
+    )
+    stubs = [
+        ArticleStub(url="http://a", url_title="a", title="PORTARIA MJSP Nº 1"),
+        ArticleStub(url="http://b", url_title="b", title="DESPACHO Nº 2"),
+    ]
+    html = "<html><body><p>A força nacional e a obra do servidor.</p></body></html>"
+    with patch("src.main.downloader") as mock_dl, \
+         patch("src.main.matcher.match_article", wraps=matcher.match_article) as spy:
+        mock_dl.fetch_article_stubs.return_value = stubs
+        mock_dl.partition_by_rules.side_effect = downloader.partition_by_rules
+        mock_dl.fetch_content.return_value = html
+        main.run_scraper(cfg, datetime.date(2026, 2, 10), save_results=False)
+
+    evaluated = {call.kwargs["url"]: [rule.name for rule in call.kwargs["rules"]] for call in spy.call_args_list}
+    assert evaluated == {"http://a": ["FN", "Amplo"], "http://b": ["Amplo"]}
+
+def test_empty_section_completes_past_date_only(mock_dependencies):
+    """Testa que uma seção sem atos conclui a edição de uma data passada, mas não a de hoje."""
+    mock_conf, mock_dl, mock_parser, mock_matcher, mock_storage = mock_dependencies
+    cfg = mock_conf.return_value
+    mock_dl.fetch_article_stubs.return_value = []
+
+    past = datetime.date(2026, 2, 8)
+    main.run_scraper(cfg, past)
+    day_journal = journal.CrawlJournal.for_date(cfg.storage.journal_dir, past)
+    assert day_journal.section_done("dou1")
+    assert day_journal.is_complete()
+    day_journal.close()
+
+    today = datetime.date.today()
+    main.run_scraper(cfg, today)
+    day_journal = journal.CrawlJournal.for_date(cfg.storage.journal_dir, today)
+    assert not day_journal.section_done("dou1")
+    assert not day_journal.is_complete()
+    day_journal.close()
+
+def test_failed_article_deferred_and_recovered_at_end(mock_dependencies):
+    """Testa que um artigo que falha vai para a fila de adiados e é recuperado no fim da execução."""
+    mock_conf, mock_dl, mock_parser, mock_matcher, mock_storage = mock_dependencies
+    cfg = mock_conf.return_value
+    date = datetime.date(2026, 2, 10)
+
+    mock_dl.fetch_article_stubs.return_value = [ArticleStub(url="http://a", url_title="a")]
+    mock_dl.fetch_article.side_effect = [RuntimeError("503"), "<html></html>"]
+    match = MatchEntry(keyword="test", context="...", date="2026-02-10", section="dou1", url="http://a", capture_timestamp="")
+    mock_matcher.match_article.return_value = [match]
+
+    matches = main.run_scraper(cfg, date)
+
+    assert matches == [match]
+    assert mock_dl.fetch_article.call_count == 2
+    queue = journal.DeferredQueue.in_directory(cfg.storage.journal_dir)
+    assert len(queue) == 0
+    # O artigo recuperado conclui a seção e a edição
+    day_journal = journal.CrawlJournal.for_date(cfg.storage.journal_dir, date)
+    assert day_journal.is_complete()
+    day_journal.close()
+
+def test_not_found_article_abandoned_at_once(mock_dependencies):
+    """Testa que um 404 não vai para a fila de adiados: o artigo é abandonado e não impede a edição de concluir."""
+    mock_conf, mock_dl, mock_parser, mock_matcher, mock_storage = mock_dependencies
+    cfg = mock_conf.return_value
+    date = datetime.date(2026, 2, 10)
+
+    response = requests.Response()
+    response.status_code = 404
+    mock_dl.fetch_article_stubs.return_value = [ArticleStub(url="http://a", url_title="a")]
+    mock_dl.fetch_article.side_effect = requests.HTTPError("404", response=response)
+
+    main.run_scraper(cfg, date)
+
+    assert mock_dl.fetch_article.call_count == 1
+    assert len(journal.DeferredQueue.in_directory(cfg.storage.journal_dir)) == 0
+    day_journal = journal.CrawlJournal.for_date(cfg.storage.journal_dir, date)
+    assert day_journal.state("http://a") == "abandoned"
+    assert day_journal.pending("dou1") == []
+    assert day_journal.is_complete()
+    day_journal.close()
+
+def test_failed_article_carried_over_then_abandoned(mock_dependencies):
+    """Testa que um artigo que continua falhando fica para a próxima execução e depois é abandonado."""
+    mock_conf, mock_dl, mock_parser, mock_matcher, mock_storage = mock_dependencies
+    cfg = mock_conf.return_value
+
+    mock_dl.fetch_article_stubs.return_value = [ArticleStub(url="http://a", url_title="a")]
+    mock_dl.fetch_article.side_effect = RuntimeError("503")
+
+    main.run_scraper(cfg, datetime.date(2026, 2, 10))
+    queue = journal.DeferredQueue.in_directory(cfg.storage.journal_dir)
+    assert [(item.url, item.date, item.attempts) for item in queue.items()] == [("http://a", "2026-02-10", 2)]
+
+    # Próxima execução (outra data): a sobra é tentada de novo e esgota as 3 tentativas
+    mock_dl.fetch_article_stubs.return_value = []
+    main.run_scraper(cfg, datetime.date(2026, 2, 11))
+    assert len(journal.DeferredQueue.in_directory(cfg.storage.journal_dir)) == 0
+    # Abandonado: estado final no diário da data original, que pode então ser concluída
+    day_journal = journal.CrawlJournal.for_date(cfg.storage.journal_dir, datetime.date(2026, 2, 10))
+    assert day_journal.state("http://a") == "abandoned"
+    assert day_journal.pending("dou1") == []
+    day_journal.close()
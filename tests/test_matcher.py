@@ -1,6 +1,6 @@
 import pytest
 from src import matcher
-from src.models import MatchEntry
+from src.models import AdvancedMatchRule, MatchEntry
 
 # Texto de ajuda
 TEXT_SAMPLE = (
@@ -102,3 +102,138 @@ def test_find_multiple_matches_same_keyword():
     assert len(matches) == 2
     assert "fez isso" in matches[0].context
     assert "fez aquilo" in matches[1].context
+
+def test_find_matches_context_exact_with_decomposed_accents():
+    """Testa que o contexto não se desloca quando o texto tem acentos decompostos (NFD)."""
+    prefix = "Sec\u0327a\u0303o " * 40  # marcas combinantes somem na normalização
+    text = prefix + "KEYWORD" + " fim"
+    matches = matcher.find_matches(text=text, keywords=["keyword"], date="d", section="s", url="u")
+
+    assert len(matches) == 1
+    context = matches[0].context
+    assert context.endswith("KEYWORD fim")
+    assert len(context) == matcher.CONTEXT_PADDING + len("KEYWORD fim")
+
+def test_find_matches_many_terms_uses_single_scan():
+    """Testa que com centenas de termos (varredura do autômato) a saída é a mesma, na ordem das regras."""
+    rules = [
+        AdvancedMatchRule(name=f"Regra {i}", body_terms=[f"termo inexistente {i}"]) for i in range(200)
+    ] + [
+        AdvancedMatchRule(name="Força", body_terms=["Força Nacional", "nacional"]),
+        AdvancedMatchRule(name="Povos", body_terms=["povos indígenas"]),
+    ]
+    text = "A Força Nacional apoia a Fundação Nacional dos Povos Indígenas."
+    matches = matcher.find_matches(text, keywords=["fundação"], date="d", section="dou1", url="u", rules=rules)
+
+    assert [(m.keyword_group, m.keyword) for m in matches] == [
+        ("fundação", "fundação"),
+        ("Força", "Força Nacional"),
+        ("Força", "nacional"),
+        ("Força", "nacional"),
+        ("Povos", "povos indígenas"),
+    ]
+
+def test_find_matches_fuzzy_terms_are_flagged():
+    """Testa termos ~k: erros de digitação viram correspondências marcadas como aproximadas."""
+    text = "Autorizar a Força Nacionai de Segurança. A Força Nacional atua. Forca nacio nal."
+    rules = [AdvancedMatchRule(name="FN", body_terms=["força nacional~1"])]
+    matches = matcher.find_matches(text, keywords=["força nacional"], date="d", section="dou1", url="u", rules=rules)
+
+    assert [(m.keyword_group, m.keyword, m.fuzzy) for m in matches] == [
+        ("força nacional", "força nacional", False),
+        ("FN", "força nacional", True),
+        ("FN", "força nacional", False),
+        ("FN", "força nacional", True),
+    ]
+    # O contexto cobre a ocorrência aproximada inteira, no texto original
+    assert "Força Nacionai de Segurança" in matches[1].context
+
+def test_find_matches_coalesces_nearby_contexts():
+    """Testa que ocorrências próximas de uma regra viram um só trecho, com as posições de cada termo."""
+    names = " ".join(f"Servidor {i} da Força Nacional;" for i in range(40))
+    text = "Designar " + names + " " + "x" * 1000 + " e a polícia federal no fim."
+    rules = [AdvancedMatchRule(name="FN", body_terms=["força nacional", "polícia federal"])]
+
+    separate = matcher.find_matches(text, keywords=[], date="d", section="dou1", url="u", rules=rules)
+    merged = matcher.find_matches(text, keywords=[], date="d", section="dou1", url="u", rules=rules, coalesce=True)
+
+    assert len(separate) == 41
+    assert [(m.keyword_group, m.keyword, len(m.hits)) for m in merged] == [
+        ("FN", "força nacional", 40),
+        ("FN", "polícia federal", 1),
+    ]
+    first = merged[0]
+    assert {first.context[start:end] for start, end, _ in first.hits} == {"Força Nacional"}
+    assert first.context.startswith("Designar")
+    assert len(first.context) == first.hits[-1][1] + matcher.CONTEXT_PADDING
+    assert sum(len(m.context) for m in merged) < sum(len(m.context) for m in separate)
+
+def test_coalesced_snippet_lists_every_term():
+    """Testa termos diferentes de uma mesma regra no mesmo trecho: keyword lista os termos na ordem."""
+    text = "A Polícia Federal e a Força Nacional atuarão juntas."
+    rules = [AdvancedMatchRule(name="FN", body_terms=["força nacional", "polícia federal"])]
+    merged = matcher.find_matches(text, keywords=[], date="d", section="dou1", url="u", rules=rules, coalesce=True)
+
+    assert len(merged) == 1
+    assert merged[0].keyword == "polícia federal, força nacional"
+    assert merged[0].context == text
+    assert [term for _, _, term in merged[0].hits] == ["polícia federal", "força nacional"]
+
+def _batch_plan(rules, keywords=()):
+    from src import rule_plan
+    from src.models import Config, LoggingConfig, ScheduleConfig, StorageConfig
+
+    cfg = Config(
+        schedule=ScheduleConfig(time="00:00"),
+        keywords=list(keywords),
+        sections=["dou1"],
+        storage=StorageConfig(),
+        logging=LoggingConfig(),
+        rules=rules,
+    )
+    return rule_plan.build_plan(cfg)
+
+def test_match_batch_matches_find_matches():
+    """Testa que as colunas do lote trazem as mesmas ocorrências (e contextos) de find_matches, na mesma ordem."""
+    rules = [
+        AdvancedMatchRule(name="FN", body_terms=["força nacional~1", "polícia"]),
+        AdvancedMatchRule(name="Portarias", body_terms=[], title_terms=["portaria"]),
+        AdvancedMatchRule(name="Expr", body_terms=[], expression="nomeação OR NOT exoneração"),
+    ]
+    docs = [
+        ("1", "PORTARIA Nº 1", "A Força Nacionai e a Polícia; Fundação; força nacional.", "dou1"),
+        ("2", "DESPACHO", "Nada relevante, só a exoneração.", "dou1"),
+        ("3", "AVISO", "Fundação e nomeação.", "dou1"),
+    ]
+    columns = matcher.match_batch(docs, _batch_plan(rules, keywords=["fundação"]))
+
+    expected = []
+    for doc_id, title, text, section in docs:
+        for m in matcher.find_matches(text, ["fundação"], "d", section, doc_id, title=title, rules=rules):
+            expected.append((doc_id, m.keyword_group, m.keyword, m.fuzzy, m.context))
+    got = []
+    for i in range(len(columns)):
+        text = docs[int(columns.doc_id[i]) - 1][2]
+        if columns.context_start[i] < 0:
+            context = f"Alerta de Título: {docs[int(columns.doc_id[i]) - 1][1]}"
+        else:
+            context = text[columns.context_start[i]:columns.context_end[i]]
+        got.append((columns.doc_id[i], columns.group[i], columns.term[i], columns.fuzzy[i], context))
+    assert got == expected
+
+    fn = [i for i in range(len(columns)) if columns.term[i] == "força nacional"]
+    assert [docs[0][2][columns.start[i]:columns.end[i]] for i in fn] == ["Força Nacionai", "força nacional"]
+
+def test_match_batch_process_pool_and_frame():
+    """Testa o lote em processos (ordem dos documentos preservada) e a conversão para DataFrame."""
+    plan = _batch_plan([AdvancedMatchRule(name="FN", body_terms=["força nacional"])])
+    docs = [(str(i), "", "força nacional " * (i % 3), "dou1") for i in range(30)]
+
+    local = matcher.match_batch(docs, plan)
+    pooled = matcher.match_batch(docs, plan, workers=2, chunk_size=4)
+    assert pooled == local
+    assert len(local) == 30
+
+    frame = local.to_frame()
+    assert list(frame.columns) == ["doc_id", "group", "term", "start", "end", "context_start", "context_end", "fuzzy"]
+    assert frame.groupby("doc_id").size()["2"] == 2
@@ -86,4 +86,25 @@ def test_rule_body_only():
     )
     assert len(matches) == 1
     assert matches[0].keyword == "Apenas Corpo"
-    assert "importante" in matches[0].context
\ No newline at end of file
+    assert "importante" in matches[0].context
+def test_rule_expression_and_not_near():
+    """Testa regras com expressão: saída só quando a expressão inteira é satisfeita."""
+    rules = [
+        AdvancedMatchRule(name="Nomeação FN", body_terms=[], expression="nomeação AND força nacional NOT exoneração"),
+        AdvancedMatchRule(name="Cessão", body_terms=[], expression="cessão NEAR/3 servidor"),
+    ]
+    text = "Resolve a nomeação de servidor para a Força Nacional. A cessão do referido servidor fica autorizada."
+
+    matches = matcher.find_matches(text=text, keywords=[], date="d", section="s1", url="u", title="PORTARIA", rules=rules)
+    assert [(m.keyword_group, m.keyword) for m in matches] == [
+        ("Nomeação FN", "nomeação"),
+        ("Nomeação FN", "força nacional"),
+        ("Cessão", "cessão"),
+        ("Cessão", "servidor"),  # só a ocorrência próxima de "cessão"
+    ]
+    assert "do referido servidor" in matches[-1].context
+
+    vetoed = matcher.find_matches(
+        text=text + " Fica revogada a exoneração.", keywords=[], date="d", section="s1", url="u", rules=rules[:1]
+    )
+    assert vetoed == []
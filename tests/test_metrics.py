@@ -0,0 +1,30 @@
+from src import metrics
+
+def test_percentile_interpolates():
+    """Testa o percentil por interpolação linear e o caso sem amostras."""
+    values = [1.0, 2.0, 3.0, 4.0]
+    assert metrics.percentile(values, 50) == 2.5
+    assert metrics.percentile(values, 100) == 4.0
+    assert metrics.percentile([], 99) == 0.0
+
+def test_stage_metrics_summary():
+    """Testa o registro por etapa via time(), wrap() e record()."""
+    ticks = iter([0.0, 0.5, 1.0, 3.0])
+    stage_metrics = metrics.StageMetrics(clock=lambda: next(ticks))
+
+    with stage_metrics.time("parse"):
+        pass
+    timed_fetch = stage_metrics.wrap("fetch", lambda url: url.upper())
+    assert timed_fetch("a") == "A"
+    stage_metrics.record("fetch", 1.0)
+
+    summary = stage_metrics.summary()
+    assert summary["parse"] == {"count": 1, "total": 0.5, "p50": 0.5, "p99": 0.5}
+    assert summary["fetch"]["count"] == 2
+    assert summary["fetch"]["total"] == 3.0
+    assert stage_metrics.count("match") == 0
+
+def test_timed_without_collector():
+    """Testa que timed() sem coletor não faz nada."""
+    with metrics.timed(None, "parse"):
+        pass
@@ -0,0 +1,65 @@
+import pytest
+import requests
+
+from src import benchmark, downloader
+from src.mock_server import MockDouServer
+from src.models import CrawlerConfig
+
+@pytest.fixture(autouse=True)
+def restore_downloader():
+    """O benchmark aponta o downloader para o servidor local; restaura o padrão depois."""
+    yield
+    downloader.configure(CrawlerConfig(warmup=False))
+    downloader.close()
+
+def test_mock_server_routes():
+    """Testa as rotas de listagem e artigo e a contagem de requisições do servidor local."""
+    with MockDouServer(articles=3, page_size=2_000, match_every=2) as server:
+        listing = requests.get(f"{server.base_url}/leiturajornal?secao=dou1&data=05-01-2026", timeout=5)
+        stubs = downloader.parse_listing(listing.text)
+        assert [s.url_title for s in stubs] == [server.slug(i) for i in range(3)]
+
+        article = requests.get(f"{server.base_url}/web/dou/-/{server.slug(0)}", timeout=5)
+        assert article.status_code == 200
+        assert "texto-dou" in article.text
+        assert "Força Nacional" in article.text
+        assert len(article.text) >= 2_000
+
+        missing = requests.get(f"{server.base_url}/web/dou/-/{server.slug(99)}", timeout=5)
+        assert missing.status_code == 404
+        assert server.requests == {"listing": 1, "article": 2}
+
+def test_mock_server_injects_throttling():
+    """Testa a injeção de 429 com Retry-After."""
+    with MockDouServer(articles=1, throttle_rate=1.0) as server:
+        response = requests.get(f"{server.base_url}/web/dou/-/{server.slug(0)}", timeout=5)
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "0"
+
+def test_benchmark_end_to_end():
+    """Testa o raspador completo contra o servidor local: todos os artigos processados e métricas por etapa."""
+    report = benchmark.run_benchmark(articles=20, page_size=2_000, workers=4, rps=500)
+
+    assert report["articles_processed"] == 20
+    assert report["matches"] == 2  # artigos 0 e 10
+    assert report["requests"] == {"warmup": 1, "listing": 1, "article": 20}
+    assert report["bytes_transferred"] > 20 * 2_000
+    assert set(report["stages"]) == {"discover", "fetch", "parse", "match", "store"}
+    assert report["stages"]["fetch"]["count"] == 20
+
+def test_benchmark_end_to_end_with_analysis_pool():
+    """Testa o raspador com parsing/correspondência no pool de processos: mesmo resultado do modo em processo."""
+    report = benchmark.run_benchmark(articles=20, page_size=2_000, workers=4, rps=500, parse_workers=2)
+
+    assert report["articles_processed"] == 20
+    assert report["matches"] == 2
+    assert report["stages"]["match"]["count"] == 20
+
+def test_benchmark_end_to_end_streaming():
+    """Testa o raspador com parsing em fluxo durante o download: mesmo resultado do modo com HTML inteiro."""
+    report = benchmark.run_benchmark(articles=20, page_size=2_000, workers=4, rps=500, streaming=True)
+
+    assert report["articles_processed"] == 20
+    assert report["matches"] == 2
+    assert "parse" not in report["stages"]
+    assert report["stages"]["match"]["count"] == 20
@@ -86,3 +86,133 @@ def test_normalize_text_removes_accents():
     # Vamos impor lower() + remoção de acentos para o ajudante específico 'normalize_text' destinado à correspondência.
     
     assert parser.normalize_text("Árvore") == "arvore"
+
+HTML_DOU_ARTICLE = """
+<html>
+<head><title>PORTARIA Nº 12, DE 9 DE FEVEREIRO DE 2026 - DOU - Imprensa Nacional</title>
+<script>var x = "não é texto";</script></head>
+<body>
+    <div class="detalhes-dou">
+        <p class="publicado-dou">Publicado em: <span class="publicado-dou-data">10/02/2026</span>
+        | Edição: <span class="edicao-dou-data">28</span>
+        | Seção: <span class="secao-dou-data">1</span>
+        | Página: <span class="pagina-dou-data">45</span></p>
+        <p>Órgão: <span class="orgao-dou-data">Ministério da Justiça e Segurança Pública/Gabinete do Ministro</span></p>
+    </div>
+    <div class="texto-dou">
+        <p class="identifica">PORTARIA Nº 12, DE 9 DE FEVEREIRO DE 2026</p>
+        <p>Autoriza o emprego da Força Nacional<!-- nota interna --> de Segurança Pública.</p>
+    </div>
+</body>
+</html>
+"""
+
+def test_parse_article_single_pass():
+    """Testa que parse_article devolve título, texto limpo e metadados do DOU numa única análise."""
+    doc = parser.parse_article(HTML_DOU_ARTICLE, url="http://a")
+
+    assert doc.url == "http://a"
+    assert doc.title == "PORTARIA Nº 12, DE 9 DE FEVEREIRO DE 2026 - DOU - Imprensa Nacional"
+    assert doc.text == "PORTARIA Nº 12, DE 9 DE FEVEREIRO DE 2026 Autoriza o emprego da Força Nacional de Segurança Pública."
+    assert "não é texto" not in doc.text
+    assert "nota interna" not in doc.text
+    assert doc.metadata == {
+        "published": "10/02/2026",
+        "edition": "28",
+        "section": "1",
+        "page": "45",
+        "issuing_body": "Ministério da Justiça e Segurança Pública/Gabinete do Ministro",
+        "extraction": parser.DEFAULT_BODY_SELECTORS[0],
+    }
+
+def test_parse_article_handles_empty_and_declared_encoding():
+    """Testa entrada vazia e HTML com declaração de encoding (rejeitada pelo lxml em str)."""
+    assert parser.parse_article("").text == ""
+    doc = parser.parse_article('<?xml version="1.0" encoding="utf-8"?><html><head><title>Ato</title></head><body>Seção</body></html>')
+    assert doc.title == "Ato"
+    assert doc.text.endswith("Seção")
+
+HTML_PORTAL_PAGE = """
+<html><head><title>Ato</title></head>
+<body>
+    <nav>Início | Diário Oficial da União | Legislação</nav>
+    <div class="cookie-banner">Este site usa cookies.</div>
+    <div class="journal-content-article">
+        <p class="identifica">DESPACHO Nº 7</p>
+        <p>Aprova o plano de trabalho.</p>
+        <p class="assina">FULANO DE TAL</p>
+    </div>
+    <footer>Imprensa Nacional - Todos os direitos reservados</footer>
+</body></html>
+"""
+
+def test_parse_article_body_container_chain():
+    """Testa que a cadeia de seletores isola o corpo do ato e reporta o seletor usado."""
+    doc = parser.parse_article(HTML_PORTAL_PAGE)
+    assert doc.text == "DESPACHO Nº 7 Aprova o plano de trabalho. FULANO DE TAL"
+    assert doc.metadata["extraction"] == parser.DEFAULT_BODY_SELECTORS[1]
+
+    custom = parser.parse_article(HTML_PORTAL_PAGE, selectors=["//p[@class='assina']"])
+    assert custom.text == "FULANO DE TAL"
+
+def test_parse_article_falls_back_to_whole_page():
+    """Testa o retorno à página inteira quando nenhum seletor (válido) encontra o corpo."""
+    doc = parser.parse_article(HTML_PORTAL_PAGE, selectors=["//div[@id='inexistente']", "//p[", "//nav/@class"])
+    assert doc.metadata["extraction"] == parser.PAGE_STRATEGY
+    assert "Este site usa cookies." in doc.text
+    assert "Aprova o plano de trabalho." in doc.text
+    # O wrapper antigo mantém o comportamento de página inteira
+    assert parser.extract_text(HTML_PORTAL_PAGE) == doc.text
+
+@pytest.mark.parametrize("html", [HTML_DOU_ARTICLE, HTML_PORTAL_PAGE, HTML_DIRTY, HTML_WITH_TITLE, HTML_WITHOUT_TITLE])
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+def test_streaming_parser_matches_parse_article(html, chunk_size):
+    """Testa que o parser em fluxo dá o mesmo documento que parse_article, com blocos de qualquer tamanho."""
+    data = html.encode("utf-8")
+    stream = parser.StreamingArticleParser(url="http://a", encoding="utf-8")
+    for start in range(0, len(data), chunk_size):
+        stream.feed(data[start:start + chunk_size])
+    doc = stream.close()
+
+    expected = parser.parse_article(html, url="http://a")
+    assert (doc.url, doc.title, doc.text, doc.metadata) == (expected.url, expected.title, expected.text, expected.metadata)
+
+def test_streaming_parser_selector_subset():
+    """Testa que seletores fora do subconjunto //tag[classe] são ignorados, e a entrada vazia."""
+    stream = parser.StreamingArticleParser(selectors=["//p[@class='assina']", "//footer"], encoding="utf-8")
+    stream.feed(HTML_PORTAL_PAGE.encode("utf-8"))
+    doc = stream.close()
+    assert doc.text == "Imprensa Nacional - Todos os direitos reservados"
+    assert doc.metadata["extraction"] == "//footer"
+
+    assert parser.StreamingArticleParser().close().text == ""
+
+def test_fold_text_matches_reference_normalizer():
+    """Testa que o normalizador por tabela dá o mesmo resultado da implementação NFD."""
+    samples = [
+        "Atos da Fundação Nacional dos Povos Indígenas – “Portaria” nº 12, § 3º",
+        "ÀÉÎÕÜ çÇ ñ ÿ Ŀ ǅ ȘȚ",
+        "decomposto: ac\u0327a\u0303o e\u0301",
+        "ligadura ﬁm e İstanbul",
+        "Ελληνικά и кириллица",
+    ]
+    for sample in samples:
+        assert parser.normalize_text(sample) == parser.normalize_text_nfd(sample)
+
+def test_fold_text_offsets_map_back_to_original():
+    """Testa que o mapa de posições recupera o trecho exato do texto original."""
+    plain = parser.fold_text("Fundação Nacional")
+    assert plain.offsets is None
+    assert plain.original_span(0, 8) == (0, 8)
+
+    # Marcas combinantes somem na dobra: as posições deixam de coincidir
+    text = "Cafe\u0301 com Ac\u0327u\u0301car e Forc\u0327a Nacional"
+    folded = parser.fold_text(text)
+    assert folded.offsets is not None
+    assert folded.text == "cafe com acucar e forca nacional"
+    idx = folded.text.index("forca nacional")
+    start, end = folded.original_span(idx, idx + len("forca nacional"))
+    assert text[start:end] == "Forc\u0327a Nacional"
+    idx = folded.text.index("acucar")
+    start, end = folded.original_span(idx, idx + len("acucar"))
+    assert text[start:end] == "Ac\u0327u\u0301car"
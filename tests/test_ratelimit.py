@@ -0,0 +1,127 @@
+import datetime
+import multiprocessing
+import time
+import pytest
+from src.ratelimit import AdaptiveRateController, SharedTokenBucket, TokenBucket, parse_retry_after
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+def test_token_bucket_allows_burst_then_throttles():
+    """Testa que a rajada inicial passa sem espera e depois o ritmo é respeitado."""
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, capacity=2, clock=clock, sleep=clock.sleep)
+
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == 0
+    # Terceiro token só após 0.5s (2 tokens/s)
+    waited = bucket.acquire()
+    assert waited == pytest.approx(0.5)
+    assert clock.now == pytest.approx(0.5)
+
+def test_token_bucket_refills_up_to_capacity():
+    """Testa que tokens não acumulam além da capacidade."""
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1.0, capacity=3, clock=clock, sleep=clock.sleep)
+    for _ in range(3):
+        bucket.acquire()
+
+    clock.now += 100
+    assert bucket.try_acquire()
+    assert bucket.try_acquire()
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+
+def test_token_bucket_set_rate():
+    """Testa a alteração da taxa em tempo de execução."""
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1.0, capacity=1, clock=clock, sleep=clock.sleep)
+    bucket.acquire()
+    bucket.set_rate(4.0)
+    assert bucket.acquire() == pytest.approx(0.25)
+
+def test_token_bucket_rejects_invalid_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+def make_controller(clock, rate=1.0, **kwargs):
+    bucket = TokenBucket(rate=rate, capacity=1, clock=clock, sleep=clock.sleep)
+    return AdaptiveRateController(bucket, clock=clock, sleep=clock.sleep, **kwargs)
+
+def test_controller_additive_increase_on_fast_success():
+    """Testa o aumento aditivo da taxa com respostas 2xx rápidas."""
+    clock = FakeClock()
+    ctrl = make_controller(clock, rate=1.0, increase=0.1, max_rate=1.25)
+    ctrl.record_response(200, latency=0.2)
+    assert ctrl.rate == pytest.approx(1.1)
+    ctrl.record_response(200, latency=0.2)
+    ctrl.record_response(200, latency=0.2)
+    assert ctrl.rate == pytest.approx(1.25)  # limitado por max_rate
+
+def test_controller_multiplicative_decrease_on_429():
+    """Testa a redução multiplicativa em 429, respeitando o intervalo mínimo entre reduções."""
+    clock = FakeClock()
+    ctrl = make_controller(clock, rate=2.0, decrease=0.5, min_rate=0.3, decrease_cooldown=5)
+    ctrl.record_response(429, latency=0.1)
+    assert ctrl.rate == pytest.approx(1.0)
+    # Segunda falha dentro do cooldown não reduz de novo
+    ctrl.record_response(503, latency=0.1)
+    assert ctrl.rate == pytest.approx(1.0)
+    clock.now += 10
+    ctrl.record_response(503, latency=0.1)
+    ctrl_state = ctrl.state()
+    assert ctrl_state["rate"] == pytest.approx(0.5)
+    assert ctrl_state["throttled"] == 3
+
+def test_controller_backs_off_on_latency():
+    """Testa a redução quando a latência média ultrapassa o alvo."""
+    clock = FakeClock()
+    ctrl = make_controller(clock, rate=1.0, latency_target=1.0)
+    ctrl.record_response(200, latency=5.0)
+    assert ctrl.rate == pytest.approx(0.5)
+
+def test_controller_retry_after_pause():
+    """Testa que Retry-After pausa as requisições até o instante indicado."""
+    clock = FakeClock()
+    ctrl = make_controller(clock)
+    ctrl.record_response(429, latency=0.1, retry_after="7")
+    assert ctrl.pause_remaining() == pytest.approx(7)
+    assert ctrl.wait_for_clearance() == pytest.approx(7)
+    assert ctrl.pause_remaining() == 0
+
+def test_parse_retry_after_http_date():
+    now = datetime.datetime(2026, 2, 10, 12, 0, 0, tzinfo=datetime.timezone.utc)
+    assert parse_retry_after("Tue, 10 Feb 2026 12:00:30 GMT", now=now) == pytest.approx(30)
+    assert parse_retry_after("120") == 120
+    assert parse_retry_after("lixo") is None
+    assert parse_retry_after(None) is None
+
+def _drain(bucket, count):
+    for _ in range(count):
+        bucket.acquire()
+
+def test_shared_token_bucket_budget_across_processes():
+    """Testa que vários processos dividem um único orçamento de requisições."""
+    bucket = SharedTokenBucket(rate=40.0, capacity=1)
+    bucket.acquire()  # esvazia a rajada inicial
+
+    start = time.monotonic()
+    procs = [multiprocessing.Process(target=_drain, args=(bucket, 6)) for _ in range(2)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(10)
+    elapsed = time.monotonic() - start
+
+    # 12 tokens a 40/s exigem pelo menos ~0.3s no total, mesmo divididos entre processos
+    assert all(p.exitcode == 0 for p in procs)
+    assert elapsed >= 0.28
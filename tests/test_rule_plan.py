@@ -0,0 +1,111 @@
+import pickle
+from dataclasses import replace
+
+from src import matcher, rule_plan
+from src.models import AdvancedMatchRule, Config, LoggingConfig, ScheduleConfig, StorageConfig
+
+def make_config(**overrides):
+    values = dict(
+        schedule=ScheduleConfig(time="06:00"),
+        keywords=["Fundação Nacional"],
+        sections=["dou1", "dou2"],
+        storage=StorageConfig(),
+        logging=LoggingConfig(),
+        rules=[
+            AdvancedMatchRule(name="FN", body_terms=["Força Nacional"], title_terms=["PORTARIA"], sections=["dou1"]),
+            AdvancedMatchRule(name="Licitações", body_terms=[], title_terms=["Aviso de Licitação"], sections=["dou3"]),
+            AdvancedMatchRule(name="Global", body_terms=["Edital"]),
+        ],
+    )
+    values.update(overrides)
+    return Config(**values)
+
+def test_plan_routes_sections_with_normalized_terms():
+    """Testa a tabela seção -> regras, os termos pré-normalizados e as flags de cada regra."""
+    plan = rule_plan.build_plan(make_config())
+
+    assert sorted(plan.sections) == ["dou1", "dou2", "dou3"]
+    dou1 = plan.for_section("dou1")
+    assert [kw.normalized for kw in dou1.keywords] == ["fundacao nacional"]
+    assert [rule.name for rule in dou1.body_rules] == ["FN", "Global"]
+    assert dou1.rules[0].title_terms == ("portaria",)
+    assert dou1.rules[0].body_terms[0] == rule_plan.CompiledTerm("Força Nacional", "forca nacional")
+
+    dou3 = plan.for_section("dou3")
+    assert not dou3.keywords
+    assert [rule.name for rule in dou3.title_only_rules] == ["Licitações"]
+    assert dou3.needs_body  # a regra global tem termos de corpo
+
+    # Seção fora da configuração: só as regras sem seção
+    extra = plan.for_section("dou1e")
+    assert extra.section == "dou1e"
+    assert [rule.name for rule in extra.rules] == ["Global"]
+
+def test_plan_is_cached_by_config_hash():
+    """Testa que a mesma configuração (ex.: config.yaml recarregado) reaproveita o plano compilado."""
+    first = rule_plan.build_plan(make_config())
+    assert rule_plan.build_plan(make_config()) is first
+    assert rule_plan.config_hash(make_config()) == first.key
+
+    changed = make_config(keywords=["Outra"])
+    assert rule_plan.config_hash(changed) != first.key
+    assert rule_plan.build_plan(changed) is not first
+
+    # Só keywords, seções e regras entram no hash
+    assert rule_plan.config_hash(replace(make_config(), logging=LoggingConfig(level="DEBUG"))) == first.key
+
+def test_match_article_does_no_term_normalization(monkeypatch):
+    """Testa que o caminho por artigo só normaliza o título (os termos vêm prontos do plano)."""
+    plan = rule_plan.build_plan(make_config()).for_section("dou1")
+    calls = []
+    original = matcher.normalize_text
+    monkeypatch.setattr(matcher, "normalize_text", lambda text: calls.append(text) or original(text))
+
+    matches = matcher.match_article(
+        plan, text="A Força Nacional e a Fundação Nacional.", title="PORTARIA Nº 1", date="d", url="u"
+    )
+
+    assert [(m.keyword_group, m.keyword) for m in matches] == [
+        ("Fundação Nacional", "Fundação Nacional"),
+        ("FN", "Força Nacional"),
+    ]
+    assert all(m.section == "dou1" for m in matches)
+    assert calls == ["PORTARIA Nº 1"]
+
+def test_plan_is_picklable():
+    """Testa que o plano pode ir para os processos do pool de análise."""
+    plan = rule_plan.build_plan(make_config())
+    copy = pickle.loads(pickle.dumps(plan))
+    assert copy.key == plan.key
+    assert copy.for_section("dou1").automaton.search("forca nacional") == {"forca nacional": [0]}
+
+def test_plan_carries_coalesce_contexts():
+    """Testa que storage.coalesce_contexts entra no hash e chega a todas as seções (inclusive as extras)."""
+    plain = rule_plan.build_plan(make_config())
+    coalesced = rule_plan.build_plan(make_config(storage=StorageConfig(coalesce_contexts=True)))
+
+    assert plain.key != coalesced.key
+    assert not plain.for_section("dou1").coalesce_contexts
+    assert coalesced.for_section("dou1").coalesce_contexts
+    assert coalesced.for_section("dou1e").coalesce_contexts
+
+    text = "A Força Nacional e a Força Nacional."
+    matches = matcher.match_article(coalesced.for_section("dou1"), text, "PORTARIA 1", "d", "u")
+    assert [(m.keyword_group, len(m.hits)) for m in matches] == [("FN", 2)]
+
+def test_candidate_rules_by_listing_title():
+    """Testa as regras candidatas de um ato: as sem title_terms sempre, as demais pelo título (sem acentos)."""
+    cfg = make_config(rules=[
+        AdvancedMatchRule(name="FN", body_terms=["Força Nacional"], title_terms=["PORTARIA MJSP"], sections=["dou1"]),
+        AdvancedMatchRule(name="Obras", body_terms=["obra"], title_terms=["Aviso de Licitação", "Extrato"], sections=["dou1"]),
+        AdvancedMatchRule(name="Amplo", body_terms=["servidor"], sections=["dou1"]),
+        AdvancedMatchRule(name="Título", body_terms=[], title_terms=["Edital"], sections=["dou1"]),
+    ])
+    dou1 = rule_plan.build_plan(cfg).for_section("dou1")
+
+    def names(title):
+        return [rule.name for rule in dou1.candidate_rules(title)]
+
+    assert names("portaria mjsp no 12") == ["FN", "Amplo"]
+    assert names("aviso de licitacao pregao 3") == ["Obras", "Amplo"]
+    assert names("despacho") == ["Amplo"]  # regras só de título nunca são candidatas de corpo
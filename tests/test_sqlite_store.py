@@ -0,0 +1,119 @@
+import json
+
+import pytest
+
+from src import matcher, sqlite_store, storage
+from src.models import MatchEntry, StorageConfig
+
+def _match(group, keyword, context, date="2026-02-10", section="dou1", url="http://a", title="Portaria"):
+    return MatchEntry(
+        keyword=keyword, context=context, date=date, section=section, url=url,
+        capture_timestamp="2026-02-10T10:00:00", title=title, keyword_group=group,
+    )
+
+@pytest.fixture
+def cfg(tmp_path):
+    return StorageConfig(output_dir=str(tmp_path), format="sqlite")
+
+def test_open_writer_by_format(tmp_path, cfg):
+    """Testa se storage.open_writer escolhe o backend pelo storage.format."""
+    with storage.open_writer(cfg) as writer:
+        assert isinstance(writer, sqlite_store.SqliteMatchWriter)
+    with storage.open_writer(StorageConfig(output_dir=str(tmp_path))) as writer:
+        assert isinstance(writer, storage.MatchWriter)
+
+def test_writer_commits_on_flush_and_ignores_duplicates(cfg):
+    """Testa se as linhas só ficam visíveis (e os callbacks rodam) após o commit, sem duplicatas."""
+    writer = sqlite_store.SqliteMatchWriter(cfg, flush_rows=1)
+    flushed = []
+    match = _match("Regra A", "força nacional", "emprego da força nacional")
+    writer.write([match], on_flushed=lambda: flushed.append(1))
+
+    # Inserida na transação aberta, mas ainda não confirmada para outros leitores
+    reader = sqlite_store.connect(sqlite_store.database_path(cfg))
+    assert sqlite_store.query_matches(reader) == []
+    assert flushed == []
+
+    writer.flush()
+    assert flushed == [1]
+    writer.write([match])  # Mesma ocorrência (ex.: artigo refeito na retomada)
+    writer.close()
+    assert writer.lines_written == 1
+
+    rows = sqlite_store.query_matches(reader)
+    reader.close()
+    assert len(rows) == 1
+    assert rows[0]["keyword_group"] == "Regra A"
+    assert rows[0]["keyword"] == "força nacional"
+    assert rows[0]["hits"] == [] and rows[0]["fuzzy"] is False
+
+def test_repeated_term_in_short_text_keeps_every_occurrence(cfg):
+    """Testa se ocorrências com o mesmo trecho (ato curto, termo repetido) viram linhas distintas."""
+    matches = matcher.find_matches(
+        "A Força Nacional e a Força Nacional.", ["força nacional"], date="2026-02-10", section="dou1", url="http://a"
+    )
+    assert len(matches) == 2 and matches[0].context == matches[1].context
+
+    with sqlite_store.SqliteMatchWriter(cfg) as writer:
+        writer.write(matches)
+        writer.write(matches)  # Artigo refeito na retomada: mesmas ocorrências, nada novo
+    assert writer.lines_written == 2
+
+    conn = sqlite_store.connect(sqlite_store.database_path(cfg))
+    try:
+        assert len(sqlite_store.query_matches(conn)) == 2
+    finally:
+        conn.close()
+
+def test_query_filters_and_full_text(cfg):
+    """Testa os filtros por data, regra e seção e a busca livre sem acentos em trechos e títulos."""
+    with sqlite_store.SqliteMatchWriter(cfg) as writer:
+        writer.write([
+            _match("Regra A", "força nacional", "emprego da Força Nacional de Segurança", url="http://1"),
+            _match("Regra A", "força nacional", "prorrogação do emprego", date="2026-02-11", url="http://2", title="Portaria de prorrogação"),
+            _match("Regra B", "licitação", "aviso de licitação", section="dou3", url="http://3", title="Aviso"),
+        ])
+
+    conn = sqlite_store.connect(sqlite_store.database_path(cfg))
+    try:
+        assert sqlite_store.available_dates(conn) == ["2026-02-11", "2026-02-10"]
+        assert sqlite_store.available_rules(conn) == ["Regra A", "Regra B"]
+        assert [r["url"] for r in sqlite_store.query_matches(conn, date="10/02/2026")] == ["http://1", "http://3"]
+        assert [r["url"] for r in sqlite_store.query_matches(conn, rules=["Regra B"])] == ["http://3"]
+        assert [r["url"] for r in sqlite_store.query_matches(conn, sections=["dou1"], rules=["Regra A"])] == ["http://2", "http://1"]
+        assert [r["url"] for r in sqlite_store.query_matches(conn, text="forca seguranca")] == ["http://1"]
+        assert [r["url"] for r in sqlite_store.query_matches(conn, text="prorrogacao")] == ["http://2"]
+        # Aspas e operadores digitados pelo usuário são tratados como texto
+        assert sqlite_store.query_matches(conn, text='aviso" OR "x') == []
+    finally:
+        conn.close()
+
+def test_import_jsonl(tmp_path):
+    """Testa a importação dos JSONL existentes: datas antigas, grupo legado, linha inválida e reexecução."""
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    lines = [
+        json.dumps({"keyword": "teste", "context": "ctx 1", "date": "10/02/2026", "section": "dou1",
+                    "url": "http://1", "capture_timestamp": "t", "title": "T", "keyword_group": "Regra A"}),
+        json.dumps({"keyword": "teste", "context": "ctx 2", "date": "2026-02-11", "section": "dou1",
+                    "url": "http://2", "capture_timestamp": "t"}),
+        '{"keyword": "cortad',
+        # Registros antigos sem offset: duas ocorrências com o mesmo trecho continuam duas
+        json.dumps({"keyword": "teste", "context": "ctx 3", "date": "2026-02-11", "section": "dou1", "url": "http://3"}),
+        json.dumps({"keyword": "teste", "context": "ctx 3", "date": "2026-02-11", "section": "dou1", "url": "http://3"}),
+    ]
+    (data_dir / "regra-a.jsonl").write_text("\n".join(lines) + "\n", encoding="utf-8")
+    db_path = tmp_path / "matches.db"
+
+    assert sqlite_store.import_jsonl(data_dir, db_path) == 4
+    assert sqlite_store.import_jsonl(data_dir, db_path) == 0
+
+    conn = sqlite_store.connect(db_path)
+    try:
+        rows = sqlite_store.query_matches(conn)
+    finally:
+        conn.close()
+    assert [(r["date"], r["url"]) for r in rows] == [
+        ("2026-02-11", "http://2"), ("2026-02-11", "http://3"), ("2026-02-11", "http://3"), ("2026-02-10", "http://1"),
+    ]
+    assert rows[0]["keyword_group"] == "teste" and rows[-1]["keyword_group"] == "Regra A"
@@ -89,3 +89,53 @@ def test_filename_sanity_sanitization(tmp_path):
     assert "\\" not in filename
     assert "fundacao" in filename.lower() or "funai" in filename.lower() # Depende da lógica de slugify
     # Slugify básico geralmente: fundacao-nacional-funai.jsonl
+
+def _match(group, context):
+    return MatchEntry(
+        keyword="teste", context=context, date="d", section="dou1", url="u",
+        capture_timestamp="t", keyword_group=group,
+    )
+
+def test_writer_buffers_until_threshold_and_close(tmp_path):
+    """Testa se o MatchWriter acumula as linhas e só grava ao passar do limite ou no close()."""
+    cfg = StorageConfig(output_dir=str(tmp_path))
+    writer = storage.MatchWriter(cfg, flush_bytes=10**6, flush_seconds=3600)
+    flushed = []
+
+    writer.write([_match("Regra A", "um"), _match("Regra B", "dois")], on_flushed=lambda: flushed.append(1))
+    writer.write([_match("Regra A", "tres")])
+    assert not (tmp_path / "regra-a.jsonl").exists()
+    assert flushed == []
+
+    writer.close()
+    assert flushed == [1]
+    lines = (tmp_path / "regra-a.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["context"] for line in lines] == ["um", "tres"]
+    assert (tmp_path / "regra-b.jsonl").read_text(encoding="utf-8").count("\n") == 1
+    assert writer.lines_written == 3 and writer.flushes == 1
+
+    with pytest.raises(ValueError):
+        writer.write([_match("Regra A", "depois")])
+
+def test_writer_flushes_on_byte_threshold(tmp_path):
+    """Testa se passar de flush_bytes descarrega o buffer e chama os callbacks pendentes."""
+    cfg = StorageConfig(output_dir=str(tmp_path))
+    flushed = []
+    with storage.MatchWriter(cfg, flush_bytes=1, flush_seconds=3600) as writer:
+        writer.write([_match("Regra A", "um")], on_flushed=lambda: flushed.append("a"))
+        assert flushed == ["a"]
+        assert (tmp_path / "regra-a.jsonl").read_text(encoding="utf-8").count("\n") == 1
+        # Sem correspondências, o callback também roda na descarga
+        writer.write([], on_flushed=lambda: flushed.append("b"))
+    assert flushed == ["a", "b"]
+
+def test_writer_repairs_partial_tail(tmp_path):
+    """Testa se uma última linha incompleta (execução interrompida) é descartada antes de anexar."""
+    path = tmp_path / "regra-a.jsonl"
+    path.write_text('{"context": "ok"}\n{"context": "pela met', encoding="utf-8")
+
+    with storage.MatchWriter(StorageConfig(output_dir=str(tmp_path))) as writer:
+        writer.write([_match("Regra A", "novo")])
+
+    contexts = [json.loads(line)["context"] for line in path.read_text(encoding="utf-8").splitlines()]
+    assert contexts == ["ok", "novo"]